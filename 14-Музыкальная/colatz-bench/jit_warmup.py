@@ -0,0 +1,123 @@
+"""
+Ahead-of-time warm-up and startup benchmark for the Collatz study kernels.
+
+Each study keeps its kernels in plain script modules that are imported by bare name
+from the study directory, so every study is handled in its own subprocess with that
+directory as the working directory.
+
+Every kernel module lists its explicit signatures in KERNEL_SIGNATURES; warm-up
+compiles them into Numba's on-disk cache (cache=True), after which scripts and
+spawned workers load machine code instead of recompiling.
+
+Usage:
+    python jit_warmup.py                # compile all kernels into the on-disk cache
+    python jit_warmup.py --benchmark    # cold vs warm start time per entry point
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Study directory -> modules exporting KERNEL_SIGNATURES
+STUDIES = {
+    'colatz-conundrum': ['data_generation'],
+    'colatz-conundrum-n^2': ['kernels'],
+    'colatz-conundrum-n^x': ['helper_utils', 'data_generation_grid', 'analysis_dynamics'],
+}
+
+# (study, entry point, snippet) - a representative first call as the scripts make it
+ENTRY_POINTS = [
+    ('colatz-conundrum', 'classify_ab',
+     "from data_generation import classify_ab\n"
+     "classify_ab(3.0, 1.0, range(1, 101))"),
+    ('colatz-conundrum', 'mean_log_steps_grid',
+     "import numpy as np\n"
+     "from data_generation import mean_log_steps_grid\n"
+     "mean_log_steps_grid(np.linspace(-5, 5, 8), np.linspace(-20, 10, 8), np.arange(1.0, 101.0), 1000, 1e6)"),
+    ('colatz-conundrum-n^2', 'compute_avg',
+     "import numpy as np\n"
+     "from kernels import compute_avg\n"
+     "compute_avg(0.5, 1.0, 0.5, np.arange(1, 101), 2000, 1e7)"),
+    ('colatz-conundrum-n^x', 'batch_simulate_trajectories',
+     "import numpy as np\n"
+     "from helper_utils import batch_simulate_trajectories\n"
+     "batch_simulate_trajectories(np.arange(1, 100), np.array([3.0, 1.0]), 1000, 10**18)"),
+    ('colatz-conundrum-n^x', 'compute_convergence_grid',
+     "import numpy as np\n"
+     "from data_generation_grid import compute_convergence_grid\n"
+     "compute_convergence_grid(np.array([[3.0, 1.0], [1.0, 1.0]]), (1, 100, 50), 1000, 10**18)"),
+    ('colatz-conundrum-n^x', 'compute_convergence_rate',
+     "import numpy as np\n"
+     "from analysis_dynamics import compute_convergence_rate\n"
+     "compute_convergence_rate(np.zeros((4, 10, 2), dtype=np.int64))"),
+]
+
+WARMUP_SNIPPET = """
+import importlib
+for name in {modules!r}:
+    module = importlib.import_module(name)
+    for kernel, signatures in module.KERNEL_SIGNATURES.items():
+        for signature in signatures:
+            getattr(module, kernel).compile(signature)
+        print(f'  {{name}}.{{kernel}}: {{len(signatures)}} signature(s)')
+"""
+
+TIMED_SNIPPET = """
+import time
+_t0 = time.perf_counter()
+{snippet}
+print(time.perf_counter() - _t0)
+"""
+
+
+def run_in_study(study, code, env=None):
+    """Run a Python snippet with the study directory as working directory."""
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.join(ROOT, study),
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{study}: snippet failed\n{result.stderr}")
+    return result.stdout
+
+
+def warm_up(studies=None):
+    """Compile every KERNEL_SIGNATURES entry of the selected studies into the on-disk cache."""
+    for study in studies or STUDIES:
+        print(f"Warming up {study}")
+        print(run_in_study(study, WARMUP_SNIPPET.format(modules=STUDIES[study])), end='')
+
+
+def benchmark_startup():
+    """
+    Time import + first call of each entry point against an empty cache (cold)
+    and again against the cache the cold run just filled (warm).
+    """
+    print(f"{'study':<24}{'entry point':<32}{'cold, s':>10}{'warm, s':>10}")
+    for study, name, snippet in ENTRY_POINTS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+            code = TIMED_SNIPPET.format(snippet=snippet)
+            cold = float(run_in_study(study, code, env).split()[-1])
+            warm = float(run_in_study(study, code, env).split()[-1])
+        print(f"{study:<24}{name:<32}{cold:>10.2f}{warm:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm up the Numba cache for the Collatz studies.')
+    parser.add_argument('--study', choices=sorted(STUDIES), action='append',
+                        help='Study to warm up (default: all)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Report cold vs warm start time per entry point instead')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_startup()
+    else:
+        warm_up(args.study)
+
+
+if __name__ == "__main__":
+    main()
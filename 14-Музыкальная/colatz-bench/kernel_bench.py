@@ -0,0 +1,241 @@
+"""
+Benchmark suite for the Collatz simulation kernels on fixed reference grids.
+
+Every case runs in its own subprocess from its study directory (see jit_warmup), with
+an empty Numba cache for the first run, so the first call includes JIT compilation.
+Per case and worker count it reports:
+    compile, s     first call minus the best warm call (cold run only)
+    seconds        best of --repeat warm calls
+    cells/s        grid cells (one cell = all starts of one parameter point) per second
+    steps/s        orbit steps per second, counting every step of every orbit as the
+                   plain scalar kernel would take it, so memo and cycle shortcuts count
+    peak, MB       peak resident memory of the process (or of its largest worker
+                   process), and the part the kernel calls added to the process
+
+Thread-parallel kernels are scaled through NUMBA_NUM_THREADS, the process-parallel
+quadratic generator through its worker count. Each run is appended to a JSON history;
+throughput is compared with the previous run on the same host, and drops beyond
+--threshold are flagged as regressions.
+
+Usage:
+    python kernel_bench.py
+    python kernel_bench.py --case linear.mean_log_steps_grid --workers 1 4 16
+    python kernel_bench.py --no-record
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+from jit_warmup import ROOT, run_in_study
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_history.json')
+WORKER_COUNTS = (1, 2, 4, 8, 16, 32)
+
+# name -> (study, parallelism, setup, call, count)
+#   parallelism: 'threads' (NUMBA_NUM_THREADS) or 'processes' ({workers} in the call)
+#   call: timed expression; count: expression giving (cells, orbit steps) of the call
+CASES = {
+    'linear.mean_log_steps_grid': (
+        'colatz-conundrum', 'threads',
+        "import numpy as np\n"
+        "from data_generation import mean_log_steps_grid, orbit_steps_lockstep\n"
+        "a_vals = np.linspace(-5, 5, 64)\n"
+        "b_vals = np.linspace(-20, 10, 64)\n"
+        "starts = np.arange(1.0, 201.0)\n",
+        "mean_log_steps_grid(a_vals, b_vals, starts, 5000, 1e9)",
+        "(a_vals.size * b_vals.size,\n"
+        " sum(int(orbit_steps_lockstep(a, b, starts, 5000, 1e9)[0].sum()) for a in a_vals for b in b_vals))"),
+    'quadratic.fill_grid': (
+        'colatz-conundrum-n^2', 'processes',
+        "import os, tempfile\n"
+        "import numpy as np\n"
+        "from data_generation_grid import fill_grid\n"
+        "from kernels import cell_steps\n"
+        "a_vals = np.linspace(-2, 2, 16)\n"
+        "b_vals = np.linspace(-10, 10, 16)\n"
+        "c_vals = np.linspace(-20, 20, 16)\n"
+        "n_vals = np.arange(1, 101)\n"
+        "checkpoint = os.path.join(tempfile.mkdtemp(), 'grid.partial')\n",
+        "fill_grid(a_vals, b_vals, c_vals, n_vals, 10000, 1e12, {workers}, checkpoint)",
+        "(a_vals.size * b_vals.size * c_vals.size,\n"
+        " sum(int(cell_steps(a, b, c, n_vals, 10000, 1e12)[0].sum()) for a in a_vals for b in b_vals for c in c_vals))"),
+    'polynomial.batch_simulate_trajectories': (
+        'colatz-conundrum-n^x', 'threads',
+        "import numpy as np\n"
+        "from helper_utils import batch_simulate_trajectories\n"
+        "coeff_sets = np.random.default_rng(0).uniform(-2, 2, (64, 3))\n"
+        "starts = np.arange(1, 2001)\n"
+        "def run():\n"
+        "    return [batch_simulate_trajectories(starts, c, 1000, 10**18) for c in coeff_sets]\n",
+        "run()",
+        "(len(coeff_sets), sum(int(r[:, 0].sum()) for r in result))"),
+    'polynomial.compute_convergence_grid': (
+        'colatz-conundrum-n^x', 'threads',
+        "import numpy as np\n"
+        "from data_generation_grid import compute_convergence_grid\n"
+        "coeff_grid = np.stack(np.meshgrid(np.arange(-3, 4), np.arange(-8, 9), np.arange(-8, 9),\n"
+        "                                  indexing='ij'), axis=-1).reshape(-1, 3).astype(np.float64)\n",
+        "compute_convergence_grid(coeff_grid, (1, 1001, 500), 1000, 10**18)",
+        "(len(coeff_grid), int(result[:, :, 0].sum()))"),
+}
+
+CASE_SNIPPET = """
+import json
+import resource
+import time
+{setup}
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+result = {call}
+first = time.perf_counter() - t0
+times = []
+for _ in range({repeat}):
+    t0 = time.perf_counter()
+    result = {call}
+    times.append(time.perf_counter() - t0)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+cells, steps = {count}
+print(json.dumps({{'first': first, 'seconds': min(times), 'cells': cells, 'steps': steps,
+                  'peak_rss_mb': max(after, workers) / 1024, 'call_rss_mb': (after - before) / 1024}}))
+"""
+
+
+def run_case(name, workers, cache_dir, repeat=3):
+    """
+    Run one case with the given worker count against the Numba cache in cache_dir.
+    Returns: dict of raw measurements (first and best call time, cells, steps, memory)
+    """
+    study, parallelism, setup, call, count = CASES[name]
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    if parallelism == 'threads':
+        env['NUMBA_NUM_THREADS'] = str(workers)
+    else:
+        env['NUMBA_NUM_THREADS'] = '1'
+        call = call.format(workers=workers)
+    code = CASE_SNIPPET.format(setup=setup, call=call, count=count, repeat=repeat)
+    return json.loads(run_in_study(study, code, env).splitlines()[-1])
+
+
+def benchmark(names, worker_counts, repeat=3):
+    """
+    Returns: dict case -> {'compile_s', 'cells', 'steps', 'runs': {workers: metrics}}
+    """
+    results = {}
+    for name in names:
+        runs = {}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for workers in worker_counts:
+                raw = run_case(name, workers, cache_dir, repeat)
+                if not runs:
+                    # Only the first run starts from an empty cache
+                    compile_s = max(0.0, raw['first'] - raw['seconds'])
+                runs[str(workers)] = {
+                    'seconds': raw['seconds'],
+                    'cells_per_s': raw['cells'] / raw['seconds'],
+                    'steps_per_s': raw['steps'] / raw['seconds'],
+                    'peak_rss_mb': raw['peak_rss_mb'],
+                    'call_rss_mb': raw['call_rss_mb'],
+                }
+        base = runs[str(worker_counts[0])]['seconds']
+        for metrics in runs.values():
+            metrics['speedup'] = base / metrics['seconds']
+        results[name] = {'compile_s': compile_s, 'cells': raw['cells'], 'steps': raw['steps'], 'runs': runs}
+    return results
+
+
+def host_info():
+    import numba
+    import numpy
+    return {'machine': platform.machine(), 'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+            'python': platform.python_version(), 'numpy': numpy.__version__, 'numba': numba.__version__}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(history, path=HISTORY_FILE):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def previous_run(history, host):
+    """Latest recorded run on the same host, or None."""
+    for entry in reversed(history):
+        if entry['host'] == host:
+            return entry
+    return None
+
+
+def report(results, previous=None, threshold=0.1):
+    """
+    Print the results; with a previous run, also the change in cells/s per case and
+    worker count. Returns: list of (case, workers, change) regressions beyond threshold
+    """
+    regressions = []
+    print(f"{'case':<42}{'workers':>8}{'seconds':>10}{'cells/s':>11}{'steps/s':>11}"
+          f"{'speedup':>9}{'peak MB':>9}{'call MB':>9}{'change':>9}")
+    for name, case in results.items():
+        print(f"{name:<42}  compile {case['compile_s']:.2f} s, {case['cells']} cells, {case['steps']} orbit steps")
+        old_runs = previous['results'].get(name, {}).get('runs', {}) if previous else {}
+        for workers, m in case['runs'].items():
+            change = ''
+            if workers in old_runs:
+                ratio = m['cells_per_s'] / old_runs[workers]['cells_per_s'] - 1
+                change = f"{ratio:+.1%}"
+                if ratio < -threshold:
+                    regressions.append((name, workers, ratio))
+                    change += ' !'
+            print(f"{'':<42}{workers:>8}{m['seconds']:>10.3f}{m['cells_per_s']:>11.4g}{m['steps_per_s']:>11.4g}"
+                  f"{m['speedup']:>9.2f}{m['peak_rss_mb']:>9.0f}{m['call_rss_mb']:>9.0f}{change:>9}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Collatz simulation kernels.')
+    parser.add_argument('--case', choices=sorted(CASES), action='append', help='Case to run (default: all)')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='Worker counts to scale over (default: 1, 2, 4, ... up to the CPU count, at most 32)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed warm calls per run, best is kept (default: 3)')
+    parser.add_argument('--history', default=HISTORY_FILE, help='JSON history file (default: bench_history.json)')
+    parser.add_argument('--no-record', action='store_true', help='Do not append this run to the history')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative drop in cells/s reported as a regression (default: 0.1)')
+    args = parser.parse_args()
+
+    worker_counts = args.workers or [w for w in WORKER_COUNTS if w <= os.cpu_count()]
+    host = host_info()
+    results = benchmark(args.case or list(CASES), worker_counts, args.repeat)
+
+    history = load_history(args.history)
+    regressions = report(results, previous_run(history, host), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} against the previous run")
+    if not args.no_record:
+        history.append({'time': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+                        'host': host, 'repeat': args.repeat, 'results': results})
+        save_history(history, args.history)
+        print(f"Recorded in {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Scalar vs lockstep orbit kernels, per model, on one thread.
+
+The lockstep kernels advance a block of start values per cell together with a
+branch-free parity select, which is meant to let the compiler use wide SIMD
+registers. Both paths run single-threaded (NUMBA_NUM_THREADS=1), so the ratio is
+the per-core effect of the lockstep layout; results are checked for equality.
+
+Usage:
+    python lockstep_bench.py
+    python lockstep_bench.py --lanes 32 --repeat 5
+"""
+
+import argparse
+import os
+
+from jit_warmup import run_in_study
+
+# (model, study, setup, scalar call, lockstep call); each call returns comparable results
+CASES = [
+    ('linear', 'colatz-conundrum',
+     "import numpy as np\n"
+     "from data_generation import orbit_steps_lockstep, simulate_orbit\n"
+     "from numba import njit\n"
+     "a_vals = np.linspace(-5, 5, 40)\n"
+     "b_vals = np.linspace(-20, 10, 40)\n"
+     "starts = np.arange(1.0, 101.0)\n"
+     "@njit\n"
+     "def lockstep_grid(a_vals, b_vals, starts, lanes):\n"
+     "    out = np.empty((len(a_vals), len(b_vals), len(starts)), dtype=np.int64)\n"
+     "    for i in range(len(a_vals)):\n"
+     "        for j in range(len(b_vals)):\n"
+     "            out[i, j] = orbit_steps_lockstep(a_vals[i], b_vals[j], starts, 5000, 1e9, lanes)[0]\n"
+     "    return out\n"
+     "@njit\n"
+     "def scalar_grid(a_vals, b_vals, starts):\n"
+     "    out = np.empty((len(a_vals), len(b_vals), len(starts)), dtype=np.int64)\n"
+     "    for i in range(len(a_vals)):\n"
+     "        for j in range(len(b_vals)):\n"
+     "            for k in range(len(starts)):\n"
+     "                out[i, j, k] = simulate_orbit(starts[k], a_vals[i], b_vals[j], 5000, 1e9)\n"
+     "    return out\n",
+     "scalar_grid(a_vals, b_vals, starts)",
+     "lockstep_grid(a_vals, b_vals, starts, lanes)"),
+    ('quadratic', 'colatz-conundrum-n^2',
+     "import numpy as np\n"
+     "from kernels import simulate, cell_steps_lockstep\n"
+     "from numba import njit\n"
+     "a_vals = np.linspace(-2, 2, 20)\n"
+     "c_vals = np.linspace(-20, 20, 20)\n"
+     "starts = np.arange(1, 101)\n"
+     "@njit\n"
+     "def lockstep_grid(a_vals, c_vals, starts, lanes):\n"
+     "    out = np.empty((len(a_vals), len(c_vals), len(starts)), dtype=np.int64)\n"
+     "    for i in range(len(a_vals)):\n"
+     "        for j in range(len(c_vals)):\n"
+     "            out[i, j] = cell_steps_lockstep(a_vals[i], -3.0, c_vals[j], starts, 10000, 1e12, lanes)[0]\n"
+     "    return out\n"
+     "@njit\n"
+     "def scalar_grid(a_vals, c_vals, starts):\n"
+     "    out = np.empty((len(a_vals), len(c_vals), len(starts)), dtype=np.int64)\n"
+     "    for i in range(len(a_vals)):\n"
+     "        for j in range(len(c_vals)):\n"
+     "            for k in range(len(starts)):\n"
+     "                out[i, j, k] = simulate(starts[k], a_vals[i], -3.0, c_vals[j], 10000, 1e12)\n"
+     "    return out\n",
+     "scalar_grid(a_vals, c_vals, starts)",
+     "lockstep_grid(a_vals, c_vals, starts, lanes)"),
+    ('polynomial (float)', 'colatz-conundrum-n^x',
+     "import numpy as np\n"
+     "from helper_utils import batch_simulate_kernel, batch_simulate_lockstep\n"
+     "coeff_sets = np.random.default_rng(0).uniform(-2, 2, (300, 3))\n"
+     "starts = np.arange(1, 101)\n",
+     "[batch_simulate_kernel(starts, c, 1000, 10**18) for c in coeff_sets]",
+     "[batch_simulate_lockstep(starts, c, 1000, 10**18, lanes) for c in coeff_sets]"),
+    ('polynomial (integer)', 'colatz-conundrum-n^x',
+     "import numpy as np\n"
+     "from helper_utils import batch_simulate_kernel, batch_simulate_lockstep\n"
+     "coeff_sets = np.random.default_rng(0).integers(-3, 4, (300, 3))\n"
+     "starts = np.arange(1, 101)\n",
+     "[batch_simulate_kernel(starts, c, 1000, 10**18) for c in coeff_sets]",
+     "[batch_simulate_lockstep(starts, c, 1000, 10**18, lanes) for c in coeff_sets]"),
+]
+
+CASE_SNIPPET = """
+import time
+import numpy as np
+{setup}
+lanes = {lanes}
+def best_of(call):
+    call()
+    times = []
+    for _ in range({repeat}):
+        t0 = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+scalar_time, scalar = best_of(lambda: {scalar})
+lockstep_time, lockstep = best_of(lambda: {lockstep})
+if isinstance(scalar, list):
+    same = all(np.array_equal(x, y) for x, y in zip(scalar, lockstep))
+else:
+    same = np.array_equal(scalar, lockstep)
+print(scalar_time, lockstep_time, int(same))
+"""
+
+
+def run_case(study, setup, scalar, lockstep, lanes=64, repeat=3):
+    """Returns: (scalar seconds, lockstep seconds, results equal)"""
+    env = dict(os.environ, NUMBA_NUM_THREADS='1')
+    code = CASE_SNIPPET.format(setup=setup, scalar=scalar, lockstep=lockstep, lanes=lanes, repeat=repeat)
+    scalar_time, lockstep_time, same = run_in_study(study, code, env).split()[-3:]
+    return float(scalar_time), float(lockstep_time), bool(int(same))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare scalar and lockstep orbit kernels.')
+    parser.add_argument('--lanes', type=int, default=64, help='Lanes per lockstep block (default: 64)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per kernel, best is kept (default: 3)')
+    args = parser.parse_args()
+
+    print(f"{'model':<24}{'scalar, s':>10}{'lockstep, s':>13}{'speedup':>9}  equal")
+    for model, study, setup, scalar, lockstep in CASES:
+        scalar_time, lockstep_time, same = run_case(study, setup, scalar, lockstep, args.lanes, args.repeat)
+        print(f"{model:<24}{scalar_time:>10.3f}{lockstep_time:>13.3f}{scalar_time / lockstep_time:>9.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
-import pickle
+from dataset import load_grid
 import numpy as np
 import matplotlib.pyplot as plt
 
-def analyze_dark_structure(data_file='data_grid_3d.pkl', threshold=3.0):
+def analyze_dark_structure(data_file='data_grid_3d.grid', threshold=3.0):
     print(f"Loading {data_file}...")
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
@@ -1,43 +1,48 @@
 import numpy as np
 import pickle
+from dataset import load_grid
+from kernels import light_area_sweep
 from scipy import ndimage
 from scipy.ndimage import label
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import plotly.graph_objects as go
 
+def light_area_bounds(data_slice, a_vals, b_vals, thresholds):
+    """
+    Largest connected component where data < threshold, for every threshold, from one
+    union-find sweep over the slice (see kernels.light_area_sweep).
+    Return a list of (area, min_a, max_a, min_b, max_b), one per threshold in the given order.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    order = np.argsort(thresholds, kind='mergesort')
+    areas, boxes = light_area_sweep(np.ascontiguousarray(data_slice, dtype=np.float64),
+                                    np.ascontiguousarray(thresholds[order]))
+    bounds = [None] * len(thresholds)
+    for k, t in enumerate(order):
+        if areas[k] == 0:
+            bounds[t] = (0, np.nan, np.nan, np.nan, np.nan)
+        else:
+            min_i, max_i, min_j, max_j = boxes[k]
+            bounds[t] = (int(areas[k]), a_vals[min_i], a_vals[max_i], b_vals[min_j], b_vals[max_j])
+    return bounds
+
 def find_light_area(data_slice, a_vals, b_vals, threshold):
     """
     Find the largest connected component where data < threshold.
     Return area, min_a, max_a, min_b, max_b.
     """
-    mask = (data_slice < threshold).astype(int)
-    labeled_mask, num_features = label(mask)
-    
-    if num_features == 0:
-        return 0, np.nan, np.nan, np.nan, np.nan
-    
-    # Find the largest component
-    component_sizes = np.bincount(labeled_mask.flat)[1:]  # Skip 0
-    largest_label = np.argmax(component_sizes) + 1
-    component_mask = (labeled_mask == largest_label)
-    
-    area = np.sum(component_mask)
-    a_indices, b_indices = np.where(component_mask)
-    min_a = a_vals[a_indices.min()]
-    max_a = a_vals[a_indices.max()]
-    min_b = b_vals[b_indices.min()]
-    max_b = b_vals[b_indices.max()]
-    
-    return area, min_a, max_a, min_b, max_b
-
-def analyze_light_area(data_file='data_grid_3d.pkl', thresholds=None):
+    return light_area_bounds(data_slice, a_vals, b_vals, [threshold])[0]
+
+def analyze_light_area(data_file='data_grid_3d.grid', thresholds=None, num_thresholds=None):
     """
     Analyze the light area for each c and each threshold.
+    Every c slice is swept once for all thresholds, so hundreds of them cost about as much as one.
+    num_thresholds: if given (and thresholds is not), sweep that many thresholds evenly
+    spaced from the data minimum to its median
     Save results to analysis_light_area.pkl
     """
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
@@ -46,16 +51,19 @@ def analyze_light_area(data_file='data_grid_3d.pkl', thresholds=None):
 
     if thresholds is None:
         # Compute global thresholds based on all data
-        flat_data = data.flatten()
-        print("Data percentiles:", np.percentile(flat_data, [0,5,10,25,50,75,90,100]))
-        thresholds = [1.68, 1.69, 1.70]  # Fixed low thresholds
+        flat_data = np.asarray(data).ravel()
+        print("Data percentiles:", np.nanpercentile(flat_data, [0,5,10,25,50,75,90,100]))
+        if num_thresholds is None:
+            thresholds = [1.68, 1.69, 1.70]  # Fixed low thresholds
+        else:
+            thresholds = np.linspace(np.nanmin(flat_data), np.nanmedian(flat_data), num_thresholds).tolist()
 
     results = []
 
     for c_idx, c in enumerate(c_vals):
         data_slice = data[:, :, c_idx]
-        for thresh in thresholds:
-            area, min_a, max_a, min_b, max_b = find_light_area(data_slice, a_vals, b_vals, thresh)
+        bounds = light_area_bounds(data_slice, a_vals, b_vals, thresholds)
+        for thresh, (area, min_a, max_a, min_b, max_b) in zip(thresholds, bounds):
             results.append({
                 'c': c,
                 'threshold': thresh,
@@ -130,15 +138,40 @@ def plot_light_area_evolution(data_file='analysis_light_area.pkl'):
     plt.show()
     print("Evolution plot saved to 1graph_light_area_evolution.png")
 
-def visualize_2d_light_area(data_file='data_grid_3d.pkl', c_indices=None, threshold=0.5):
+def plot_light_area_sweep(data_file='analysis_light_area.pkl'):
+    """
+    Heatmap of the light area over c and threshold, for sweeps with too many thresholds
+    to draw one line each (see analyze_light_area's num_thresholds).
+    """
+    with open(data_file, 'rb') as f:
+        results = pickle.load(f)
+
+    thresholds = sorted(set(r['threshold'] for r in results))
+    c_vals = sorted(set(r['c'] for r in results))
+    t_index = {t: k for k, t in enumerate(thresholds)}
+    c_index = {c: k for k, c in enumerate(c_vals)}
+    area = np.zeros((len(thresholds), len(c_vals)))
+    for r in results:
+        area[t_index[r['threshold']], c_index[r['c']]] = r['area']
+
+    plt.figure(figsize=(10, 8))
+    plt.pcolormesh(c_vals, thresholds, area, shading='nearest', cmap='viridis')
+    plt.colorbar(label='Area')
+    plt.xlabel('c')
+    plt.ylabel('Threshold')
+    plt.title('Light area vs c and threshold')
+    plt.savefig('1graph_light_area_sweep.png', dpi=300)
+    plt.show()
+    print("Sweep plot saved to 1graph_light_area_sweep.png")
+
+def visualize_2d_light_area(data_file='data_grid_3d.grid', c_indices=None, threshold=0.5):
     """
     For selected c slices, plot the light area (central component below threshold).
     """
     if c_indices is None:
         c_indices = [10, 25, 40]  # Example indices
 
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
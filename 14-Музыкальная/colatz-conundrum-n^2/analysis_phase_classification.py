@@ -1,5 +1,5 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import matplotlib.pyplot as plt
 
 def classify_behavior(data):
@@ -24,13 +24,12 @@ def plot_classification(data_file, output_image='1graph_classification.png'):
     """
     Load data, classify, and plot the classification map.
     """
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c = data_dict['c']
-    data = data_dict['data']
+    data = np.asarray(data_dict['data'])
 
     classification = classify_behavior(data)
 
@@ -58,4 +57,4 @@ def plot_classification(data_file, output_image='1graph_classification.png'):
             print(".1f")
 
 if __name__ == "__main__":
-    plot_classification('data_grid.pkl')
\ No newline at end of file
+    plot_classification('data_grid.grid')
\ No newline at end of file
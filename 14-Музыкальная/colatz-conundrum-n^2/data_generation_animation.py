@@ -2,45 +2,73 @@ import numpy as np
 import pickle
 from tqdm import tqdm
 import concurrent.futures
-from functools import partial
-import numba
-
-@numba.jit(nopython=True)
-def simulate(n, a, b, c, max_steps=10000, max_value=1e12):
-    steps = 0
-    while steps < max_steps and abs(n) < max_value:
-        if n % 2 == 0:
-            n = n / 2
-        else:
-            n = a * n**2 + b * n + c
-        steps += 1
-    return steps
-
-def compute_avg(a, b, c, n_vals, max_steps, max_value):
-    steps_list = [simulate(n, a, b, c, max_steps, max_value) for n in n_vals]
-    return np.mean(np.log(np.array(steps_list) + 1))
-
-def wrapper(task):
-    return compute_avg(*task)
-
-def generate_animation_data(c_values, a_range=(-2, 2), b_range=(-10, 10), n_starts=50, max_steps=10000, max_value=1e12, output_file='data_animation.pkl'):
+from kernels import simulate, compute_avg
+
+def warm_up_worker():
+    # Compile the kernels once per worker, before any frame task arrives
+    simulate(np.int64(1), 0.0, 0.0, 0.0, 1, 1.0)
+    compute_avg(0.0, 0.0, 0.0, np.arange(1, 2), 1, 1.0)
+
+def compute_row(task):
+    frame_idx, row_idx, a, b_vals, c, n_vals, max_steps, max_value = task
+    row = np.array([compute_avg(a, b, c, n_vals, max_steps, max_value) for b in b_vals])
+    return frame_idx, row_idx, row
+
+def generate_animation_data(c_values, a_range=(-2, 2), b_range=(-10, 10), n_starts=50, max_steps=10000, max_value=1e12, output_file='data_animation.pkl',
+                            max_workers=16):
+    """
+    Generate one (a, b) phase map per c value with a single long-lived worker pool.
+    Frames are written to output_file as soon as they are complete:
+    a header record followed by one (c, data) record per frame.
+    """
     a_vals = np.linspace(a_range[0], a_range[1], 100)  # 100 points
     b_vals = np.linspace(b_range[0], b_range[1], 100)
     n_vals = np.arange(1, n_starts + 1)
 
-    data_frames = {}
-    for c in tqdm(c_values, desc="Generating frames"):
-        tasks = [(a, b, c, n_vals, max_steps, max_value) for a in a_vals for b in b_vals]
-        with concurrent.futures.ProcessPoolExecutor(max_workers=16) as executor:
-            results = list(executor.map(wrapper, tasks))
-        data = np.array(results).reshape((len(a_vals), len(b_vals)))
-        data_frames[c] = data
+    pending = {}
+    rows_left = {}
+    with open(output_file, 'wb') as f, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=warm_up_worker) as executor:
+        pickle.dump({'a_vals': a_vals, 'b_vals': b_vals, 'c_values': c_values}, f)
 
-    with open(output_file, 'wb') as f:
-        pickle.dump({'a_vals': a_vals, 'b_vals': b_vals, 'c_values': c_values, 'data_frames': data_frames}, f)
+        futures = []
+        for frame_idx, c in enumerate(c_values):
+            rows_left[frame_idx] = len(a_vals)
+            for row_idx, a in enumerate(a_vals):
+                futures.append(executor.submit(compute_row, (frame_idx, row_idx, a, b_vals, c, n_vals, max_steps, max_value)))
+
+        # Tasks run in submission order, so only the few frames in progress hold a buffer
+        with tqdm(total=len(c_values), desc="Generating frames") as progress:
+            for future in concurrent.futures.as_completed(futures):
+                frame_idx, row_idx, row = future.result()
+                if frame_idx not in pending:
+                    pending[frame_idx] = np.empty((len(a_vals), len(b_vals)))
+                pending[frame_idx][row_idx] = row
+                rows_left[frame_idx] -= 1
+                if rows_left[frame_idx] == 0:
+                    pickle.dump((c_values[frame_idx], pending.pop(frame_idx)), f)
+                    f.flush()
+                    progress.update(1)
 
     print(f"Animation data saved to {output_file}")
 
+def load_animation_data(data_file):
+    """
+    Read an animation file written by generate_animation_data.
+    Returns: dict with a_vals, b_vals, c_values and data_frames (c -> 2D array)
+    """
+    with open(data_file, 'rb') as f:
+        data_dict = pickle.load(f)
+        data_frames = {}
+        while True:
+            try:
+                c, data = pickle.load(f)
+            except EOFError:
+                break
+            data_frames[c] = data
+    data_dict['data_frames'] = data_frames
+    return data_dict
+
 if __name__ == "__main__":
     c_values = np.arange(0.4, 0.61, 0.05)  # 0.4, 0.45, 0.5, 0.55, 0.6
-    generate_animation_data(c_values)
\ No newline at end of file
+    generate_animation_data(c_values)
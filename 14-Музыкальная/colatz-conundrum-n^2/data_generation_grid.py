@@ -1,81 +1,334 @@
+import argparse
+import os
+import shutil
+import time
 import numpy as np
-import pickle
 from tqdm import tqdm
 import concurrent.futures
-from functools import partial
-import numba
+from kernels import cell_stats, PRECISIONS
+from dataset import save_grid, load_grid, open_checkpoint, save_manifest, checkpoint_volume
+from tile_queue import TileCoordinator, coordinator_authkey, parse_address
 
-@numba.jit(nopython=True)
-def simulate(n, a, b, c, max_steps=2000, max_value=1e7):
+def generate_grid_data(a_range, b_range, c_fixed, n_starts, max_steps=2000, max_value=1e7, output_file='data_grid.grid',
+                       resolution=200, max_workers=16, resume=False, precision='float64', serve=None,
+                       progressive=False, authkey=None):
     """
-    Simulate the quadratic Collatz dynamics for a given n, a, b, c.
-    Returns the number of steps until n exceeds max_value or max_steps is reached.
+    Generate phase map data for fixed c, varying a and b.
+    For each (a,b), compute average log(steps + 1) over n_starts.
+    resume: continue an interrupted run from its checkpoint (see fill_grid)
+    precision: orbit arithmetic (see kernels.PRECISIONS); the fraction of orbits that
+    lost precision is saved as the 'lost' layer
+    serve, authkey: (host, port) to serve the rows to workers on other machines, and
+    their shared secret (see fill_grid)
+    progressive: compute coarse to fine, refreshing output_file + '.preview.npy' as the
+    cells fill in; Ctrl-C then saves the preview as the dataset (see save_volume)
     """
-    steps = 0
-    while steps < max_steps and abs(n) < max_value:
-        if n % 2 == 0:
-            n = n / 2
-        else:
-            n = a * n**2 + b * n + c
-        steps += 1
-    return steps
+    a_vals = np.linspace(a_range[0], a_range[1], resolution)  # resolution points for a
+    b_vals = np.linspace(b_range[0], b_range[1], resolution)  # resolution points for b
+    c_vals = np.array([c_fixed], dtype=np.float64)
+    n_vals = np.arange(1, n_starts + 1)  # n from 1 to n_starts
 
-def compute_avg(a, b, c, n_vals, max_steps, max_value):
-    steps_list = [simulate(n, a, b, c, max_steps, max_value) for n in n_vals]
-    return np.mean(np.log(np.array(steps_list) + 1))
+    checkpoint = output_file + '.partial'
+    prior_costs = recorded_row_costs(output_file, a_vals, b_vals, c_vals)
+    volume = fill_grid(a_vals, b_vals, c_vals, n_vals, max_steps, max_value, max_workers, checkpoint, resume, precision,
+                       prior_costs, serve, progressive, output_file + '.preview.npy' if progressive else None,
+                       authkey=authkey)
 
-def wrapper(task):
-    return compute_avg(*task)
+    # Save data; the cost layer orders the rows of the next run (see fill_grid)
+    save_volume(output_file, checkpoint, volume[:, :, 0], {'a_vals': a_vals, 'b_vals': b_vals},
+                {'c': float(c_fixed), 'precision': precision})
 
-def generate_grid_data(a_range, b_range, c_fixed, n_starts, max_steps=2000, max_value=1e7, output_file='data_grid.pkl'):
+def generate_3d_grid_data(a_range, b_range, c_range, n_starts, max_steps=10000, max_value=1e12, output_file='data_grid_3d.grid',
+                          resolution=50, max_workers=16, resume=False, precision='float64', serve=None,
+                          progressive=False, authkey=None):
     """
-    Generate phase map data for fixed c, varying a and b.
-    For each (a,b), compute average log(steps + 1) over n_starts.
+    Generate 3D phase map data for varying a, b, c.
+    For each (a,b,c), compute average log(steps + 1) over n_starts.
+    resume: continue an interrupted run from its checkpoint (see fill_grid)
+    precision, serve, progressive, authkey: as in generate_grid_data
     """
-    a_vals = np.linspace(a_range[0], a_range[1], 200)  # 200 points for a
-    b_vals = np.linspace(b_range[0], b_range[1], 200)  # 200 points for b
+    a_vals = np.linspace(a_range[0], a_range[1], resolution)  # resolution points for a
+    b_vals = np.linspace(b_range[0], b_range[1], resolution)  # resolution points for b
+    c_vals = np.linspace(c_range[0], c_range[1], resolution)  # resolution points for c
     n_vals = np.arange(1, n_starts + 1)  # n from 1 to n_starts
 
-    tasks = [(a, b, c_fixed, n_vals, max_steps, max_value) for a in a_vals for b in b_vals]
+    checkpoint = output_file + '.partial'
+    prior_costs = recorded_row_costs(output_file, a_vals, b_vals, c_vals)
+    volume = fill_grid(a_vals, b_vals, c_vals, n_vals, max_steps, max_value, max_workers, checkpoint, resume, precision,
+                       prior_costs, serve, progressive, output_file + '.preview.npy' if progressive else None,
+                       authkey=authkey)
+
+    # Save data, chunked along c so that single c slices load on their own
+    save_volume(output_file, checkpoint, volume, {'a_vals': a_vals, 'b_vals': b_vals, 'c_vals': c_vals},
+                {'precision': precision})
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=16) as executor:
-        results = list(tqdm(executor.map(wrapper, tasks), total=len(tasks)))
+def save_volume(output_file, checkpoint, volume, axes, attrs):
+    """
+    Save the (value, lost, cost) volume from fill_grid as a dataset with 'lost' and 'cost'
+    layers, and remove the checkpoint. A progressive run stopped early is saved as its
+    preview (see preview_fill) with a 'preview_stride' attribute, the finest complete
+    stride, and keeps its checkpoint so that resume=True refines it.
+    """
+    data, lost, cost = volume[..., 0], volume[..., 1], volume[..., 2]
+    done = ~np.isnan(data)
+    if done.any():
+        report_lost(lost[done])
+    if done.all():
+        save_grid(output_file, data, axes, attrs, layers={'lost': lost, 'cost': cost})
+        shutil.rmtree(checkpoint)
+        print(f"Data saved to {output_file}")
+        return
+    stride = finest_stride(done)
+    save_grid(output_file, preview_fill(data, done), axes, dict(attrs, preview_stride=stride),
+              layers={'lost': lost, 'cost': cost})
+    print(f"Preview (complete at stride {stride}) saved to {output_file}; resume to refine it")
 
-    data = np.array(results).reshape((len(a_vals), len(b_vals)))
+def report_lost(lost):
+    print(f"Orbits that lost precision: {np.mean(lost):.2%} (worst cell {np.max(lost):.2%})")
 
-    # Save data
-    with open(output_file, 'wb') as f:
-        pickle.dump({'a_vals': a_vals, 'b_vals': b_vals, 'c': c_fixed, 'data': data}, f)
+# Rows of a are dispatched longest-predicted-first so that the expensive rows (long
+# transients, near-cycles) start early instead of straggling at the end of the run.
+# A row's predicted cost is interpolated along a from the rows already timed (and,
+# without any, from a previous dataset's 'cost' layer); a pilot of every ROW_PILOT_STRIDE-th
+# row goes first so that the prediction has points across the whole a range.
+ROW_PILOT_STRIDE = 8
+TASKS_PER_WORKER = 2
 
-    print(f"Data saved to {output_file}")
+# Progressive runs refine a strided lattice: first every 8th cell along each axis, then
+# every 4th, and so on. A cell belongs to the coarsest stride that divides all its
+# indices, and a task computes the cells of one row of a at one stride, so each level
+# adds only cells that no coarser level had.
+PROGRESSIVE_STRIDES = (8, 4, 2, 1)
 
-def generate_3d_grid_data(a_range, b_range, c_range, n_starts, max_steps=10000, max_value=1e12, output_file='data_grid_3d.pkl'):
+def fill_grid(a_vals, b_vals, c_vals, n_vals, max_steps, max_value, max_workers=16, checkpoint='grid.partial',
+              resume=False, precision='float64', prior_costs=None, serve=None, progressive=False, preview=None,
+              preview_seconds=30.0, authkey=None):
     """
-    Generate 3D phase map data for varying a, b, c.
-    For each (a,b,c), compute average log(steps + 1) over n_starts.
+    Compute the (a, b, c) volume with workers writing straight into a memory-mapped float32
+    file in the checkpoint directory; each cell holds its average log(steps + 1), the
+    fraction of its orbits that lost precision and the seconds it took. Each task (tile)
+    covers one row of a (all b, c cells, or those of one refinement level) and returns
+    nothing, so no per-cell result is pickled back to the driver.
+    Finished tasks are recorded in the checkpoint manifest; with resume=True a run with the
+    same parameters skips them.
+    prior_costs: optional seconds per row of a from an earlier run (NaN where unknown),
+    e.g. from recorded_row_costs; it orders the rows until they are timed in this run
+    serve: (host, port) to serve the rows to tile_queue workers on other machines instead
+    of a local process pool; remote rows come back as arrays that the driver writes, and
+    max_workers is then the total number of worker processes
+    authkey: shared secret of the served workers (see TileCoordinator)
+    progressive: compute the cells coarse to fine (see PROGRESSIVE_STRIDES); Ctrl-C then
+    stops the run early instead of raising, and the checkpoint is kept for resume=True
+    preview: optional .npy file refreshed with the values so far, missing cells filled in
+    from the coarser lattice (see preview_fill), after each level and at most every
+    preview_seconds in between
+    Returns: float32 array of shape (len(a_vals), len(b_vals), len(c_vals), 3), the last
+    axis being (value, lost fraction, seconds); NaN for cells an interrupted run did not reach
     """
-    a_vals = np.linspace(a_range[0], a_range[1], 50)  # 50 points for a
-    b_vals = np.linspace(b_range[0], b_range[1], 50)  # 50 points for b
-    c_vals = np.linspace(c_range[0], c_range[1], 50)  # 50 points for c
-    n_vals = np.arange(1, n_starts + 1)  # n from 1 to n_starts
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    shape = (len(a_vals), len(b_vals), len(c_vals), 3)
+    strides = PROGRESSIVE_STRIDES if progressive else (1,)
+    params = {'a_vals': a_vals.tolist(), 'b_vals': b_vals.tolist(), 'c_vals': c_vals.tolist(),
+              'n_starts': len(n_vals), 'max_steps': max_steps, 'max_value': max_value, 'precision': precision,
+              'channels': ['value', 'lost', 'cost']}
+    if progressive:
+        params['strides'] = list(strides)
+    manifest = open_checkpoint(checkpoint, params, shape, np.float32, resume)
+    if manifest['completed']:
+        print(f"Resuming {checkpoint}: {len(manifest['completed'])} tasks already done")
+    volume = np.load(checkpoint_volume(checkpoint), mmap_mode='r+')
+
+    # Tasks are (row, stride); the manifest of a plain run lists its rows by index alone
+    completed = {tuple(task) if progressive else (task, 1) for task in manifest['completed']}
+    done_cells = np.zeros(shape[:3], dtype=bool)
+    for i, stride in completed:
+        done_cells[i][level_cells(i, stride, strides, shape[1], shape[2])] = True
+    levels = [(stride, [i for i in range(0, shape[0], stride) if (i, stride) not in completed
+                        and len(level_cells(i, stride, strides, shape[1], shape[2])[0])])
+              for stride in strides]
 
-    tasks = [(a, b, c, n_vals, max_steps, max_value) for a in a_vals for b in b_vals for c in c_vals]
+    # Seconds per row: prior estimates, replaced by the timings of this run as rows finish
+    row_costs = np.full(shape[0], np.nan) if prior_costs is None else np.array(prior_costs, dtype=np.float64)
+    row_cells = shape[1] * shape[2]
+    for i in np.flatnonzero(done_cells.any(axis=(1, 2))):
+        row_costs[i] = volume[i, ..., 2][done_cells[i]].mean() * row_cells
+    if not progressive and not np.isfinite(row_costs).any():
+        # Pilot rows go first; a progressive run has its coarsest level for that
+        rows = levels[0][1]
+        levels = [(1, rows[::ROW_PILOT_STRIDE]), (1, sorted(set(rows) - set(rows[::ROW_PILOT_STRIDE])))]
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=16) as executor:
-        results = list(tqdm(executor.map(wrapper, tasks), total=len(tasks)))
+    initargs = (checkpoint_volume(checkpoint), a_vals, b_vals, c_vals, n_vals, max_steps, max_value, precision)
+    if serve is None:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                                          initargs=initargs)
+        task = fill_row
+    else:
+        # Remote workers cannot reach the checkpoint volume; they return their rows instead
+        executor = TileCoordinator(serve, init_worker, (None,) + initargs[1:], authkey)
+        task = compute_row
+    last_preview = time.monotonic()
+    unfinished = {stride for stride, rows in levels if rows}
+    with executor:
+        running = {}
+        try:
+            with tqdm(total=int(done_cells.size - done_cells.sum())) as progress:
+                while any(rows for _, rows in levels) or running:
+                    # Keep a short queue ahead of the workers, so later picks see more timings
+                    while any(rows for _, rows in levels) and len(running) < TASKS_PER_WORKER * max_workers:
+                        stride, rows = next(level for level in levels if level[1])
+                        i = rows.pop(costliest_row(row_costs, rows))
+                        running[executor.submit(task, i, stride, strides)] = (i, stride)
+                    finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        result = future.result()
+                        i, stride = running.pop(future)
+                        cells = level_cells(i, stride, strides, shape[1], shape[2])
+                        if serve is not None:
+                            volume[i][cells] = result[cells]
+                            volume.flush()
+                        done_cells[i][cells] = True
+                        row_costs[i] = volume[i, ..., 2][done_cells[i]].mean() * row_cells
+                        manifest['completed'].append([i, stride] if progressive else i)
+                        save_manifest(checkpoint, manifest)
+                        progress.update(len(cells[0]))
+                    # The preview is refreshed when a level completes, and every preview_seconds in between
+                    active = {stride for stride, rows in levels if rows} | {stride for _, stride in running.values()}
+                    if preview and (unfinished - active or time.monotonic() - last_preview > preview_seconds):
+                        save_preview(preview, volume[..., 0], done_cells)
+                        last_preview = time.monotonic()
+                    unfinished = active
+        except KeyboardInterrupt:
+            if not progressive:
+                raise
+            for future in running:
+                future.cancel()
+            print(f"Interrupted with {done_cells.mean():.0%} of the cells done; resume to refine further")
 
-    # Reshape to 3D array
-    data = np.array(results).reshape((len(a_vals), len(b_vals), len(c_vals)))
+    if preview:
+        save_preview(preview, volume[..., 0], done_cells)
+    volume = np.array(volume)
+    volume[~done_cells] = np.nan
+    return volume
 
-    # Save data
-    with open(output_file, 'wb') as f:
-        pickle.dump({'a_vals': a_vals, 'b_vals': b_vals, 'c_vals': c_vals, 'data': data}, f)
+def level_cells(i, stride, strides, num_b, num_c):
+    """(j, k) indices of the cells of row i whose coarsest stride among strides is stride."""
+    j = np.arange(num_b)[:, None]
+    k = np.arange(num_c)[None, :]
+    level = np.zeros((num_b, num_c), dtype=np.int64)
+    for s in sorted(strides, reverse=True):
+        level[(level == 0) & (i % s == 0) & (j % s == 0) & (k % s == 0)] = s
+    return np.nonzero(level == stride)
 
-    print(f"3D data saved to {output_file}")
+def preview_fill(values, done):
+    """
+    values with every cell not done taken from the nearest done cell at or below its
+    indices on the lattice of the finest stride that has one, NaN where no stride does.
+    """
+    out = np.where(done, values, np.nan)
+    filled = done.copy()
+    index = np.indices(values.shape)
+    for stride in sorted(PROGRESSIVE_STRIDES)[1:]:
+        source = tuple(axis // stride * stride for axis in index)
+        take = ~filled & done[source]
+        out[take] = values[tuple(axis[take] for axis in source)]
+        filled |= take
+    return out
+
+def save_preview(path, values, done):
+    tmp = path + '.tmp.npy'
+    np.save(tmp, preview_fill(np.asarray(values), done))
+    os.replace(tmp, path)
+
+def finest_stride(done):
+    """Finest stride of PROGRESSIVE_STRIDES whose lattice is complete, or None."""
+    for stride in sorted(PROGRESSIVE_STRIDES):
+        if done[tuple(slice(None, None, stride) for _ in done.shape)].all():
+            return stride
+    return None
+
+def costliest_row(row_costs, rows):
+    """
+    Position in rows (sorted row indices) of the row with the highest predicted cost,
+    interpolated from the rows whose cost is known; the first row when none is.
+    """
+    known = np.flatnonzero(np.isfinite(row_costs))
+    if not len(known):
+        return 0
+    return int(np.argmax(np.interp(rows, known, row_costs[known])))
+
+def recorded_row_costs(path, a_vals, b_vals, c_vals):
+    """
+    Seconds per row of a for a new grid, estimated from the 'cost' layer of the dataset
+    at path (e.g. the previous run to the same output file): row costs are interpolated
+    along a and scaled to the new number of cells per row.
+    Returns: float64 array of len(a_vals), or None when there is no such layer
+    """
+    try:
+        grid = load_grid(path)
+    except (OSError, ValueError):
+        return None
+    if 'cost' not in grid:
+        return None
+    cost = np.asarray(grid['cost'], dtype=np.float64)
+    old_costs = cost.reshape(len(cost), -1).sum(axis=1)
+    scale = len(b_vals) * len(c_vals) / (cost.size // len(cost))
+    order = np.argsort(grid['a_vals'])
+    return np.interp(a_vals, grid['a_vals'][order], old_costs[order]) * scale
+
+_worker_state = None
+
+def init_worker(volume_file, a_vals, b_vals, c_vals, n_vals, max_steps, max_value, precision='float64'):
+    """volume_file: the checkpoint volume to fill, or None for workers that only compute rows."""
+    global _worker_state
+    volume = None if volume_file is None else np.load(volume_file, mmap_mode='r+')
+    _worker_state = (volume, a_vals, b_vals, c_vals, n_vals, max_steps, max_value, precision)
+
+def compute_row(i, stride=1, strides=(1,)):
+    """
+    Compute the cells of row i at the given refinement stride (see level_cells).
+    Returns: float32 array (len(b_vals), len(c_vals), 3) of value, lost fraction and seconds,
+    NaN outside those cells
+    """
+    _, a_vals, b_vals, c_vals, n_vals, max_steps, max_value, precision = _worker_state
+    row = np.full((len(b_vals), len(c_vals), 3), np.nan, dtype=np.float32)
+    for j, k in zip(*level_cells(i, stride, strides, len(b_vals), len(c_vals))):
+        t0 = time.perf_counter()
+        value, lost = cell_stats(a_vals[i], b_vals[j], c_vals[k], n_vals, max_steps, max_value, precision)
+        row[j, k] = value, lost, time.perf_counter() - t0
+    return row
+
+def fill_row(i, stride=1, strides=(1,)):
+    """As compute_row, writing the cells straight into the checkpoint volume."""
+    volume = _worker_state[0]
+    row = compute_row(i, stride, strides)
+    cells = level_cells(i, stride, strides, row.shape[0], row.shape[1])
+    volume[i][cells] = row[cells]
+    # The row must be on disk before the driver records it as done
+    volume.flush()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate the quadratic phase grids')
+    parser.add_argument('--resume', action='store_true', help='Continue interrupted runs from their checkpoints')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help='Orbit arithmetic: float32 previews, float64, or exact for integral cells (default: float64)')
+    parser.add_argument('--serve', metavar='HOST:PORT',
+                        help='Serve the rows to tile_queue.py workers on other machines instead of a local pool')
+    parser.add_argument('--authkey',
+                        help='Shared secret of the --serve workers (default: COLLATZ_AUTHKEY, else a random key)')
+    parser.add_argument('--progressive', action='store_true',
+                        help='Compute coarse to fine with a .preview.npy next to each grid; Ctrl-C keeps the preview')
+    args = parser.parse_args()
+    serve = args.serve and parse_address(args.serve)
+    # Both grids are served under one key, so that the workers carry on from one to the next
+    authkey = serve and coordinator_authkey(args.authkey)
+
     # 2D grid for c=0.5, high resolution
-    generate_grid_data(a_range=(-2, 2), b_range=(-10, 10), c_fixed=0.5, n_starts=100, output_file='data_grid_c05.pkl')
+    generate_grid_data(a_range=(-2, 2), b_range=(-10, 10), c_fixed=0.5, n_starts=100, output_file='data_grid_c05.grid',
+                       resume=args.resume, precision=args.precision, serve=serve,
+                       progressive=args.progressive, authkey=authkey)
 
     # 3D grid for full c range
-    generate_3d_grid_data(a_range=(-2, 2), b_range=(-10, 10), c_range=(-20, 20), n_starts=100, output_file='data_grid_3d.pkl')
\ No newline at end of file
+    generate_3d_grid_data(a_range=(-2, 2), b_range=(-10, 10), c_range=(-20, 20), n_starts=100, output_file='data_grid_3d.grid',
+                          resume=args.resume, precision=args.precision, serve=serve,
+                          progressive=args.progressive, authkey=authkey)
\ No newline at end of file
@@ -0,0 +1,231 @@
+import json
+import os
+import pickle
+import numpy as np
+
+# On-disk grid dataset: a directory holding
+#   meta.json            shape, dtype, chunking, axis names and scalar attributes
+#   <axis>.npy           one file per axis (a_vals, b_vals, c_vals, ...)
+#   chunk_00000.npy ...  the data, cut along the last axis; inside a chunk that axis
+#                        comes first, so one slice along it is a contiguous block
+#   <layer>.npy          optional per-cell side layers with the shape of the data
+#                        (e.g. lost: the fraction of orbits that lost float precision)
+# Chunks are memory-mapped on access, so data[:, :, c_idx] reads a single slab.
+
+FORMAT_NAME = 'collatz-grid'
+FORMAT_VERSION = 1
+
+def save_grid(path, data, axes, attrs=None, chunk_size=8, layers=None):
+    """
+    Write data to a grid dataset directory.
+    axes: dict axis name -> values, one per dimension of data, in order
+    attrs: dict of extra JSON-serializable values (e.g. {'c': 0.5})
+    chunk_size: number of positions along the last axis per chunk file
+    layers: dict layer name -> array of the same shape as data, stored unchunked
+    """
+    data = np.asarray(data)
+    layers = layers or {}
+    meta = create_grid(path, data.shape, data.dtype, axes, attrs, chunk_size, list(layers))
+    for name, values in layers.items():
+        if np.shape(values) != data.shape:
+            raise ValueError(f"Layer {name} has shape {np.shape(values)}, expected {data.shape}")
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(values))
+    for k in range(num_chunks(meta)):
+        start, stop = chunk_bounds(meta, k)
+        write_chunk(path, k, data[..., start:stop])
+
+def create_grid(path, shape, dtype, axes, attrs=None, chunk_size=8, layers=()):
+    """
+    Create an empty grid dataset (metadata and axes); chunks are added with write_chunk.
+    Returns: the metadata dict
+    """
+    if len(axes) != len(shape):
+        raise ValueError(f"Expected {len(shape)} axes, got {len(axes)}")
+    os.makedirs(path, exist_ok=True)
+    for name, values in axes.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(values))
+    meta = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'shape': [int(n) for n in shape],
+        'dtype': np.dtype(dtype).str,
+        'chunk_size': int(chunk_size),
+        'axes': list(axes),
+        'attrs': dict(attrs or {}),
+        'layers': list(layers),
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def num_chunks(meta):
+    return -(-meta['shape'][-1] // meta['chunk_size'])
+
+def chunk_bounds(meta, k):
+    """Positions [start, stop) along the last axis stored in chunk k."""
+    start = k * meta['chunk_size']
+    return start, min(start + meta['chunk_size'], meta['shape'][-1])
+
+def chunk_path(path, k):
+    return os.path.join(path, f"chunk_{k:05d}.npy")
+
+def write_chunk(path, k, block):
+    """
+    Store chunk k from block, given in dataset axis order (..., positions along last axis).
+    The file is written under a temporary name and renamed, so a chunk is either complete or absent.
+    """
+    tmp = chunk_path(path, k) + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, np.ascontiguousarray(np.moveaxis(block, -1, 0)))
+    os.replace(tmp, chunk_path(path, k))
+
+def read_meta(path):
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} dataset")
+    return meta
+
+class LazyGrid:
+    """
+    Read-only view of a grid dataset that loads only the chunks an index touches.
+    Indexing is orthogonal: each axis takes an int, a slice, an integer array or a
+    boolean mask independently. np.asarray(grid) reads the whole volume.
+    """
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self.shape = tuple(meta['shape'])
+        self.dtype = np.dtype(meta['dtype'])
+        self.ndim = len(self.shape)
+        self._chunks = {}
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def _chunk(self, k):
+        if k not in self._chunks:
+            self._chunks[k] = np.load(chunk_path(self.path, k), mmap_mode='r')
+        return self._chunks[k]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = next(i for i, k in enumerate(key) if k is Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        # Positions along the chunked (last) axis, grouped by chunk
+        last = np.arange(self.shape[-1])[key[-1]]
+        positions = np.atleast_1d(last)
+        size = self.meta['chunk_size']
+        blocks = []
+        grouped = []
+        for k in np.unique(positions // size):
+            members = np.flatnonzero(positions // size == k)
+            blocks.append(self._chunk(k)[positions[members] - k * size])
+            grouped.append(members)
+        if blocks:
+            out = np.concatenate(blocks)
+            # Back to the requested order when the positions were not sorted
+            grouped = np.concatenate(grouped)
+            if np.any(grouped[1:] < grouped[:-1]):
+                out = out[np.argsort(grouped)]
+        else:
+            out = np.empty((0,) + self.shape[:-1], dtype=self.dtype)
+        out = np.moveaxis(out, 0, -1)
+
+        # Remaining axes, one at a time; integer keys are dropped afterwards
+        drop = []
+        for axis, k in enumerate(key[:-1]):
+            if isinstance(k, (int, np.integer)):
+                out = np.take(out, [k], axis=axis)
+                drop.append(axis)
+            elif isinstance(k, slice):
+                out = out[(slice(None),) * axis + (k,)]
+            else:
+                k = np.asarray(k)
+                out = np.take(out, np.flatnonzero(k) if k.dtype == bool else k, axis=axis)
+        if np.ndim(last) == 0:
+            drop.append(self.ndim - 1)
+        return np.squeeze(out, axis=tuple(drop)) if drop else out
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+# Run checkpoints: a directory holding
+#   manifest.json   run parameters and the tiles already computed
+#   volume.npy      the preallocated result volume, filled in place by the workers
+# A tile enters the manifest only after its cells are flushed to volume.npy.
+
+def checkpoint_volume(path):
+    return os.path.join(path, 'volume.npy')
+
+def open_checkpoint(path, params, shape, dtype=np.float32, resume=False):
+    """
+    Start a checkpointed run in directory path, or pick up the one already there.
+    params: JSON-serializable run parameters; resuming requires them to match
+    Returns: the manifest dict ({'params', 'completed'}), completed being the list of finished tiles
+    """
+    params = json.loads(json.dumps(params))
+    manifest_file = os.path.join(path, 'manifest.json')
+    if resume and os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest['params'] != params:
+            raise ValueError(f"Cannot resume {path}: it was started with parameters {manifest['params']}")
+        return manifest
+    os.makedirs(path, exist_ok=True)
+    volume = np.lib.format.open_memmap(checkpoint_volume(path), mode='w+', dtype=dtype, shape=tuple(shape))
+    del volume
+    manifest = {'params': params, 'completed': []}
+    save_manifest(path, manifest)
+    return manifest
+
+def save_manifest(path, manifest):
+    tmp = os.path.join(path, 'manifest.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(path, 'manifest.json'))
+
+def load_grid(path):
+    """
+    Open a grid dataset, or a legacy pickle written by the older generators.
+    Returns: dict with one entry per axis (a_vals, b_vals, ...), the scalar attributes
+    (e.g. c), the side layers (memory-mapped) and 'data'; for datasets data is a LazyGrid,
+    for pickles the full array.
+    """
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    meta = read_meta(path)
+    grid = {name: np.load(os.path.join(path, f"{name}.npy")) for name in meta['axes']}
+    grid.update(meta['attrs'])
+    for name in meta.get('layers', []):
+        grid[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+    grid['data'] = LazyGrid(path, meta)
+    return grid
+
+def convert_pickle(pkl_path, path=None, chunk_size=8):
+    """
+    Rewrite a legacy pickle ({'a_vals', 'b_vals', 'c_vals' or 'c', 'data'}) as a grid dataset.
+    Returns: path of the dataset directory
+    """
+    with open(pkl_path, 'rb') as f:
+        legacy = pickle.load(f)
+    path = path or os.path.splitext(pkl_path)[0] + '.grid'
+    axis_names = ['a_vals', 'b_vals', 'c_vals'][:np.ndim(legacy['data'])]
+    attrs = {k: float(v) for k, v in legacy.items() if k not in axis_names and k != 'data'}
+    save_grid(path, legacy['data'], {name: legacy[name] for name in axis_names}, attrs, chunk_size)
+    return path
+
+if __name__ == "__main__":
+    import sys
+    for pkl_path in sys.argv[1:]:
+        print(f"{pkl_path} -> {convert_pickle(pkl_path)}")
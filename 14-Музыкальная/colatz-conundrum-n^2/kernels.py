@@ -0,0 +1,437 @@
+import numpy as np
+import numba
+
+# Orbit outcomes reported by simulate_outcome
+OUTCOME_ESCAPED = 0    # |n| reached max_value
+OUTCOME_CYCLED = 1     # entered a cycle, so it stays bounded forever
+OUTCOME_MAX_STEPS = 2  # neither within max_steps
+
+# Precision policies. Beyond the limit of a float type, neighbouring representable
+# values are more than 1 apart, so the parity test says nothing about the true orbit;
+# orbits that step from such a value are counted as lost. 'exact' runs float64 and
+# redoes the lost orbits of integral cells with Python integers (see cell_stats).
+PRECISIONS = ('float32', 'float64', 'exact')
+PRECISION_FLOAT32 = 0
+PRECISION_FLOAT64 = 1
+FLOAT32_LIMIT = 2.0 ** 24
+FLOAT64_LIMIT = 2.0 ** 53
+
+@numba.jit(nopython=True, cache=True)
+def quadratic_step(n, a, b, c):
+    if n % 2 == 0:
+        return n / 2
+    return a * n**2 + b * n + c
+
+@numba.jit(nopython=True, cache=True)
+def detect_cycle(n, a, b, c, max_steps=2000, max_value=1e7):
+    """
+    Iterate the quadratic dynamics with Brent's cycle detection (the saved value jumps
+    to the current one at power-of-two distances).
+    Returns: (outcome, steps, cycle_length); cycle_length is 0 unless the orbit cycled
+    """
+    x = float(n)
+    saved = x
+    power = 1
+    distance = 0
+    steps = 0
+    while steps < max_steps and abs(x) < max_value:
+        x = quadratic_step(x, a, b, c)
+        steps += 1
+        distance += 1
+        if x == saved:
+            return OUTCOME_CYCLED, steps, distance
+        if distance == power:
+            saved = x
+            power *= 2
+            distance = 0
+    if steps < max_steps:
+        return OUTCOME_ESCAPED, steps, 0
+    return OUTCOME_MAX_STEPS, steps, 0
+
+@numba.jit(nopython=True, cache=True)
+def simulate_outcome(n, a, b, c, max_steps=2000, max_value=1e7):
+    """
+    Classify the orbit of n.
+    Returns: (outcome, steps, cycle_entry, cycle_length); for a cycled orbit cycle_entry is
+    the number of steps before the first value on the cycle, otherwise both are 0
+    """
+    outcome, steps, cycle_length = detect_cycle(n, a, b, c, max_steps, max_value)
+    if outcome != OUTCOME_CYCLED:
+        return outcome, steps, 0, 0
+    # Walk two pointers cycle_length apart until they meet at the cycle entry
+    lead = float(n)
+    for _ in range(cycle_length):
+        lead = quadratic_step(lead, a, b, c)
+    trail = float(n)
+    entry = 0
+    while trail != lead:
+        trail = quadratic_step(trail, a, b, c)
+        lead = quadratic_step(lead, a, b, c)
+        entry += 1
+    return outcome, steps, entry, cycle_length
+
+@numba.jit(nopython=True, cache=True)
+def simulate(n, a, b, c, max_steps=2000, max_value=1e7):
+    """
+    Simulate the quadratic Collatz dynamics for a given n, a, b, c.
+    Returns the number of steps until n exceeds max_value or max_steps is reached.
+    A cycled orbit would run to max_steps, so it stops as soon as the cycle is detected.
+    """
+    outcome, steps, cycle_length = detect_cycle(n, a, b, c, max_steps, max_value)
+    return max_steps if outcome == OUTCOME_CYCLED else steps
+
+# Per-cell memo of steps-to-escape for small positive integer iterates.
+# The table covers 1 <= n < MEMO_SPAN * max(n_vals); entries hold the remaining steps
+# until |n| reaches max_value, MEMO_NEVER for values on or leading into a cycle.
+MEMO_SPAN = 16
+MEMO_UNKNOWN = -1
+MEMO_NEVER = np.iinfo(np.int64).max
+
+@numba.jit(nopython=True, cache=True)
+def memo_slot(x, memo_size):
+    """Index of x in the memo table, or -1 when x is not an integer in [1, memo_size)."""
+    if 1.0 <= x < memo_size and x == np.floor(x):
+        return int(x)
+    return -1
+
+@numba.jit(nopython=True, cache=True)
+def memo_fill(memo, memo_lost, path_slots, path_steps, count, end_step, remaining, last_lost, tail_lost):
+    """
+    Record the remaining steps for the memo slots visited on the path up to end_step.
+    A slot's continuation lost precision if the path did at or after its step
+    (last_lost is the last such step) or the continuation past end_step did (tail_lost).
+    """
+    for k in range(count):
+        if remaining == MEMO_NEVER:
+            memo[path_slots[k]] = MEMO_NEVER
+        else:
+            memo[path_slots[k]] = remaining + end_step - path_steps[k]
+        memo_lost[path_slots[k]] = tail_lost or last_lost >= path_steps[k]
+
+@numba.jit(nopython=True, cache=True)
+def simulate_memo(n, a, b, c, max_steps, max_value, memo, memo_lost, path_slots, path_steps):
+    """
+    simulate sharing the memo table of its cell: the orbit stops at the first iterate
+    whose remaining steps are known, and records the ones it visited once its fate
+    (escape or cycle) is settled.
+    path_slots, path_steps: scratch buffers of at least max_steps entries
+    Returns: (steps, lost) - the same step count as simulate, lost when the orbit stepped
+    from a value beyond FLOAT64_LIMIT
+    """
+    x = float(n)
+    saved = x
+    power = 1
+    distance = 0
+    count = 0
+    steps = 0
+    last_lost = -1
+    while steps < max_steps:
+        slot = memo_slot(x, memo.shape[0])
+        if slot >= 0:
+            known = memo[slot]
+            if known != MEMO_UNKNOWN:
+                tail_lost = memo_lost[slot]
+                memo_fill(memo, memo_lost, path_slots, path_steps, count, steps, known, last_lost, tail_lost)
+                lost = tail_lost or last_lost >= 0
+                if known == MEMO_NEVER or steps + known >= max_steps:
+                    return max_steps, lost
+                return steps + known, lost
+            path_slots[count] = slot
+            path_steps[count] = steps
+            count += 1
+        if abs(x) >= max_value:
+            memo_fill(memo, memo_lost, path_slots, path_steps, count, steps, 0, last_lost, False)
+            return steps, last_lost >= 0
+        if abs(x) >= FLOAT64_LIMIT:
+            last_lost = steps
+        x = quadratic_step(x, a, b, c)
+        steps += 1
+        distance += 1
+        if x == saved:
+            # The last distance steps went once around the cycle, which every slot's continuation repeats
+            cycle_lost = last_lost >= steps - distance
+            memo_fill(memo, memo_lost, path_slots, path_steps, count, steps, MEMO_NEVER, last_lost, cycle_lost)
+            return max_steps, last_lost >= 0
+        if distance == power:
+            saved = x
+            power *= 2
+            distance = 0
+    return max_steps, last_lost >= 0
+
+@numba.jit(nopython=True, cache=True)
+def simulate_checked(x, a, b, c, two, max_steps, max_value, limit):
+    """
+    simulate in the float type of its arguments: x, a, b, c and two (the number 2) all
+    share that type, so float32 arguments keep every operation in float32.
+    Returns: (steps, lost) - lost when the orbit stepped from a value beyond limit
+    """
+    saved = x
+    power = 1
+    distance = 0
+    steps = 0
+    lost = False
+    while steps < max_steps and abs(x) < max_value:
+        if abs(x) >= limit:
+            lost = True
+        if x % two == 0:
+            x = x / two
+        else:
+            x = a * x * x + b * x + c
+        steps += 1
+        distance += 1
+        if x == saved:
+            return max_steps, lost
+        if distance == power:
+            saved = x
+            power *= 2
+            distance = 0
+    return steps, lost
+
+@numba.jit(nopython=True, cache=True)
+def cell_steps(a, b, c, n_vals, max_steps, max_value, precision=PRECISION_FLOAT64):
+    """
+    Step counts of all starts of one (a, b, c) cell. In float64 the starts share one
+    memo table, so an orbit ends as soon as it reaches a small integer an earlier start
+    already settled.
+    Returns: (steps, lost) - int64 and bool arrays, one entry per start in n_vals
+    """
+    steps = np.empty(n_vals.shape[0], dtype=np.int64)
+    lost = np.empty(n_vals.shape[0], dtype=np.bool_)
+    if precision == PRECISION_FLOAT32:
+        a32 = np.float32(a)
+        b32 = np.float32(b)
+        c32 = np.float32(c)
+        two = np.float32(2.0)
+        for k in range(n_vals.shape[0]):
+            steps[k], lost[k] = simulate_checked(np.float32(n_vals[k]), a32, b32, c32, two, max_steps, max_value,
+                                                 FLOAT32_LIMIT)
+    else:
+        memo = np.full(MEMO_SPAN * (int(n_vals.max()) + 1), MEMO_UNKNOWN, dtype=np.int64)
+        memo_lost = np.zeros(memo.shape[0], dtype=np.bool_)
+        path_slots = np.empty(max_steps, dtype=np.int64)
+        path_steps = np.empty(max_steps, dtype=np.int64)
+        for k in range(n_vals.shape[0]):
+            steps[k], lost[k] = simulate_memo(n_vals[k], a, b, c, max_steps, max_value, memo, memo_lost,
+                                              path_slots, path_steps)
+    return steps, lost
+
+def simulate_exact(n, a, b, c, max_steps=2000, max_value=1e7):
+    """
+    simulate for integral a, b, c in Python integers, so parity stays exact at any magnitude.
+    """
+    x = int(n)
+    a, b, c = int(a), int(b), int(c)
+    saved = x
+    power = 1
+    distance = 0
+    steps = 0
+    while steps < max_steps and abs(x) < max_value:
+        x = x // 2 if x % 2 == 0 else a * x * x + b * x + c
+        steps += 1
+        distance += 1
+        if x == saved:
+            return max_steps
+        if distance == power:
+            saved = x
+            power *= 2
+            distance = 0
+    return steps
+
+# Orbits advanced together by the lockstep kernel
+LOCKSTEP_LANES = 64
+
+@numba.jit(nopython=True, cache=True)
+def cell_steps_lockstep(a, b, c, n_vals, max_steps, max_value, lanes=LOCKSTEP_LANES):
+    """
+    Step counts of all starts of one (a, b, c) cell, equal to simulate, computed in
+    lockstep: each of up to `lanes` lanes holds one orbit, and every sweep advances all
+    live lanes by one step with a branch-free parity select over contiguous arrays,
+    which the compiler can vectorize. Lanes whose orbit escaped, cycled or ran out of
+    steps are retired and refilled with the next start.
+    Returns: (steps, lost) - as cell_steps in float64
+    """
+    num = n_vals.shape[0]
+    width = min(lanes, num)
+    out = np.empty(num, dtype=np.int64)
+    lost = np.empty(num, dtype=np.bool_)
+    crossed = np.zeros(width, dtype=np.bool_)
+    x = np.empty(width)
+    saved = np.empty(width)
+    steps = np.zeros(width, dtype=np.int64)
+    power = np.ones(width, dtype=np.int64)
+    distance = np.zeros(width, dtype=np.int64)
+    owner = np.arange(width)
+    for l in range(width):
+        x[l] = n_vals[l]
+        saved[l] = n_vals[l]
+    next_start = width
+    active = width
+
+    while active > 0:
+        # Retire lanes whose orbit ends at the current value; refill or compact
+        l = 0
+        while l < active:
+            if steps[l] == max_steps or abs(x[l]) >= max_value:
+                out[owner[l]] = steps[l]
+                lost[owner[l]] = crossed[l]
+                if next_start < num:
+                    owner[l] = next_start
+                    x[l] = n_vals[next_start]
+                    saved[l] = x[l]
+                    steps[l] = 0
+                    crossed[l] = False
+                    power[l] = 1
+                    distance[l] = 0
+                    next_start += 1
+                else:
+                    active -= 1
+                    owner[l] = owner[active]
+                    x[l] = x[active]
+                    saved[l] = saved[active]
+                    steps[l] = steps[active]
+                    power[l] = power[active]
+                    distance[l] = distance[active]
+                    crossed[l] = crossed[active]
+                continue
+            l += 1
+
+        # One step of every live lane
+        for l in range(active):
+            v = x[l]
+            half = v / 2
+            odd = a * v**2 + b * v + c
+            crossed[l] |= abs(v) >= FLOAT64_LIMIT
+            x[l] = half if v % 2 == 0 else odd
+
+        # Brent cycle check per lane; a cycled orbit would run to max_steps
+        for l in range(active):
+            steps[l] += 1
+            distance[l] += 1
+            if x[l] == saved[l]:
+                steps[l] = max_steps
+            elif distance[l] == power[l]:
+                saved[l] = x[l]
+                power[l] *= 2
+                distance[l] = 0
+    return out, lost
+
+def cell_stats(a, b, c, n_vals, max_steps, max_value, precision='float64'):
+    """
+    Average log(steps + 1) over the starts of one (a, b, c) cell under a precision
+    policy (see PRECISIONS), and the fraction of its orbits that lost precision.
+    Returns: (mean, lost_fraction)
+    """
+    code = PRECISION_FLOAT64 if precision == 'exact' else PRECISIONS.index(precision)
+    steps, lost = cell_steps(float(a), float(b), float(c), np.asarray(n_vals, dtype=np.int64), int(max_steps),
+                             float(max_value), code)
+    if precision == 'exact' and lost.any() and all(float(v).is_integer() for v in (a, b, c)):
+        for k in np.flatnonzero(lost):
+            steps[k] = simulate_exact(n_vals[k], a, b, c, max_steps, max_value)
+        lost[:] = False
+    return np.mean(np.log(steps + 1)), np.mean(lost)
+
+def compute_avg(a, b, c, n_vals, max_steps, max_value):
+    return cell_stats(a, b, c, n_vals, max_steps, max_value)[0]
+
+@numba.jit(nopython=True, cache=True)
+def find_root(parent, p):
+    while parent[p] != p:
+        parent[p] = parent[parent[p]]
+        p = parent[p]
+    return p
+
+@numba.jit(nopython=True, cache=True)
+def light_area_sweep(values, thresholds):
+    """
+    Largest 4-connected component of values < t for every threshold t, in one pass:
+    cells join a union-find forest in ascending order of value (the min-tree of the
+    slice), and each threshold is answered once all cells below it have joined.
+    Components only grow and merge, so the largest one can be tracked as cells join.
+    Ties go to the component with the first cell in raster order, as with
+    scipy.ndimage.label followed by argmax of the component sizes. NaN cells never join.
+    thresholds: ascending
+    Returns: (areas, boxes) - int64 (len(thresholds),) and int64 (len(thresholds), 4)
+             [min_i, max_i, min_j, max_j] index bounds, -1 where the area is 0
+    """
+    rows, cols = values.shape
+    flat = values.ravel()
+    order = np.argsort(flat, kind='mergesort')
+    parent = np.full(flat.size, -1, dtype=np.int64)  # -1: not joined yet
+    size = np.zeros(flat.size, dtype=np.int64)
+    first = np.zeros(flat.size, dtype=np.int64)  # first raster index of the component
+    box = np.zeros((flat.size, 4), dtype=np.int64)
+    areas = np.zeros(len(thresholds), dtype=np.int64)
+    boxes = np.full((len(thresholds), 4), -1, dtype=np.int64)
+    best = -1
+    k = 0
+    for t in range(len(thresholds)):
+        while k < flat.size and flat[order[k]] < thresholds[t]:
+            p = order[k]
+            k += 1
+            i = p // cols
+            j = p % cols
+            parent[p] = p
+            size[p] = 1
+            first[p] = p
+            box[p, 0] = i
+            box[p, 1] = i
+            box[p, 2] = j
+            box[p, 3] = j
+            root = p
+            for d in range(4):
+                if d == 0:
+                    if i == 0:
+                        continue
+                    q = p - cols
+                elif d == 1:
+                    if i == rows - 1:
+                        continue
+                    q = p + cols
+                elif d == 2:
+                    if j == 0:
+                        continue
+                    q = p - 1
+                else:
+                    if j == cols - 1:
+                        continue
+                    q = p + 1
+                if parent[q] < 0:
+                    continue
+                other = find_root(parent, q)
+                if other == root:
+                    continue
+                if size[other] > size[root]:
+                    root, other = other, root
+                parent[other] = root
+                size[root] += size[other]
+                first[root] = min(first[root], first[other])
+                box[root, 0] = min(box[root, 0], box[other, 0])
+                box[root, 1] = max(box[root, 1], box[other, 1])
+                box[root, 2] = min(box[root, 2], box[other, 2])
+                box[root, 3] = max(box[root, 3], box[other, 3])
+            if best >= 0:
+                best = find_root(parent, best)
+            if best < 0 or size[root] > size[best] or (size[root] == size[best] and first[root] < first[best]):
+                best = root
+        if best >= 0:
+            best = find_root(parent, best)
+            areas[t] = size[best]
+            boxes[t] = box[best]
+    return areas, boxes
+
+# Explicit signatures of the kernels as called by the generators; compiled ahead of time
+# into the on-disk cache by colatz-bench/jit_warmup.py
+KERNEL_SIGNATURES = {
+    'quadratic_step': ['float64(float64, float64, float64, float64)'],
+    'detect_cycle': ['(int64, float64, float64, float64, int64, float64)'],
+    'simulate_outcome': ['(int64, float64, float64, float64, int64, float64)'],
+    'simulate': ['int64(int64, float64, float64, float64, int64, float64)'],
+    'memo_slot': ['int64(float64, int64)'],
+    'memo_fill': ['void(int64[::1], bool[::1], int64[::1], int64[::1], int64, int64, int64, int64, bool)'],
+    'simulate_memo': ['(int64, float64, float64, float64, int64, float64, int64[::1], bool[::1], int64[::1], int64[::1])'],
+    'simulate_checked': ['(float32, float32, float32, float32, float32, int64, float64, float64)'],
+    'cell_steps_lockstep': ['(float64, float64, float64, int64[::1], int64, float64, int64)'],
+    'cell_steps': ['(float64, float64, float64, int64[::1], int64, float64, int64)'],
+    'find_root': ['int64(int64[::1], int64)'],
+    'light_area_sweep': ['(float64[:, ::1], float64[::1])'],
+}
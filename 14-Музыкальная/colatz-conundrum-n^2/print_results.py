@@ -1,8 +1,9 @@
 import pickle
 import numpy as np
+from dataset import load_grid
 
-with open('data_grid_3d.pkl', 'rb') as f:
-    data_dict = pickle.load(f)
+# Lazy: only the c slabs read below are loaded
+data_dict = load_grid('data_grid_3d.grid')
 
 a_vals = data_dict['a_vals']
 b_vals = data_dict['b_vals']
@@ -0,0 +1,55 @@
+"""
+Checkpointed volume runs: a run stopped after a few rows and resumed gives the same
+volume as an uninterrupted one.
+"""
+
+import json
+import os
+import numpy as np
+import pytest
+import data_generation_grid
+from data_generation_grid import fill_grid
+
+A_VALS = np.linspace(-2, 2, 10)
+B_VALS = np.linspace(-10, 10, 6)
+C_VALS = np.linspace(-20, 20, 4)
+N_VALS = np.arange(1, 31)
+
+
+def volume(checkpoint, **kwargs):
+    return fill_grid(A_VALS, B_VALS, C_VALS, N_VALS, 2000, 1e7, 1, checkpoint, **kwargs)
+
+
+def stop_after(monkeypatch, tasks):
+    """Make the run raise KeyboardInterrupt once the given number of tasks is in the manifest."""
+    original = data_generation_grid.save_manifest
+
+    def interrupted(path, manifest):
+        original(path, manifest)
+        if len(manifest['completed']) == tasks:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(data_generation_grid, 'save_manifest', interrupted)
+
+
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch):
+    # Channel 2 holds the measured seconds, which differ from run to run
+    reference = volume(str(tmp_path / 'reference.partial'))[..., :2]
+    checkpoint = str(tmp_path / 'grid.partial')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 4)
+        with pytest.raises(KeyboardInterrupt):
+            volume(checkpoint)
+    with open(os.path.join(checkpoint, 'manifest.json')) as f:
+        assert len(json.load(f)['completed']) == 4
+    resumed = volume(checkpoint, resume=True)[..., :2]
+    assert np.array_equal(resumed, reference)
+
+
+def test_resume_with_other_parameters_fails(tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / 'grid.partial')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            volume(checkpoint)
+    with pytest.raises(ValueError, match='Cannot resume'):
+        fill_grid(A_VALS, B_VALS, C_VALS, N_VALS, 3000, 1e7, 1, checkpoint, resume=True)
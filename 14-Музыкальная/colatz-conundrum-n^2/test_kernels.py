@@ -0,0 +1,22 @@
+"""
+Lockstep and scalar quadratic cell kernels agree on step counts and lost orbits.
+"""
+
+import numpy as np
+import pytest
+from kernels import PRECISION_FLOAT64, cell_steps, cell_steps_lockstep
+
+
+@pytest.mark.parametrize('max_value', [1e7, 1e18])
+def test_lockstep_matches_cell_steps(max_value):
+    n_vals = np.arange(1, 61)
+    any_lost = False
+    for a in np.linspace(-2, 2, 9):
+        for c in np.linspace(-20, 20, 9):
+            steps, lost = cell_steps(a, -3.0, c, n_vals, 5000, max_value, PRECISION_FLOAT64)
+            lockstep_steps, lockstep_lost = cell_steps_lockstep(a, -3.0, c, n_vals, 5000, max_value, 8)
+            assert np.array_equal(lockstep_steps, steps)
+            assert np.array_equal(lockstep_lost, lost)
+            any_lost |= lost.any()
+    # Below 1e7 the orbits escape long before FLOAT64_LIMIT
+    assert any_lost == (max_value > 1e16)
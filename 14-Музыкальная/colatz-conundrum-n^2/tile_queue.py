@@ -0,0 +1,390 @@
+"""
+Tile distribution over TCP, for running one generator's tiles on several machines.
+
+The generator is the coordinator: TileCoordinator stands in for its local Pool or
+ProcessPoolExecutor (apply_async, submit) but queues the tasks in a small server
+(multiprocessing.managers) that workers on any host connect to. Workers are started
+from a copy of the same study directory, so they import the same modules:
+
+    python tile_queue.py HOST:PORT --authkey KEY --processes 32
+
+Every worker process runs the generator's initializer once per run, then leases one
+task at a time, computes it with the existing kernels and pushes the result back.
+While it computes it renews its lease; the task of a worker that stops renewing
+(killed, host lost) goes back to the queue when the lease runs out, and a task that
+raised is retried up to max_attempts times. Several worker processes on one host
+stand in for nodes when testing.
+
+Tasks and results are pickled, so anyone holding the authkey can run code on the
+coordinator and the workers: only serve on a trusted network. The coordinator takes its
+key from the generator or COLLATZ_AUTHKEY, else makes up a random one for the run; a
+key not from the environment is printed with the worker command line. Workers take it
+from --authkey or COLLATZ_AUTHKEY and refuse to start without it.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import multiprocessing
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+import traceback
+import uuid
+from multiprocessing.managers import BaseManager
+
+DEFAULT_PORT = 50071
+AUTHKEY_VARIABLE = 'COLLATZ_AUTHKEY'
+
+class TaskQueue:
+    """
+    Tasks of one run, kept in the coordinator's manager process. Tasks are leased to
+    workers; leases that ran out are returned to the queue whenever a worker asks for work.
+    """
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.run = None
+        self.lease_seconds = 60.0
+        self.max_attempts = 3
+        self.tasks = {}  # task id -> (function reference, args)
+        self.pending = collections.deque()
+        self.leases = {}  # task id -> (worker, deadline)
+        self.attempts = collections.Counter()
+        self.results = collections.deque()
+        self.closed = False
+
+    def start(self, initializer, initargs, lease_seconds, max_attempts):
+        with self.lock:
+            self.run = (uuid.uuid4().hex, initializer, initargs, lease_seconds)
+            self.lease_seconds = lease_seconds
+            self.max_attempts = max_attempts
+
+    def job(self):
+        """(run id, initializer reference, initargs, lease seconds), or None before start."""
+        return self.run
+
+    def put(self, task_id, function, args):
+        with self.lock:
+            self.tasks[task_id] = (function, args)
+            self.pending.append(task_id)
+            self.lock.notify_all()
+
+    def lease(self, worker, timeout=1.0):
+        """
+        Hand the next task to worker, waiting up to timeout for one.
+        Returns: (task id, function reference, args), None if no task came up, or False once the run is over
+        """
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while True:
+                self.expire()
+                if self.closed:
+                    return False
+                if self.pending:
+                    task_id = self.pending.popleft()
+                    self.leases[task_id] = (worker, time.monotonic() + self.lease_seconds)
+                    self.attempts[task_id] += 1
+                    return (task_id,) + self.tasks[task_id]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.lock.wait(min(remaining, 1.0))
+
+    def renew(self, task_id, worker):
+        """Extend worker's lease on task_id. Returns: False if the lease was lost meanwhile"""
+        with self.lock:
+            if self.leases.get(task_id, (None,))[0] != worker:
+                return False
+            self.leases[task_id] = (worker, time.monotonic() + self.lease_seconds)
+            return True
+
+    def complete(self, task_id, worker, result):
+        """Store a result; late results of a task that was already completed are dropped."""
+        with self.lock:
+            if task_id not in self.tasks:
+                return
+            del self.tasks[task_id]
+            self.leases.pop(task_id, None)
+            if task_id in self.pending:
+                # A worker whose lease had run out finished after all
+                self.pending.remove(task_id)
+            self.results.append((task_id, True, result))
+            self.lock.notify_all()
+
+    def fail(self, task_id, worker, message):
+        """Queue the task again after an error, or report it once it used max_attempts."""
+        with self.lock:
+            if task_id in self.tasks and self.leases.get(task_id, (None,))[0] == worker:
+                del self.leases[task_id]
+                self.retry(task_id, f"Worker {worker} raised:\n{message}")
+
+    def retry(self, task_id, reason):
+        if self.attempts[task_id] < self.max_attempts:
+            self.pending.appendleft(task_id)
+        else:
+            del self.tasks[task_id]
+            self.results.append((task_id, False, f"{reason}\n(after {self.attempts[task_id]} attempts)"))
+        self.lock.notify_all()
+
+    def expire(self):
+        now = time.monotonic()
+        for task_id, (worker, deadline) in list(self.leases.items()):
+            if deadline < now:
+                del self.leases[task_id]
+                self.retry(task_id, f"Worker {worker} stopped renewing its lease")
+
+    def take_results(self, timeout=0.5):
+        """Finished tasks as (task id, ok, result or error message), waiting up to timeout for one."""
+        with self.lock:
+            if not self.results:
+                self.lock.wait(timeout)
+                self.expire()
+            results = list(self.results)
+            self.results.clear()
+            return results
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+
+_queue = None
+
+def shared_queue():
+    """The task queue of this manager process, shared by all connections."""
+    global _queue
+    if _queue is None:
+        _queue = TaskQueue()
+    return _queue
+
+class TileManager(BaseManager):
+    pass
+
+TileManager.register('queue', callable=shared_queue)
+
+def function_ref(function):
+    """(module, name) by which workers import function; scripts run as __main__ go by file name."""
+    module = function.__module__
+    if module == '__main__':
+        module = os.path.splitext(os.path.basename(sys.modules['__main__'].__file__))[0]
+    return module, function.__qualname__
+
+def resolve(ref):
+    module, name = ref
+    return getattr(importlib.import_module(module), name)
+
+def parse_address(text):
+    """(host, port) from HOST:PORT, HOST or :PORT; an empty host means all interfaces (or this host)."""
+    host, colon, port = text.rpartition(':')
+    if not colon:
+        return text, DEFAULT_PORT
+    return host, int(port)
+
+def coordinator_authkey(authkey=None):
+    """authkey, else COLLATZ_AUTHKEY, else a new random key."""
+    return authkey or os.environ.get(AUTHKEY_VARIABLE) or secrets.token_hex(16)
+
+class TileCoordinator:
+    """
+    Pool-like front of a task queue served to remote workers (see the module docstring).
+    Use it as a context manager in place of a Pool or ProcessPoolExecutor; every worker
+    process runs initializer(*initargs) once before its first task.
+    address: (host, port) to listen on; host '' listens on all interfaces, port 0 picks a
+    free port (self.address holds the actual one once entered)
+    authkey: shared secret of the workers (see coordinator_authkey), printed with the
+    worker command line unless it comes from COLLATZ_AUTHKEY
+    lease_seconds: how long a task may go without a lease renewal before it is handed out again
+    """
+    def __init__(self, address=('', DEFAULT_PORT), initializer=None, initargs=(), authkey=None,
+                 lease_seconds=60.0, max_attempts=3):
+        self.address = address
+        self.initializer = initializer
+        self.initargs = initargs
+        authkey = coordinator_authkey(authkey)
+        self.authkey = authkey.encode() if isinstance(authkey, str) else authkey
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.futures = {}
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def __enter__(self):
+        self.manager = TileManager(self.address, authkey=self.authkey)
+        self.manager.start()
+        self.queue = self.manager.queue()
+        initializer = function_ref(self.initializer) if self.initializer else None
+        self.queue.start(initializer, self.initargs, self.lease_seconds, self.max_attempts)
+        self.collector = threading.Thread(target=self.collect, daemon=True)
+        self.collector.start()
+        self.address = self.manager.address
+        host, port = self.address
+        if host in ('', '0.0.0.0'):
+            host = socket.gethostname()
+        if self.authkey == os.environ.get(AUTHKEY_VARIABLE, '').encode():
+            key = f" (with {AUTHKEY_VARIABLE} set as here)"
+        else:
+            key = f" --authkey {self.authkey.decode()}"
+        print(f"Serving tiles on {host}:{port}; "
+              f"start workers with: python tile_queue.py {socket.gethostname()}:{port}{key}")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopping.set()
+        self.collector.join()
+        self.queue.close()
+        # Let idle workers see the end of the run before the server goes away
+        time.sleep(min(1.0, self.lease_seconds))
+        self.manager.shutdown()
+        for future in self.futures.values():
+            future.cancel()
+        return False
+
+    def submit(self, function, *args):
+        """Queue function(*args) for the workers. Returns: concurrent.futures.Future"""
+        future = concurrent.futures.Future()
+        with self.lock:
+            task_id = self.next_id
+            self.next_id += 1
+            self.futures[task_id] = future
+        self.queue.put(task_id, function_ref(function), args)
+        return future
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        """As multiprocessing.Pool.apply_async; the callbacks run in the result collector thread."""
+        def done(future):
+            error = future.exception()
+            if error is None:
+                if callback is not None:
+                    callback(future.result())
+            elif error_callback is not None:
+                error_callback(error)
+        future = self.submit(func, *args)
+        future.add_done_callback(done)
+        return future
+
+    def collect(self):
+        while not self.stopping.is_set():
+            for task_id, ok, value in self.queue.take_results(0.5):
+                with self.lock:
+                    future = self.futures.pop(task_id)
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(f"Tile task {task_id} failed: {value}"))
+
+def run_worker(address, authkey, wait_seconds=60.0):
+    """
+    Compute tasks for the coordinator at address, run after run, until it has been
+    unreachable for wait_seconds.
+    """
+    worker = Worker((address[0] or 'localhost', address[1]), authkey)
+    while time.monotonic() - worker.last_seen < wait_seconds:
+        try:
+            worker.work_run()
+        except (ConnectionError, EOFError):
+            pass
+        time.sleep(1.0)
+
+class Worker:
+    """State a worker process keeps between runs and reconnects."""
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey.encode() if isinstance(authkey, str) else authkey
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.initialized = None
+        self.last_seen = time.monotonic()
+
+    def work_run(self):
+        """Connect to the coordinator and compute tasks of its current run until it is over."""
+        # Every run gets a fresh manager connection and queue proxy. Proxies share one
+        # connection per thread and server address, which is closed once the last of them
+        # is gone, so dropping this one with the call also drops a connection to a
+        # coordinator that went away instead of handing it to the next one on the address
+        manager = TileManager(self.address, authkey=self.authkey)
+        manager.connect()
+        queue = manager.queue()
+        run = queue.job()
+        self.last_seen = time.monotonic()
+        if run is None:
+            return
+        run_id, initializer, initargs, lease_seconds = run
+        if run_id != self.initialized:
+            if initializer is not None:
+                resolve(initializer)(*initargs)
+            self.initialized = run_id
+        with Heartbeat(queue, self.name, lease_seconds / 4) as heartbeat:
+            while True:
+                task = queue.lease(self.name)
+                self.last_seen = time.monotonic()
+                if task is False:
+                    return
+                if task is not None:
+                    run_task(queue, self.name, heartbeat, *task)
+
+def run_task(queue, name, heartbeat, task_id, function, args):
+    heartbeat.task = task_id
+    try:
+        result = resolve(function)(*args)
+    except Exception:
+        queue.fail(task_id, name, traceback.format_exc())
+        return
+    finally:
+        heartbeat.task = None
+    queue.complete(task_id, name, result)
+
+class Heartbeat:
+    """Background thread renewing the lease of the worker's current task every interval seconds."""
+    def __init__(self, queue, name, interval):
+        self.queue = queue
+        self.name = name
+        self.interval = interval
+        self.task = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+        return False
+
+    def beat(self):
+        while not self.stop.wait(self.interval):
+            task = self.task
+            if task is not None:
+                try:
+                    self.queue.renew(task, self.name)
+                except (ConnectionError, EOFError):
+                    return
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compute tiles for a generator serving them over TCP.')
+    parser.add_argument('address', help=f'Coordinator HOST:PORT (default port {DEFAULT_PORT})')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Worker processes on this host (default: one per CPU)')
+    parser.add_argument('--authkey', default=os.environ.get(AUTHKEY_VARIABLE),
+                        help=f'Shared secret the coordinator printed (default: {AUTHKEY_VARIABLE})')
+    parser.add_argument('--wait', type=float, default=60.0,
+                        help='Seconds to keep trying while the coordinator is unreachable (default: 60)')
+    args = parser.parse_args()
+    if not args.authkey:
+        parser.error(f"the coordinator's key is required: pass --authkey or set {AUTHKEY_VARIABLE}")
+
+    address = parse_address(args.address)
+    if args.processes == 1:
+        run_worker(address, args.authkey, args.wait)
+        sys.exit()
+    workers = [multiprocessing.Process(target=run_worker, args=(address, args.authkey, args.wait))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
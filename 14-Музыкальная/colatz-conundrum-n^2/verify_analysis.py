@@ -1,19 +1,18 @@
-import pickle
+from dataset import load_grid
 import numpy as np
 
 def verify_data():
-    print("Loading data_grid_3d.pkl...")
+    print("Loading data_grid_3d.grid...")
     try:
-        with open('data_grid_3d.pkl', 'rb') as f:
-            data_dict = pickle.load(f)
+        data_dict = load_grid('data_grid_3d.grid')
     except FileNotFoundError:
-        print("Error: data_grid_3d.pkl not found.")
+        print("Error: data_grid_3d.grid not found.")
         return
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data = data_dict['data']
+    data = np.asarray(data_dict['data'])
 
     print(f"Data shape: {data.shape}")
     print(f"a range: [{a_vals.min()}, {a_vals.max()}]")
@@ -1,18 +1,17 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import plotly.graph_objects as go
 
 def plot_3d_phase_map(data_file, output_html='1graph_3d_phase_map.html'):
     """
     Load 3D data and plot interactive 3D scatter plot with color by metric using Plotly (GPU-accelerated via WebGL).
     """
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data = data_dict['data']
+    data = np.asarray(data_dict['data'])
 
     # Create meshgrid for scatter
     A, B, C = np.meshgrid(a_vals, b_vals, c_vals, indexing='ij')
@@ -63,4 +62,4 @@ def plot_3d_phase_map(data_file, output_html='1graph_3d_phase_map.html'):
     print(f"Interactive 3D plot saved to {output_html}. Open in browser to view with GPU acceleration.")
 
 if __name__ == "__main__":
-    plot_3d_phase_map('data_grid_3d.pkl')
\ No newline at end of file
+    plot_3d_phase_map('data_grid_3d.grid')
\ No newline at end of file
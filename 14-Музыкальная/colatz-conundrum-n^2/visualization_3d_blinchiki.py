@@ -1,17 +1,16 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import plotly.graph_objects as go
 from skimage import measure
 from scipy.ndimage import gaussian_filter
 
-def create_3d_blinchiki(data_file='data_grid_3d.pkl', output_html='1graph_3d_blinchiki.html'):
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+def create_3d_blinchiki(data_file='data_grid_3d.grid', output_html='1graph_3d_blinchiki.html'):
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data_3d = data_dict['data']
+    data_3d = np.asarray(data_dict['data'])
 
     # Thresholds
     thresholds = np.linspace(np.min(data_3d), np.max(data_3d), 15)
@@ -1,16 +1,15 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import pyvista as pv
 import plotly.graph_objects as go
 
-def create_3d_mesh(data_file='data_grid_3d.pkl', output_html='1graph_3d_mesh.html', isosurface_value=None):
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+def create_3d_mesh(data_file='data_grid_3d.grid', output_html='1graph_3d_mesh.html', isosurface_value=None):
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data_3d = data_dict['data']
+    data_3d = np.asarray(data_dict['data'])
 
     # Create 3D grid
     grid = pv.ImageData()
@@ -1,10 +1,9 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import plotly.graph_objects as go
 
-def create_3d_slices_animation(data_file='data_grid_3d.pkl', output_html='1graph_3d_slices_animation.html'):
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+def create_3d_slices_animation(data_file='data_grid_3d.grid', output_html='1graph_3d_slices_animation.html'):
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
@@ -1,10 +1,9 @@
 import numpy as np
-import pickle
 import plotly.graph_objects as go
+from data_generation_animation import load_animation_data
 
 def create_animation(data_file, output_html='1graph_animation.html'):
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_animation_data(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
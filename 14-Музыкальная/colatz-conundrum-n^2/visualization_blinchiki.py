@@ -1,11 +1,10 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import plotly.graph_objects as go
 from skimage import measure
 
-def create_blinchiki_animation(data_file='data_grid_3d.pkl', c_index=25, output_html='1graph_blinchiki.html'):
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+def create_blinchiki_animation(data_file='data_grid_3d.grid', c_index=25, output_html='1graph_blinchiki.html'):
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
@@ -1,18 +1,17 @@
-import pickle
+from dataset import load_grid
 import numpy as np
 import plotly.graph_objects as go
 from skimage import measure
 from scipy.ndimage import gaussian_filter
 
-def create_dark_tower_viz(data_file='data_grid_3d.pkl', output_html='1graph_3d_dark_tower.html'):
+def create_dark_tower_viz(data_file='data_grid_3d.grid', output_html='1graph_3d_dark_tower.html'):
     print(f"Loading {data_file}...")
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data_3d = data_dict['data']
+    data_3d = np.asarray(data_dict['data'])
 
     # We are interested in HIGH values (slow convergence/divergence)
     # The center is around 7.2, max is 9.2. Background is < 2.0.
@@ -127,15 +126,14 @@ def create_dark_tower_viz(data_file='data_grid_3d.pkl', output_html='1graph_3d_d
     fig.write_html(output_html)
     print(f"Saved animation to {output_html}")
 
-def create_3d_isosurface(data_file='data_grid_3d.pkl', output_html='1graph_3d_dark_isosurface.html'):
+def create_3d_isosurface(data_file='data_grid_3d.grid', output_html='1graph_3d_dark_isosurface.html'):
     print(f"Loading {data_file}...")
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c_vals = data_dict['c_vals']
-    data_3d = data_dict['data']
+    data_3d = np.asarray(data_dict['data'])
     
     # Create meshgrid
     B, A, C = np.meshgrid(b_vals, a_vals, c_vals)
@@ -1,18 +1,17 @@
 import numpy as np
-import pickle
+from dataset import load_grid
 import matplotlib.pyplot as plt
 
 def plot_phase_map(data_file, output_image='1graph_phase_map.png'):
     """
-    Load data from pickle and plot the phase map.
+    Load the grid dataset and plot the phase map.
     """
-    with open(data_file, 'rb') as f:
-        data_dict = pickle.load(f)
+    data_dict = load_grid(data_file)
 
     a_vals = data_dict['a_vals']
     b_vals = data_dict['b_vals']
     c = data_dict['c']
-    data = data_dict['data']
+    data = np.asarray(data_dict['data'])
 
     plt.figure(figsize=(10, 8))
     plt.imshow(data, extent=[b_vals.min(), b_vals.max(), a_vals.min(), a_vals.max()],
@@ -26,4 +25,4 @@ def plot_phase_map(data_file, output_image='1graph_phase_map.png'):
     print(f"Plot saved to {output_image}")
 
 if __name__ == "__main__":
-    plot_phase_map('data_grid.pkl')
\ No newline at end of file
+    plot_phase_map('data_grid.grid')
\ No newline at end of file
@@ -7,10 +7,10 @@ Includes criteria for light/death zones based on coefficient norms.
 
 import numpy as np
 from numba import jit
-from helper_utils import load_data, log_message
+from helper_utils import load_data, log_message, find_convergence_data, packed_convergence_rate
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def compute_convergence_rate(data):
     """
     Compute convergence rate for each parameter set.
@@ -31,6 +31,27 @@ def compute_convergence_rate(data):
     return rates
 
 
+KERNEL_SIGNATURES = {
+    'compute_convergence_rate': ['float64[::1](int64[:, :, ::1])'],
+}
+
+
+def load_convergence_rates(data_prefix, degree):
+    """
+    Per-coefficient convergence rates from saved data in any encoding
+    (full tensor, compact lengths + packed flags, or aggregated summary).
+
+    Returns:
+    - rates: array of convergence rates (0 to 1)
+    """
+    encoding, arrays = find_convergence_data(data_prefix, degree)
+    if encoding == 'full':
+        return compute_convergence_rate(np.ascontiguousarray(arrays['convergence']))
+    if encoding == 'compact':
+        return packed_convergence_rate(arrays['converged'], arrays['lengths'].shape[1])
+    return np.array(arrays['summary'][:, 0])
+
+
 def identify_light_zone(coeff_grid, convergence_rates, threshold=0.8):
     """
     Identify the 'light zone' where convergence rate is high.
@@ -163,13 +184,10 @@ def analyze_degree(degree, data_prefix='data'):
 
     # Load data
     coeff_filename = f"{data_prefix}_coeffs_degree_{degree}.npy"
-    data_filename = f"{data_prefix}_convergence_degree_{degree}.npy"
-
     coeff_grid = load_data(coeff_filename)
-    convergence_data = load_data(data_filename)
 
     # Compute convergence rates
-    convergence_rates = compute_convergence_rate(convergence_data)
+    convergence_rates = load_convergence_rates(data_prefix, degree)
 
     # Identify zones
     light_indices, light_coeffs = identify_light_zone(coeff_grid, convergence_rates)
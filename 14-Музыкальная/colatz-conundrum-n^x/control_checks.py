@@ -9,6 +9,8 @@ from helper_utils import (
     collatz_polynomial_step,
     simulate_trajectory,
     batch_simulate_trajectories,
+    find_convergence_data,
+    unpack_convergence,
     load_data,
     log_message
 )
@@ -95,10 +97,10 @@ def compare_implementations(coeffs, n_start=27, max_steps=100):
         if n % 2 == 0:
             return n // 2
         else:
-            degree = len(coeffs) - 1
-            result = 0
-            for i in range(len(coeffs)):
-                result += coeffs[i] * (n ** (degree - i))
+            # Horner's rule, as the Numba kernels evaluate P(n)
+            result = coeffs[0]
+            for i in range(1, len(coeffs)):
+                result = result * n + coeffs[i]
             return int(result)
 
     def simulate_py(n, coeffs, max_steps):
@@ -112,9 +114,10 @@ def compare_implementations(coeffs, n_start=27, max_steps=100):
                 return traj, False
         return traj, False
 
-    traj_py, conv_py = simulate_py(n_start, coeffs, max_steps)
+    # Python numbers, so that big values are exact instead of wrapping in NumPy scalars
+    traj_py, conv_py = simulate_py(n_start, np.asarray(coeffs).tolist(), max_steps)
 
-    consistent = (len(traj_numba) == len(traj_py)) and (conv_numba == conv_py)
+    consistent = (len(traj_numba) == len(traj_py)) and (conv_numba == conv_py) and list(traj_numba) == traj_py
     if not consistent:
         log_message(f"Trajectory lengths: Numba {len(traj_numba)}, Python {len(traj_py)}")
         log_message(f"Convergence: Numba {conv_numba}, Python {conv_py}")
@@ -182,16 +185,22 @@ def run_all_checks(degree, data_prefix='data'):
     # Load data
     try:
         coeff_filename = f"{data_prefix}_coeffs_degree_{degree}.npy"
-        data_filename = f"{data_prefix}_convergence_degree_{degree}.npy"
         coeff_grid = load_data(coeff_filename)
-        convergence_data = load_data(data_filename)
+        encoding, arrays = find_convergence_data(data_prefix, degree)
     except FileNotFoundError:
         log_message(f"ERROR: Data files not found for degree {degree}", 'ERROR')
         return False
 
     # Validate data
-    if not validate_convergence_data(coeff_grid, convergence_data):
-        all_passed = False
+    if encoding == 'aggregate':
+        log_message("Only aggregated data saved, skipping per-trajectory validation")
+    else:
+        if encoding == 'compact':
+            convergence_data = unpack_convergence(arrays['lengths'], arrays['converged'])
+        else:
+            convergence_data = arrays['convergence']
+        if not validate_convergence_data(coeff_grid, convergence_data):
+            all_passed = False
 
     # Sanity checks
     if not sanity_check_basic_collatz():
@@ -200,8 +209,8 @@ def run_all_checks(degree, data_prefix='data'):
     # Implementation comparison
     test_coeffs = np.array([0.1, 0.1, 0.1]) if degree == 2 else np.array([3, 1])  # Use small coeffs for higher degrees
     if not compare_implementations(test_coeffs):
-        log_message("WARNING: Implementations may disagree for large coefficients", 'WARNING')
-        # Don't fail the check for now, as this might be due to numerical precision
+        log_message("ERROR: Numba and Python implementations disagree", 'ERROR')
+        all_passed = False
 
     # Stress test
     stress_results = stress_test_large_numbers(test_coeffs)
@@ -5,13 +5,32 @@ Generates parameter grids and computes trajectories for analysis.
 Optimized with Numba for parallel processing on multi-core Ryzen 9950X.
 """
 
+import json
+import os
+import time
 import numpy as np
+from numpy.lib.format import open_memmap
+import numba
 from numba import jit, prange
 from helper_utils import (
     collatz_polynomial_step,
     simulate_trajectory,
     batch_simulate_trajectories,
+    trajectory_stats,
+    resolve_unresolved,
     generate_parameter_grid,
+    parameter_axes,
+    decode_coefficients,
+    fill_parameter_rows,
+    grid_size,
+    CONVERGENCE_ENCODINGS,
+    SUMMARY_FIELDS,
+    convergence_filenames,
+    run_manifest_filename,
+    find_convergence_data,
+    length_dtype,
+    pack_convergence,
+    summarize_trajectories,
     save_data,
     log_message
 )
@@ -31,38 +50,401 @@ def generate_coefficient_ranges(degree, default_range=(-2, 2)):
     return [default_range] * (degree + 1)
 
 
-@jit(nopython=True, parallel=True)
-def compute_convergence_grid(coeff_grid, start_range, max_steps=1000, max_value=10**18):
+@jit(nopython=True, cache=True)
+def start_values(start_range):
+    """Starting numbers sampled from start_range = (min, max, num_samples)."""
+    return np.arange(start_range[0], start_range[1], (start_range[1] - start_range[0]) // start_range[2])
+
+
+# Scheduling of the convergence kernels. Their prange runs over the flattened
+# (coefficient row, start) space in chunks handed out dynamically to idle threads
+# (numba.set_parallel_chunksize), so rows whose orbits escape at once and rows that
+# run to max_steps even out instead of pinning whole static blocks to one thread.
+# The rows are also walked longest first, so the rows that run to max_steps are not
+# the last ones handed out. Their cost is the mean trajectory length a previous run
+# on the same grid recorded (see recorded_row_costs); without one, a pilot pass
+# computes the first start of every row and the length it gives predicts the rest.
+CHUNKS_PER_THREAD = 64
+# Per-thread work counters are kept a cache line (8 x int64) apart
+WORK_PAD = 8
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def convergence_results(coeffs, starts, max_steps, max_value, row_costs, thread_work):
+    """
+    (len(coeffs), len(starts), 2) trajectory lengths and converged flags, computed in
+    longest-first row order; unresolved entries have length 0.
+    row_costs: predicted cost per row (e.g. from recorded_row_costs), or an empty array
+    to predict it with a pilot pass over the first start of every row
+    thread_work: (threads, WORK_PAD) int64 counters; thread t adds the trajectory
+    lengths it computed to thread_work[t, 0]
+    """
+    num_coeffs = coeffs.shape[0]
+    num_starts = len(starts)
+    results = np.zeros((num_coeffs, num_starts, 2), dtype=np.int64)
+    if num_starts == 0:
+        return results
+
+    if len(row_costs) == num_coeffs:
+        order = np.argsort(-row_costs, kind='mergesort')
+        first = 0
+    else:
+        # Pilot: the first start of every row, kept as part of the results
+        for i in prange(num_coeffs):
+            length, conv, _, _, _ = trajectory_stats(starts[0], coeffs[i], max_steps, max_value)
+            results[i, 0, 0] = length
+            results[i, 0, 1] = int(conv)
+            thread_work[numba.get_thread_id(), 0] += length
+        order = np.argsort(-results[:, 0, 0], kind='mergesort')
+        first = 1
+
+    rest = num_starts - first
+    for item in prange(num_coeffs * rest):
+        i = order[item // rest]
+        k = first + item % rest
+        length, conv, _, _, _ = trajectory_stats(starts[k], coeffs[i], max_steps, max_value)
+        results[i, k, 0] = length
+        results[i, k, 1] = int(conv)
+        thread_work[numba.get_thread_id(), 0] += length
+
+    return results
+
+
+@jit(nopython=True, cache=True)
+def convergence_grid_kernel(coeff_grid, start_range, max_steps, max_value, thread_work):
+    """
+    Kernel of compute_convergence_grid; unresolved entries have length 0.
+    thread_work: as in convergence_results
+    """
+    return convergence_results(coeff_grid, start_values(start_range), max_steps, max_value, np.empty(0),
+                               thread_work)
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def convergence_chunk_kernel(axes, first, coeff_out, start_range, max_steps, max_value, row_costs, thread_work):
+    """
+    Kernel over rows first .. first + len(coeff_out) of the grid spanned by axes.
+    Coefficients are decoded from the row index on the fly and written to coeff_out.
+    Unresolved entries have length 0.
+    row_costs, thread_work: as in convergence_results
+    """
+    for i in prange(coeff_out.shape[0]):
+        decode_coefficients(axes, first + i, coeff_out[i])
+
+    return convergence_results(coeff_out, start_values(start_range), max_steps, max_value, row_costs, thread_work)
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def convergence_summary_kernel(coeff_grid, start_range, max_steps, max_value, row_costs, thread_work):
+    """
+    Aggregating kernel: reduces the results of every coefficient set over the starts
+    (see summarize_trajectories). The (num_coeffs, num_starts, 2) results of the rows
+    passed in (one chunk) are transient and not returned.
+    Returns (summary, unresolved) where unresolved flags rows that need the big-int path.
+    row_costs, thread_work: as in convergence_results
+    """
+    num_coeffs = coeff_grid.shape[0]
+    results = convergence_results(coeff_grid, start_values(start_range), max_steps, max_value, row_costs,
+                                  thread_work)
+
+    summary = np.zeros((num_coeffs, 4))
+    unresolved = np.zeros(num_coeffs, dtype=np.bool_)
+    for i in prange(num_coeffs):
+        unresolved[i] = np.any(results[i, :, 0] == 0)
+        summary[i] = summarize_trajectories(results[i])
+
+    return summary, unresolved
+
+
+def new_thread_work():
+    """Zeroed per-thread work counters for the convergence kernels."""
+    return np.zeros((numba.get_num_threads(), WORK_PAD), dtype=np.int64)
+
+
+def run_scheduled(kernel, num_items, *args, thread_work=None):
+    """
+    Call a convergence kernel over num_items flattened (row, start) items with dynamic
+    chunk scheduling; its work counters are added to thread_work when given.
+    """
+    work = new_thread_work()
+    chunk = max(1, num_items // (work.shape[0] * CHUNKS_PER_THREAD))
+    previous = numba.set_parallel_chunksize(chunk)
+    try:
+        out = kernel(*args, work)
+    finally:
+        numba.set_parallel_chunksize(previous)
+    if thread_work is not None:
+        thread_work[:len(work)] += work
+    return out
+
+
+def thread_utilization(thread_work):
+    """
+    Per-thread utilization: the orbit steps each thread computed, relative to the busiest
+    thread, which bounds the run time. Returns: (per-thread fractions, their mean)
+    """
+    steps = thread_work[:, 0].astype(np.float64)
+    if steps.max() == 0:
+        return np.ones(len(steps)), 1.0
+    share = steps / steps.max()
+    return share, float(share.mean())
+
+
+def format_utilization(thread_work):
+    share, mean = thread_utilization(thread_work)
+    return f"Thread utilization {mean:.0%} (" + " ".join(f"{s:.0%}" for s in share) + ")"
+
+
+def is_integral_grid(coeff_grid):
+    """True if every coefficient is a whole number that fits comfortably in int64."""
+    if np.issubdtype(coeff_grid.dtype, np.integer):
+        return True
+    return bool(np.all(np.isfinite(coeff_grid)) and np.all(coeff_grid == np.round(coeff_grid))
+                and np.all(np.abs(coeff_grid) < 2.0 ** 62))
+
+
+def convergence_rows(coeff_rows, start_range, max_steps=1000, max_value=10**18, thread_work=None):
+    """Full results for explicit coefficient rows, with unresolved trajectories resolved."""
+    starts = start_values(start_range)
+    results = run_scheduled(convergence_grid_kernel, len(coeff_rows) * len(starts),
+                            coeff_rows, start_range, max_steps, max_value, thread_work=thread_work)
+
+    # Trajectories that outgrew 128-bit arithmetic are redone with Python integers
+    for i in np.unique(np.nonzero(results[:, :, 0] == 0)[0]):
+        resolve_unresolved(results[i], starts, coeff_rows[i], max_steps, max_value)
+
+    return results
+
+
+def summary_rows(coeff_rows, start_range, max_steps=1000, max_value=10**18, thread_work=None, row_costs=None):
+    """
+    Aggregated results (SUMMARY_FIELDS) for explicit coefficient rows.
+    row_costs: optional predicted cost per row, ordering the rows instead of a pilot pass
+    """
+    starts = start_values(start_range)
+    row_costs = np.empty(0) if row_costs is None else np.ascontiguousarray(row_costs, dtype=np.float64)
+    summary, unresolved = run_scheduled(convergence_summary_kernel, len(coeff_rows) * len(starts),
+                                        coeff_rows, start_range, max_steps, max_value, row_costs,
+                                        thread_work=thread_work)
+
+    for i in np.flatnonzero(unresolved):
+        summary[i] = summarize_trajectories(batch_simulate_trajectories(starts, coeff_rows[i], max_steps, max_value))
+
+    return summary
+
+
+def encode_rows(coeff_rows, start_range, max_steps=1000, max_value=10**18, encoding='full', thread_work=None):
+    """Results for explicit coefficient rows in the given encoding."""
+    if encoding == 'aggregate':
+        return summary_rows(coeff_rows, start_range, max_steps, max_value, thread_work)
+    results = convergence_rows(coeff_rows, start_range, max_steps, max_value, thread_work)
+    if encoding == 'compact':
+        return pack_convergence(results, max_steps)
+    return results
+
+
+def compute_convergence_grid(coeff_grid, start_range, max_steps=1000, max_value=10**18,
+                             encoding='full', chunk_size=16384, thread_work=None):
     """
     Compute convergence statistics for a grid of coefficients.
+    Grids made only of whole numbers are evaluated with exact integer arithmetic.
 
     Parameters:
     - coeff_grid: 2D array of coefficients (num_coeffs, degree+1)
     - start_range: range of starting numbers (min, max, num_samples)
     - max_steps, max_value: simulation parameters
+    - encoding: 'full', 'compact' or 'aggregate' (see helper_utils.CONVERGENCE_ENCODINGS)
+    - chunk_size: rows per kernel call for the compact and aggregate encodings
+    - thread_work: optional counters from new_thread_work that accumulate the work done
+                   per thread (see format_utilization)
 
     Returns:
-    - convergence_data: array of shape (num_coeffs, num_starts, 2)
-                       where [:, :, 0] is trajectory length, [:, :, 1] is converged flag
+    - 'full': array of shape (num_coeffs, num_starts, 2)
+              where [:, :, 0] is trajectory length, [:, :, 1] is converged flag
+    - 'compact': (lengths, converged) as returned by pack_convergence
+    - 'aggregate': array of shape (num_coeffs, len(SUMMARY_FIELDS))
     """
-    starts = np.arange(start_range[0], start_range[1], (start_range[1] - start_range[0]) // start_range[2])
-    num_coeffs, degree_plus_1 = coeff_grid.shape
-    num_starts = len(starts)
+    if encoding not in CONVERGENCE_ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {CONVERGENCE_ENCODINGS}")
+    start_range = tuple(int(v) for v in start_range)
+    # Grids of whole numbers take the exact integer kernel, compiled once per dtype
+    if is_integral_grid(coeff_grid):
+        coeff_grid = coeff_grid.astype(np.int64)
+    if encoding == 'full':
+        return convergence_rows(coeff_grid, start_range, max_steps, max_value, thread_work)
 
-    results = np.zeros((num_coeffs, num_starts, 2), dtype=np.int64)
+    # Only one chunk of full results is alive at a time
+    parts = [encode_rows(coeff_grid[first:first + chunk_size], start_range, max_steps, max_value, encoding,
+                         thread_work)
+             for first in range(0, len(coeff_grid), chunk_size)]
+    if encoding == 'compact':
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+    return np.concatenate(parts)
 
-    for i in prange(num_coeffs):
-        coeffs = coeff_grid[i]
-        batch_results = batch_simulate_trajectories(starts, coeffs, max_steps, max_value)
-        results[i] = batch_results
 
-    return results
+def iter_convergence_chunks(axes, start_range, max_steps=1000, max_value=10**18, chunk_size=16384,
+                            encoding='full', skip=(), thread_work=None, row_costs=None):
+    """
+    Compute convergence statistics over the grid spanned by axes, chunk by chunk.
+    Only one chunk of coefficients and results is held in memory at a time.
+
+    Parameters:
+    - axes: 2D array (degree+1, num_points) from parameter_axes
+    - start_range, max_steps, max_value, encoding: as in compute_convergence_grid
+    - chunk_size: grid rows per chunk
+    - skip: first rows of chunks that are already done and are not computed again
+    - thread_work: as in compute_convergence_grid
+    - row_costs: optional predicted cost per grid row, NaN where unknown (see
+                 recorded_row_costs); chunks whose rows all have one skip the pilot pass
+
+    Yields:
+    - first: index of the first grid row of the chunk
+    - coeffs: 2D array (rows, degree+1) of the chunk's coefficients
+    - convergence_data: the chunk's results in the given encoding
+    """
+    start_range = tuple(int(v) for v in start_range)
+    if is_integral_grid(axes):
+        axes = axes.astype(np.int64)
+    starts = start_values(start_range)
+    total = grid_size(axes)
+
+    for first in range(0, total, chunk_size):
+        if first in skip:
+            continue
+        coeffs = np.empty((min(chunk_size, total - first), axes.shape[0]), dtype=axes.dtype)
+        costs = np.empty(0)
+        if row_costs is not None and np.isfinite(row_costs[first:first + len(coeffs)]).all():
+            costs = np.ascontiguousarray(row_costs[first:first + len(coeffs)], dtype=np.float64)
+        if encoding == 'aggregate':
+            fill_parameter_rows(axes, first, coeffs)
+            yield first, coeffs, summary_rows(coeffs, start_range, max_steps, max_value, thread_work, costs)
+            continue
+        results = run_scheduled(convergence_chunk_kernel, len(coeffs) * len(starts),
+                                axes, first, coeffs, start_range, max_steps, max_value, costs,
+                                thread_work=thread_work)
+        for i in np.unique(np.nonzero(results[:, :, 0] == 0)[0]):
+            resolve_unresolved(results[i], starts, coeffs[i], max_steps, max_value)
+        if encoding == 'compact':
+            results = pack_convergence(results, max_steps)
+        yield first, coeffs, results
+
+
+def convergence_layout(total, num_starts, max_steps, encoding='full'):
+    """
+    Shapes and dtypes of the arrays saved for an encoding.
+
+    Returns:
+    - layout: dict of array name -> (shape, dtype), in the order of the encoded tuple
+    """
+    if encoding == 'full':
+        return {'convergence': ((total, num_starts, 2), np.int64)}
+    if encoding == 'compact':
+        return {'lengths': ((total, num_starts), length_dtype(max_steps)),
+                'converged': ((total, (num_starts + 7) // 8), np.uint8)}
+    return {'summary': ((total, len(SUMMARY_FIELDS)), np.float64)}
+
+
+KERNEL_SIGNATURES = {
+    'start_values': ['int64[::1](UniTuple(int64, 3))'],
+    'convergence_grid_kernel': [
+        'int64[:, :, ::1](float64[:, ::1], UniTuple(int64, 3), int64, int64, int64[:, ::1])',
+        'int64[:, :, ::1](int64[:, ::1], UniTuple(int64, 3), int64, int64, int64[:, ::1])',
+    ],
+    'convergence_summary_kernel': [
+        '(float64[:, ::1], UniTuple(int64, 3), int64, int64, float64[::1], int64[:, ::1])',
+        '(int64[:, ::1], UniTuple(int64, 3), int64, int64, float64[::1], int64[:, ::1])',
+    ],
+    'convergence_chunk_kernel': [
+        'int64[:, :, ::1](float64[:, ::1], int64, float64[:, ::1], UniTuple(int64, 3), int64, int64, float64[::1], '
+        'int64[:, ::1])',
+        'int64[:, :, ::1](int64[:, ::1], int64, int64[:, ::1], UniTuple(int64, 3), int64, int64, float64[::1], '
+        'int64[:, ::1])',
+    ],
+}
+
+
+def load_run_manifest(filename, params, resume=False):
+    """
+    Read the manifest of an interrupted run, or start a new one.
+
+    Parameters:
+    - filename: manifest path
+    - params: JSON-serializable run parameters
+    - resume: reuse the manifest on disk if there is one
+
+    Returns:
+    - manifest: dict with 'params', 'completed' (first rows of finished chunks), 'seconds'
+      (first row of a finished chunk -> seconds it took) and 'complete'
+    """
+    params = json.loads(json.dumps(params))
+    if resume and os.path.exists(filename):
+        with open(filename) as f:
+            manifest = json.load(f)
+        if manifest['params'] != params:
+            raise ValueError(f"Cannot resume: {filename} was written with parameters {manifest['params']}")
+        manifest.setdefault('seconds', {})
+        return manifest
+    return {'params': params, 'completed': [], 'seconds': {}, 'complete': False}
+
+
+def save_run_manifest(filename, manifest):
+    """Write the manifest under a temporary name and rename it, so it is never half written."""
+    with open(filename + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(filename + '.tmp', filename)
+
+
+def recorded_row_costs(output_prefix, degree, num_points):
+    """
+    Mean trajectory length per grid row from the results a previous run saved under
+    output_prefix, if it used the same grid; it predicts the cost of each row of the next
+    run (see convergence_results). Rows of chunks the run did not finish are NaN.
+
+    Returns:
+    - costs: float64 array with one entry per grid row, or None without such a run
+    """
+    manifest_filename = run_manifest_filename(output_prefix, degree)
+    if not os.path.exists(manifest_filename):
+        return None
+    with open(manifest_filename) as f:
+        manifest = json.load(f)
+    if manifest['params']['num_points'] != num_points:
+        return None
+    try:
+        encoding, arrays = find_convergence_data(output_prefix, degree)
+    except FileNotFoundError:
+        return None
+    if encoding == 'full':
+        lengths = arrays['convergence'][:, :, 0]
+    elif encoding == 'compact':
+        lengths = arrays['lengths']
+    else:
+        lengths = arrays['summary'][:, SUMMARY_FIELDS.index('mean_length'), None]
+    costs = np.full(len(lengths), np.nan)
+    chunk_size = manifest['params']['chunk_size']
+    for first in manifest['completed']:
+        costs[first:first + chunk_size] = lengths[first:first + chunk_size].mean(axis=1)
+    return costs
 
 
 def generate_and_save_data(degree, num_points=50, start_range=(1, 1000, 100),
-                          max_steps=1000, max_value=10**18, output_prefix='data'):
+                          max_steps=1000, max_value=10**18, output_prefix='data', chunk_size=16384,
+                          encoding='full', resume=False):
     """
-    Generate parameter grid and compute convergence data, then save to files.
+    Compute convergence data over the parameter grid and stream it to files.
+
+    The grid is never materialized: coefficients are decoded from the row index
+    inside the kernel and every chunk is written to memory-mapped .npy files,
+    so memory use does not depend on the grid size.
+
+    The run is checkpointed chunk by chunk: after a chunk is flushed to disk its
+    first row is added to a JSON manifest ({output_prefix}_run_degree_{degree}.json)
+    next to the run parameters, with the seconds the chunk took. With resume=True an interrupted run with the same
+    parameters reopens its files and computes only the chunks still missing.
+
+    Rows are computed longest first: the mean trajectory lengths saved by the previous run
+    on the same grid (see recorded_row_costs) predict their cost, and chunks without
+    recorded lengths fall back to a pilot pass.
 
     Parameters:
     - degree: polynomial degree
@@ -70,28 +452,77 @@ def generate_and_save_data(degree, num_points=50, start_range=(1, 1000, 100),
     - start_range: (min_start, max_start, num_samples)
     - max_steps, max_value: simulation limits
     - output_prefix: prefix for output files
+    - chunk_size: grid rows computed and written at a time
+    - encoding: 'full', 'compact' or 'aggregate'; file names follow
+                helper_utils.convergence_filenames
+    - resume: continue the run recorded in the manifest instead of starting over
+
+    Returns:
+    - coeff_grid: the saved coefficients, opened read-only as a memory map
+    - convergence_data: the saved results, memory-mapped ('compact' gives a (lengths, converged) tuple)
     """
+    if encoding not in CONVERGENCE_ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {CONVERGENCE_ENCODINGS}")
     log_message(f"Generating data for degree {degree}")
 
-    # Generate coefficient ranges and grid
+    # Coefficient axes; the Cartesian product is walked lazily by index
     ranges = generate_coefficient_ranges(degree)
-    coeff_grid = generate_parameter_grid(ranges, num_points)
+    axes = parameter_axes(ranges, num_points)
+    total = grid_size(axes)
+    num_starts = len(start_values(tuple(int(v) for v in start_range)))
 
-    log_message(f"Generated {coeff_grid.shape[0]} parameter combinations")
+    coeff_filename = f"{output_prefix}_coeffs_degree_{degree}.npy"
+    data_filenames = convergence_filenames(output_prefix, degree, encoding)
+    layout = convergence_layout(total, num_starts, max_steps, encoding)
 
-    # Compute convergence data
-    convergence_data = compute_convergence_grid(coeff_grid, start_range, max_steps, max_value)
+    manifest_filename = run_manifest_filename(output_prefix, degree)
+    # Read before a new run truncates the files
+    row_costs = recorded_row_costs(output_prefix, degree, num_points)
+    params = {'degree': degree, 'num_points': num_points, 'start_range': [int(v) for v in start_range],
+              'max_steps': int(max_steps), 'max_value': int(max_value), 'chunk_size': chunk_size,
+              'encoding': encoding}
+    manifest = load_run_manifest(manifest_filename, params, resume)
+    done = set(manifest['completed'])
+    # Files of a resumed run are reopened in place, otherwise created from scratch
+    mode = 'r+' if done or manifest['complete'] else 'w+'
+    if mode == 'r+':
+        log_message(f"Resuming: {len(done)} chunks already done")
+    else:
+        save_run_manifest(manifest_filename, manifest)
 
-    # Save data
-    coeff_filename = f"{output_prefix}_coeffs_degree_{degree}.npy"
-    data_filename = f"{output_prefix}_convergence_degree_{degree}.npy"
+    log_message(f"Streaming {total} parameter combinations in chunks of {chunk_size}")
 
-    save_data(coeff_grid, coeff_filename)
-    save_data(convergence_data, data_filename)
+    coeff_file = open_memmap(coeff_filename, mode=mode, dtype=np.float64, shape=(total, degree + 1))
+    data_files = [open_memmap(data_filenames[name], mode=mode, dtype=dtype, shape=shape)
+                  for name, (shape, dtype) in layout.items()]
+    thread_work = new_thread_work()
+    chunks = iter_convergence_chunks(axes, start_range, max_steps, max_value, chunk_size, encoding, skip=done,
+                                     thread_work=thread_work, row_costs=row_costs)
+    t0 = time.perf_counter()
+    for first, coeffs, results in chunks:
+        seconds = time.perf_counter() - t0
+        rows = slice(first, first + len(coeffs))
+        coeff_file[rows] = coeffs
+        for data_file, part in zip(data_files, results if encoding == 'compact' else (results,)):
+            data_file[rows] = part
+        # The chunk is on disk before the manifest claims it
+        coeff_file.flush()
+        for data_file in data_files:
+            data_file.flush()
+        manifest['completed'].append(first)
+        manifest['seconds'][str(first)] = seconds
+        save_run_manifest(manifest_filename, manifest)
+        log_message(f"Rows {rows.stop}/{total} done in {seconds:.1f} s")
+        t0 = time.perf_counter()
+    del coeff_file, data_files
+    log_message(format_utilization(thread_work))
+    manifest['complete'] = True
+    save_run_manifest(manifest_filename, manifest)
 
-    log_message(f"Data saved to {coeff_filename} and {data_filename}")
+    log_message(f"Data saved to {coeff_filename} and {', '.join(data_filenames.values())}")
 
-    return coeff_grid, convergence_data
+    saved = tuple(np.load(data_filenames[name], mmap_mode='r') for name in layout)
+    return np.load(coeff_filename, mmap_mode='r'), saved if encoding == 'compact' else saved[0]
 
 
 if __name__ == "__main__":
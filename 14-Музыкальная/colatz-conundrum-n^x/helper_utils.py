@@ -3,37 +3,392 @@ Helper utilities for Collatz-like polynomial iterations.
 
 This module contains common functions and utilities used across the project.
 Includes Numba-compiled functions for performance optimization on Ryzen 9950X.
+
+Polynomial steps use Horner's rule and give the same values as Python would:
+float coefficients are evaluated in float64, which needs no escalation since
+n itself always fits in int64. Integer coefficients are exact, in tiers:
+1. plain int64 arithmetic while a float bound shows that nothing can overflow;
+2. exact 128-bit (two-word) arithmetic for larger values;
+3. Python big integers, run outside Numba, for the rare trajectories that need
+   more than 128 bits. Kernels report these as unresolved (length 0) and the
+   Python wrappers below recompute them.
 """
 
+import json
+import os
 import numpy as np
-from numba import jit, prange
+from numba import jit, prange, types
+from numba.extending import overload
 import time
 
 
-@jit(nopython=True)
+# Status of a polynomial step
+STEP_EXACT = 0       # next value computed exactly
+STEP_ESCAPED = 1     # next value lies outside int64, hence beyond any max_value
+STEP_UNRESOLVED = 2  # 128 bits were not enough; needs the big-int fallback
+
+INT64_MAX = 2**63 - 1
+TWO_POW_63 = 9.223372036854775808e18
+FAST_LIMIT = 9.0e18  # float bounds below this are safe in int64
+ESCAPE_LIMIT = 1.8446744073709552e19  # 2**64, certified escape threshold
+
+ZERO = np.uint64(0)
+ONE = np.uint64(1)
+MASK32 = np.uint64(0xFFFFFFFF)
+SHIFT32 = np.uint64(32)
+
+
+def has_integer_coeffs(coeffs):
+    """True if coeffs has an integer dtype (resolved at compile time in kernels)."""
+    return np.issubdtype(np.asarray(coeffs).dtype, np.integer)
+
+
+@overload(has_integer_coeffs)
+def _has_integer_coeffs(coeffs):
+    flag = isinstance(coeffs.dtype, types.Integer)
+    return lambda coeffs: flag
+
+
+@jit(nopython=True, cache=True)
+def magnitude(n):
+    """|n| of an int64 as uint64 (valid for -2**63 too)."""
+    if n < 0:
+        return np.uint64(-(n + 1)) + ONE
+    return np.uint64(n)
+
+
+@jit(nopython=True, cache=True)
+def wide_mul(a, b):
+    """Full product of two uint64 values as (hi, lo) words."""
+    a_lo = a & MASK32
+    a_hi = a >> SHIFT32
+    b_lo = b & MASK32
+    b_hi = b >> SHIFT32
+    ll = a_lo * b_lo
+    lh = a_lo * b_hi
+    hl = a_hi * b_lo
+    hh = a_hi * b_hi
+    mid = (ll >> SHIFT32) + (lh & MASK32) + (hl & MASK32)
+    lo = (ll & MASK32) | (mid << SHIFT32)
+    hi = hh + (lh >> SHIFT32) + (hl >> SHIFT32) + (mid >> SHIFT32)
+    return hi, lo
+
+
+@jit(nopython=True, cache=True)
+def wide_mul_small(hi, lo, m):
+    """(hi, lo) * m for a uint64 m. Returns (hi, lo, ok), ok is False on 128-bit overflow."""
+    h1, l1 = wide_mul(lo, m)
+    h2, l2 = wide_mul(hi, m)
+    new_hi = l2 + h1
+    return new_hi, l1, h2 == ZERO and new_hi >= l2
+
+
+@jit(nopython=True, cache=True)
+def wide_add(neg_a, hi_a, lo_a, neg_b, hi_b, lo_b):
+    """
+    Sum of two sign-magnitude 128-bit values.
+    Returns (neg, hi, lo, ok), ok is False on overflow.
+    """
+    if neg_a == neg_b:
+        lo = lo_a + lo_b
+        carry = ONE if lo < lo_a else ZERO
+        t = hi_a + hi_b
+        hi = t + carry
+        return neg_a, hi, lo, t >= hi_a and hi >= t
+    if hi_a < hi_b or (hi_a == hi_b and lo_a < lo_b):
+        neg_a, hi_a, lo_a, neg_b, hi_b, lo_b = neg_b, hi_b, lo_b, neg_a, hi_a, lo_a
+    borrow = ONE if lo_a < lo_b else ZERO
+    lo = lo_a - lo_b
+    hi = hi_a - hi_b - borrow
+    return neg_a and (hi != ZERO or lo != ZERO), hi, lo, True
+
+
+@jit(nopython=True, cache=True)
+def escaped_value(negative):
+    """Saturated stand-in for a value outside int64."""
+    if negative:
+        return -INT64_MAX
+    return INT64_MAX
+
+
+@jit(nopython=True, cache=True)
+def horner_float(x, coeffs):
+    """
+    P(x) by Horner's rule in float64, unrolled for degrees 1-3.
+    The degree test gives the same answer on every step of a trajectory,
+    so it costs one well-predicted branch.
+    """
+    degree = len(coeffs) - 1
+    if degree == 1:
+        return coeffs[0] * x + coeffs[1]
+    if degree == 2:
+        return (coeffs[0] * x + coeffs[1]) * x + coeffs[2]
+    if degree == 3:
+        return ((coeffs[0] * x + coeffs[1]) * x + coeffs[2]) * x + coeffs[3]
+    result = float(coeffs[0])
+    for i in range(1, len(coeffs)):
+        result = result * x + coeffs[i]
+    return result
+
+
+@jit(nopython=True, cache=True)
+def horner_int64(n, coeffs):
+    """P(n) by Horner's rule in int64; the caller guarantees there is no overflow."""
+    degree = len(coeffs) - 1
+    if degree == 1:
+        return coeffs[0] * n + coeffs[1]
+    if degree == 2:
+        return (coeffs[0] * n + coeffs[1]) * n + coeffs[2]
+    if degree == 3:
+        return ((coeffs[0] * n + coeffs[1]) * n + coeffs[2]) * n + coeffs[3]
+    result = coeffs[0]
+    for i in range(1, len(coeffs)):
+        result = result * n + coeffs[i]
+    return result
+
+
+@jit(nopython=True, cache=True)
+def horner_bound(x, coeffs):
+    """sum(|coeffs[i]| * |x|^k): bounds every Horner partial result for |x| >= 1."""
+    ax = abs(x)
+    result = abs(float(coeffs[0]))
+    for i in range(1, len(coeffs)):
+        result = result * ax + abs(float(coeffs[i]))
+    return result
+
+
+@jit(nopython=True, cache=True)
+def certify_escape(n, coeffs):
+    """
+    Decide from a float estimate whether P(n) certainly lies outside int64.
+    Returns (next_n, status) with status STEP_ESCAPED or STEP_UNRESOLVED.
+    """
+    x = float(n)
+    value = horner_float(x, coeffs)
+    # Generous bound on the rounding error of the float Horner evaluation
+    margin = horner_bound(x, coeffs) * (len(coeffs) + 3) * 2.0 ** -50
+    if abs(value) - margin >= ESCAPE_LIMIT:
+        return escaped_value(value < 0), STEP_ESCAPED
+    return 0, STEP_UNRESOLVED
+
+
+@jit(nopython=True, cache=True)
+def float_to_step(result):
+    """int(result) as a step outcome; values outside int64 escape."""
+    if result >= TWO_POW_63 or result <= -TWO_POW_63:
+        return escaped_value(result < 0), STEP_ESCAPED
+    return np.int64(result), STEP_EXACT
+
+
+@jit(nopython=True, cache=True)
+def integer_polynomial_step(n, coeffs):
+    """
+    Exact P(n) for integer coefficients: int64 Horner when a float bound shows
+    that no partial result can overflow, else sign-magnitude 128-bit Horner.
+    Returns (next_n, status) as collatz_polynomial_step.
+    """
+    x = float(n)
+    # Tier 1: every Horner partial result fits in int64
+    if horner_bound(x, coeffs) < FAST_LIMIT:
+        return np.int64(horner_int64(n, coeffs)), STEP_EXACT
+
+    # Tier 2: exact sign-magnitude 128-bit Horner
+    m = magnitude(n)
+    negative_n = n < 0
+    neg_r = coeffs[0] < 0
+    hi_r = ZERO
+    lo_r = magnitude(np.int64(coeffs[0]))
+    for i in range(1, len(coeffs)):
+        hi_r, lo_r, ok = wide_mul_small(hi_r, lo_r, m)
+        neg_r = neg_r != negative_n
+        if ok:
+            c = coeffs[i]
+            neg_r, hi_r, lo_r, ok = wide_add(neg_r, hi_r, lo_r, c < 0, ZERO, magnitude(np.int64(c)))
+        if not ok:
+            return certify_escape(n, coeffs)
+    if hi_r == ZERO and lo_r <= np.uint64(INT64_MAX):
+        value = np.int64(lo_r)
+        if neg_r:
+            value = -value
+        return value, STEP_EXACT
+    return escaped_value(neg_r), STEP_ESCAPED
+
+
+@jit(nopython=True, cache=True)
 def collatz_polynomial_step(n, coeffs):
     """
     Perform one step of the polynomial Collatz iteration.
 
+    Odd values map to P(n) = (...(k_d * n + k_{d-1}) * n + ...) * n + k_0 by
+    Horner's rule, evaluated as Python would: exactly for integer coefficients,
+    and in float64 (then truncated by int()) for float coefficients.
+
     Parameters:
-    - n: current number (int)
+    - n: current number (int64)
     - coeffs: array of polynomial coefficients [k_d, k_{d-1}, ..., k_0]
 
     Returns:
-    - next_n: next number after iteration
+    - next_n: next number (saturated to +-INT64_MAX when escaped)
+    - status: STEP_EXACT, STEP_ESCAPED or STEP_UNRESOLVED
+    """
+    if n % 2 == 0:
+        return n // 2, STEP_EXACT
+    # Resolved at compile time: one specialization per coefficient dtype
+    if has_integer_coeffs(coeffs):
+        return integer_polynomial_step(n, coeffs)
+    return float_to_step(horner_float(float(n), coeffs))
+
+
+@jit(nopython=True, cache=True)
+def trajectory_stats(n_start, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Follow a trajectory without storing it.
+
+    Tracks the running max/min and detects cycles with Brent's algorithm.
+    An orbit that closes a cycle can neither reach 1 nor exceed max_value,
+    so it stops early with the same length and flag a full run would report.
+
+    Parameters:
+    - n_start: starting number
+    - coeffs: polynomial coefficients
+    - max_steps: maximum number of steps
+    - max_value: maximum allowed value before stopping
+
+    Returns:
+    - length: number of values in the trajectory (including n_start),
+              0 if the trajectory needs the big-int fallback
+    - converged: True if reached 1, False otherwise
+    - max_n, min_n: largest and smallest value visited (saturated to int64)
+    - cycle_length: length of the detected cycle, 0 if none
+    """
+    n = n_start
+    max_n = n_start
+    min_n = n_start
+    tortoise = n_start
+    power = 1
+    lam = 0
+    for step in range(max_steps):
+        n, status = collatz_polynomial_step(n, coeffs)
+        if status == STEP_UNRESOLVED:
+            return 0, False, max_n, min_n, 0
+        if n > max_n:
+            max_n = n
+        if n < min_n:
+            min_n = n
+        if n == 1:
+            return step + 2, True, max_n, min_n, 0
+        if status == STEP_ESCAPED or abs(n) > max_value:
+            return step + 2, False, max_n, min_n, 0
+        lam += 1
+        if n == tortoise:
+            return max_steps + 1, False, max_n, min_n, lam
+        if lam == power:
+            tortoise = n
+            power *= 2
+            lam = 0
+    return max_steps + 1, False, max_n, min_n, 0
+
+
+@jit(nopython=True, cache=True)
+def record_trajectory(n_start, coeffs, buffer, max_value=10**18):
+    """
+    Record a trajectory into a preallocated buffer.
+
+    Parameters:
+    - n_start: starting number
+    - coeffs: polynomial coefficients
+    - buffer: int64 array; at most len(buffer) - 1 steps are taken
+    - max_value: maximum allowed value before stopping
+
+    Returns:
+    - length: number of values written to buffer
+    - converged: True if reached 1, False otherwise
+    - status: status of the last step; on STEP_ESCAPED the last value is saturated,
+              on STEP_UNRESOLVED it is not written
+    """
+    n = n_start
+    buffer[0] = n
+    for step in range(1, len(buffer)):
+        n, status = collatz_polynomial_step(n, coeffs)
+        if status == STEP_UNRESOLVED:
+            return step, False, status
+        buffer[step] = n
+        if n == 1:
+            return step + 1, True, status
+        if status == STEP_ESCAPED or abs(n) > max_value:
+            return step + 1, False, status
+    return len(buffer), False, STEP_EXACT
+
+
+def collatz_polynomial_step_exact(n, coeffs):
+    """
+    Reference step in Python integers; never overflows.
+
+    Parameters:
+    - n: current number (Python int)
+    - coeffs: list of Python int/float coefficients (see exact_coefficients)
+
+    Returns:
+    - next_n: next number
     """
     if n % 2 == 0:
         return n // 2
-    else:
-        # Compute P(n) = sum(coeffs[i] * n^(len(coeffs)-1-i))
-        degree = len(coeffs) - 1
-        result = 0
-        for i in range(len(coeffs)):
-            result += coeffs[i] * (n ** (degree - i))
-        return int(result)
+    result = coeffs[0]
+    for i in range(1, len(coeffs)):
+        result = result * n + coeffs[i]
+    return int(result)
+
+
+def exact_coefficients(coeffs):
+    """Coefficient array as a list of Python numbers for the exact path."""
+    return np.asarray(coeffs).tolist()
+
+
+def trajectory_stats_exact(n_start, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Big-int counterpart of trajectory_stats (same results, unbounded values).
+    coeffs is a list of Python numbers.
+    """
+    n = int(n_start)
+    max_n = n
+    min_n = n
+    tortoise = n
+    power = 1
+    lam = 0
+    for step in range(max_steps):
+        n = collatz_polynomial_step_exact(n, coeffs)
+        max_n = max(max_n, n)
+        min_n = min(min_n, n)
+        if n == 1:
+            return step + 2, True, max_n, min_n, 0
+        if abs(n) > max_value:
+            return step + 2, False, max_n, min_n, 0
+        lam += 1
+        if n == tortoise:
+            return max_steps + 1, False, max_n, min_n, lam
+        if lam == power:
+            tortoise = n
+            power *= 2
+            lam = 0
+    return max_steps + 1, False, max_n, min_n, 0
+
+
+def resolve_unresolved(results, starts, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Recompute, with Python integers, the rows of a batch result that the kernels
+    marked unresolved (length 0). Columns follow trajectory_stats; values outside
+    int64 are saturated. Modifies results in place and returns it.
+    """
+    unresolved = np.flatnonzero(results[:, 0] == 0)
+    if len(unresolved):
+        exact = exact_coefficients(coeffs)
+        for i in unresolved:
+            stats = trajectory_stats_exact(int(starts[i]), exact, max_steps, max_value)
+            for col in range(results.shape[1]):
+                results[i, col] = max(-INT64_MAX, min(INT64_MAX, int(stats[col])))
+    return results
 
 
-@jit(nopython=True)
 def simulate_trajectory(n_start, coeffs, max_steps=1000, max_value=10**18):
     """
     Simulate a single trajectory from n_start.
@@ -45,26 +400,51 @@ def simulate_trajectory(n_start, coeffs, max_steps=1000, max_value=10**18):
     - max_value: maximum allowed value before stopping
 
     Returns:
-    - trajectory: list of numbers in the trajectory
-    - converged: True if reached 1 or cycle, False if diverged
+    - trajectory: array of numbers in the trajectory (object dtype when a value
+                  does not fit in int64)
+    - converged: True if reached 1, False otherwise
     """
-    trajectory = [n_start]
-    n = n_start
-    for _ in range(max_steps):
-        n = collatz_polynomial_step(n, coeffs)
+    buffer = np.empty(max_steps + 1, dtype=np.int64)
+    length, converged, status = record_trajectory(n_start, coeffs, buffer, max_value)
+    if status == STEP_EXACT:
+        return buffer[:length], converged
+
+    # Finish the trajectory from the last exact value with Python integers
+    exact = exact_coefficients(coeffs)
+    if status == STEP_ESCAPED:
+        length -= 1
+    trajectory = [int(v) for v in buffer[:length]]
+    n = trajectory[-1]
+    while len(trajectory) <= max_steps:
+        n = collatz_polynomial_step_exact(n, exact)
         trajectory.append(n)
         if n == 1:
-            return trajectory, True
+            converged = True
+            break
         if abs(n) > max_value:
-            return trajectory, False
-    return trajectory, False
+            break
+    return np.array(trajectory, dtype=object), converged
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def batch_simulate_kernel(starts, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Kernel of batch_simulate_trajectories; unresolved rows have length 0.
+    """
+    results = np.zeros((len(starts), 2), dtype=np.int64)
+    for i in prange(len(starts)):
+        length, conv, _, _, _ = trajectory_stats(starts[i], coeffs, max_steps, max_value)
+        results[i, 0] = length
+        results[i, 1] = int(conv)
+    return results
 
 
-@jit(nopython=True, parallel=True)
 def batch_simulate_trajectories(starts, coeffs, max_steps=1000, max_value=10**18):
     """
     Simulate multiple trajectories in parallel.
 
+    Only lengths and flags are computed; no trajectory is materialized.
+
     Parameters:
     - starts: array of starting numbers
     - coeffs: polynomial coefficients
@@ -73,18 +453,244 @@ def batch_simulate_trajectories(starts, coeffs, max_steps=1000, max_value=10**18
     Returns:
     - results: array of (length, converged) for each trajectory
     """
-    results = np.zeros((len(starts), 2), dtype=np.int64)
+    results = batch_simulate_kernel(starts, coeffs, max_steps, max_value)
+    return resolve_unresolved(results, starts, coeffs, max_steps, max_value)
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def batch_trajectory_stats_kernel(starts, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Kernel of batch_trajectory_stats; unresolved rows have length 0.
+    """
+    results = np.zeros((len(starts), 5), dtype=np.int64)
     for i in prange(len(starts)):
-        traj, conv = simulate_trajectory(starts[i], coeffs, max_steps, max_value)
-        results[i, 0] = len(traj)
+        length, conv, max_n, min_n, cycle_length = trajectory_stats(starts[i], coeffs, max_steps, max_value)
+        results[i, 0] = length
         results[i, 1] = int(conv)
+        results[i, 2] = max_n
+        results[i, 3] = min_n
+        results[i, 4] = cycle_length
     return results
 
 
+def batch_trajectory_stats(starts, coeffs, max_steps=1000, max_value=10**18):
+    """
+    Like batch_simulate_trajectories, with the running statistics.
+
+    Returns:
+    - results: array of (length, converged, max_n, min_n, cycle_length) per trajectory
+    """
+    results = batch_trajectory_stats_kernel(starts, coeffs, max_steps, max_value)
+    return resolve_unresolved(results, starts, coeffs, max_steps, max_value)
+
+
+# Trajectories advanced together by the lockstep kernel
+LOCKSTEP_LANES = 64
+
+
+@jit(nopython=True, cache=True)
+def lockstep_step(n, coeffs):
+    """
+    collatz_polynomial_step for one lane of a lockstep sweep. With float coefficients
+    both branches are evaluated and the parity selects the result, so a sweep over
+    the lanes has no data-dependent branch; the exact integer engine is branchy by
+    nature and is called as is.
+    """
+    if has_integer_coeffs(coeffs):
+        return collatz_polynomial_step(n, coeffs)
+    odd, status = float_to_step(horner_float(float(n), coeffs))
+    even = n % 2 == 0
+    return n // 2 if even else odd, STEP_EXACT if even else status
+
+
+@jit(nopython=True, cache=True)
+def batch_simulate_lockstep(starts, coeffs, max_steps=1000, max_value=10**18, lanes=LOCKSTEP_LANES):
+    """
+    Single-threaded batch_simulate_kernel that advances up to `lanes` trajectories in
+    lockstep: every sweep moves all live lanes one step over contiguous arrays, then
+    retires the lanes whose trajectory ended (converged, escaped, cycled, out of steps
+    or unresolved) and refills them with the next start.
+
+    Returns:
+    - results: array of (length, converged) per start, as batch_simulate_kernel
+               (length 0 for unresolved trajectories)
+    """
+    num = len(starts)
+    results = np.zeros((num, 2), dtype=np.int64)
+    if max_steps <= 0:
+        results[:, 0] = max_steps + 1
+        return results
+    width = min(lanes, num)
+    x = np.empty(width, dtype=np.int64)
+    status = np.empty(width, dtype=np.int64)
+    tortoise = np.empty(width, dtype=np.int64)
+    taken = np.zeros(width, dtype=np.int64)
+    power = np.ones(width, dtype=np.int64)
+    lam = np.zeros(width, dtype=np.int64)
+    owner = np.arange(width)
+    for l in range(width):
+        x[l] = starts[l]
+        tortoise[l] = starts[l]
+    next_start = width
+    active = width
+
+    while active > 0:
+        # One step of every live lane
+        for l in range(active):
+            x[l], status[l] = lockstep_step(x[l], coeffs)
+
+        # Outcome per lane, in the order of trajectory_stats; finished lanes are refilled or compacted
+        l = 0
+        while l < active:
+            n = x[l]
+            taken[l] += 1
+            lam[l] += 1
+            length = -1
+            converged = 0
+            if status[l] == STEP_UNRESOLVED:
+                length = 0
+            elif n == 1:
+                length = taken[l] + 1
+                converged = 1
+            elif status[l] == STEP_ESCAPED or abs(n) > max_value:
+                length = taken[l] + 1
+            elif n == tortoise[l] or taken[l] == max_steps:
+                length = max_steps + 1
+            elif lam[l] == power[l]:
+                tortoise[l] = n
+                power[l] *= 2
+                lam[l] = 0
+            if length < 0:
+                l += 1
+                continue
+            results[owner[l], 0] = length
+            results[owner[l], 1] = converged
+            if next_start < num:
+                owner[l] = next_start
+                x[l] = starts[next_start]
+                tortoise[l] = x[l]
+                taken[l] = 0
+                power[l] = 1
+                lam[l] = 0
+                next_start += 1
+                l += 1
+            else:
+                active -= 1
+                owner[l] = owner[active]
+                x[l] = x[active]
+                status[l] = status[active]
+                tortoise[l] = tortoise[active]
+                taken[l] = taken[active]
+                power[l] = power[active]
+                lam[l] = lam[active]
+    return results
+
+
+# Explicit signatures of the kernels above as called across the project.
+# colatz-bench/jit_warmup.py compiles them ahead of time into the on-disk cache.
+KERNEL_SIGNATURES = {
+    'collatz_polynomial_step': [
+        '(int64, float64[::1])',
+        '(int64, int64[::1])',
+    ],
+    'trajectory_stats': [
+        '(int64, float64[::1], int64, int64)',
+        '(int64, int64[::1], int64, int64)',
+    ],
+    'record_trajectory': [
+        '(int64, float64[::1], int64[::1], int64)',
+        '(int64, int64[::1], int64[::1], int64)',
+    ],
+    'batch_simulate_kernel': [
+        'int64[:, ::1](int64[::1], float64[::1], int64, int64)',
+        'int64[:, ::1](int64[::1], int64[::1], int64, int64)',
+    ],
+    'lockstep_step': [
+        '(int64, float64[::1])',
+        '(int64, int64[::1])',
+    ],
+    'batch_simulate_lockstep': [
+        'int64[:, ::1](int64[::1], float64[::1], int64, int64, int64)',
+        'int64[:, ::1](int64[::1], int64[::1], int64, int64, int64)',
+    ],
+    'batch_trajectory_stats_kernel': [
+        'int64[:, ::1](int64[::1], float64[::1], int64, int64)',
+        'int64[:, ::1](int64[::1], int64[::1], int64, int64)',
+    ],
+    'decode_coefficients': [
+        'void(float64[:, ::1], int64, float64[::1])',
+        'void(int64[:, ::1], int64, int64[::1])',
+    ],
+    'fill_parameter_rows': [
+        'void(float64[:, ::1], int64, float64[:, ::1])',
+        'void(int64[:, ::1], int64, int64[:, ::1])',
+    ],
+    'summarize_trajectories': ['float64[::1](int64[:, ::1])'],
+}
+
+
+def parameter_axes(coeff_ranges, num_points):
+    """
+    Sample points of every coefficient axis.
+
+    Parameters:
+    - coeff_ranges: list of (min, max) for each coefficient
+    - num_points: number of points per dimension
+
+    Returns:
+    - axes: 2D numpy array (num_coeffs, num_points); row j holds the values of coefficient j
+    """
+    return np.stack([np.linspace(r[0], r[1], num_points) for r in coeff_ranges])
+
+
+@jit(nopython=True, cache=True)
+def decode_coefficients(axes, index, out):
+    """
+    Write the coefficients of row `index` of the grid spanned by axes into out.
+
+    Rows follow the order of generate_parameter_grid (last coefficient fastest),
+    so a grid of any size can be walked by index without materializing it.
+    """
+    num_points = axes.shape[1]
+    for j in range(axes.shape[0] - 1, -1, -1):
+        out[j] = axes[j, index % num_points]
+        index //= num_points
+
+
+@jit(nopython=True, cache=True)
+def fill_parameter_rows(axes, first, out):
+    """Decode rows first .. first + len(out) of the grid spanned by axes into out."""
+    for i in range(out.shape[0]):
+        decode_coefficients(axes, first + i, out[i])
+
+
+def grid_size(axes):
+    """Number of rows of the grid spanned by axes."""
+    return axes.shape[1] ** axes.shape[0]
+
+
+def iter_parameter_chunks(coeff_ranges, num_points, chunk_size=16384):
+    """
+    Lazily walk the parameter grid in chunks of at most chunk_size rows.
+
+    Yields:
+    - first: index of the first row of the chunk
+    - chunk: 2D numpy array (rows, num_coeffs)
+    """
+    axes = parameter_axes(coeff_ranges, num_points)
+    total = grid_size(axes)
+    for first in range(0, total, chunk_size):
+        chunk = np.empty((min(chunk_size, total - first), axes.shape[0]))
+        fill_parameter_rows(axes, first, chunk)
+        yield first, chunk
+
+
 def generate_parameter_grid(coeff_ranges, num_points):
     """
     Generate a grid of parameter combinations.
 
+    Materializes the whole grid; prefer iter_parameter_chunks for large grids.
+
     Parameters:
     - coeff_ranges: list of (min, max) for each coefficient
     - num_points: number of points per dimension
@@ -92,12 +698,114 @@ def generate_parameter_grid(coeff_ranges, num_points):
     Returns:
     - grid: 2D numpy array of shape (total_combinations, num_coeffs)
     """
-    axes = [np.linspace(r[0], r[1], num_points) for r in coeff_ranges]
-    mesh = np.meshgrid(*axes, indexing='ij')
-    grid = np.stack(mesh, axis=-1).reshape(-1, len(coeff_ranges))
+    axes = parameter_axes(coeff_ranges, num_points)
+    grid = np.empty((grid_size(axes), axes.shape[0]))
+    fill_parameter_rows(axes, 0, grid)
     return grid
 
 
+# Storage of convergence results:
+# - 'full': (num_coeffs, num_starts, 2) int64 of (length, converged)
+# - 'compact': lengths as uint16/uint32 plus converged flags packed 8 per byte
+# - 'aggregate': one row of SUMMARY_FIELDS per coefficient set, reduced over starts
+CONVERGENCE_ENCODINGS = ('full', 'compact', 'aggregate')
+SUMMARY_FIELDS = ('rate', 'mean_length', 'median_length', 'p90_length')
+
+# Set bits per byte value, for rates straight from packed flags
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def convergence_filenames(prefix, degree, encoding='full'):
+    """
+    Names of the files holding convergence data of one encoding.
+
+    Returns:
+    - filenames: dict of array name -> file name
+    """
+    if encoding == 'full':
+        return {'convergence': f"{prefix}_convergence_degree_{degree}.npy"}
+    if encoding == 'compact':
+        return {'lengths': f"{prefix}_lengths_degree_{degree}.npy",
+                'converged': f"{prefix}_converged_degree_{degree}.npy"}
+    if encoding == 'aggregate':
+        return {'summary': f"{prefix}_summary_degree_{degree}.npy"}
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {CONVERGENCE_ENCODINGS}")
+
+
+def length_dtype(max_steps):
+    """Smallest unsigned dtype holding trajectory lengths up to max_steps + 1."""
+    if max_steps + 1 <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.uint32
+
+
+def pack_convergence(results, max_steps):
+    """
+    Compact encoding of a (num_coeffs, num_starts, 2) result tensor.
+
+    Returns:
+    - lengths: (num_coeffs, num_starts) array of length_dtype(max_steps)
+    - converged: (num_coeffs, ceil(num_starts / 8)) uint8 of packed flags
+    """
+    lengths = results[:, :, 0].astype(length_dtype(max_steps))
+    converged = np.packbits(results[:, :, 1] != 0, axis=1)
+    return lengths, converged
+
+
+def unpack_convergence(lengths, converged):
+    """Rebuild the (num_coeffs, num_starts, 2) int64 tensor from the compact encoding."""
+    flags = np.unpackbits(converged, axis=1, count=lengths.shape[1])
+    return np.stack([lengths.astype(np.int64), flags.astype(np.int64)], axis=-1)
+
+
+def packed_convergence_rate(converged, num_starts):
+    """Per-coefficient convergence rate from packed flags."""
+    return POPCOUNT[converged].sum(axis=1, dtype=np.int64) / num_starts
+
+
+def run_manifest_filename(prefix, degree):
+    """JSON manifest of the latest generation run (see data_generation_grid.generate_and_save_data)."""
+    return f"{prefix}_run_degree_{degree}.json"
+
+
+def find_convergence_data(prefix, degree):
+    """
+    Locate saved convergence data in the encoding the latest run recorded in its
+    manifest; files of other encodings may be left over from older runs. Without a
+    manifest, the encodings are tried in CONVERGENCE_ENCODINGS order.
+
+    Returns:
+    - encoding: encoding of the data found
+    - arrays: dict of array name -> read-only memory map
+
+    Raises FileNotFoundError if no encoding is present.
+    """
+    encodings = CONVERGENCE_ENCODINGS
+    manifest_filename = run_manifest_filename(prefix, degree)
+    if os.path.exists(manifest_filename):
+        with open(manifest_filename) as f:
+            encodings = (json.load(f)['params']['encoding'],)
+    for encoding in encodings:
+        filenames = convergence_filenames(prefix, degree, encoding)
+        if all(os.path.exists(f) for f in filenames.values()):
+            return encoding, {name: np.load(f, mmap_mode='r') for name, f in filenames.items()}
+    raise FileNotFoundError(f"No {' or '.join(encodings)} convergence data for prefix {prefix!r}, degree {degree}")
+
+
+@jit(nopython=True, cache=True)
+def summarize_trajectories(results):
+    """
+    Reduce the (num_starts, 2) results of one coefficient set to SUMMARY_FIELDS.
+    """
+    lengths = results[:, 0]
+    summary = np.empty(4)
+    summary[0] = results[:, 1].sum() / results.shape[0]
+    summary[1] = lengths.mean()
+    summary[2] = np.median(lengths)
+    summary[3] = np.percentile(lengths, 90.0)
+    return summary
+
+
 def save_data(data, filename):
     """
     Save data to a numpy file.
@@ -1,5 +1,6 @@
 import numpy as np
 from helper_utils import load_data, log_message, batch_simulate_trajectories
+from analysis_dynamics import load_convergence_rates
 
 def find_and_optimize_light_zone(degree=2):
     log_message(f"Investigating Light Zone for Degree {degree}...")
@@ -7,13 +8,11 @@ def find_and_optimize_light_zone(degree=2):
     # Load existing data
     try:
         coeffs = load_data(f"1graph_coeffs_degree_{degree}.npy")
-        convergence = load_data(f"1graph_convergence_degree_{degree}.npy")
+        # Calculate rates (any saved encoding)
+        rates = load_convergence_rates("1graph", degree)
     except FileNotFoundError:
         log_message("Data not found. Please run generation first.")
         return
-
-    # Calculate rates
-    rates = np.mean(convergence[:, :, 1], axis=1)
     
     # Find top candidates
     top_indices = np.argsort(rates)[-10:] # Top 10
@@ -0,0 +1,93 @@
+"""
+Streaming generation of the polynomial study: encodings on disk and resumed runs.
+"""
+
+import json
+import numpy as np
+import pytest
+import data_generation_grid
+from data_generation_grid import generate_and_save_data, recorded_row_costs
+from helper_utils import find_convergence_data
+
+RUN = dict(num_points=4, start_range=(1, 60, 12), max_steps=300)
+
+
+def stop_after(monkeypatch, chunks):
+    """Make the run raise KeyboardInterrupt once the given number of chunks is in the manifest."""
+    original = data_generation_grid.save_run_manifest
+
+    def interrupted(filename, manifest):
+        original(filename, manifest)
+        if len(manifest['completed']) == chunks:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(data_generation_grid, 'save_run_manifest', interrupted)
+
+
+@pytest.mark.parametrize('encoding', ['full', 'compact', 'aggregate'])
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch, encoding):
+    coeffs, reference = generate_and_save_data(1, output_prefix=str(tmp_path / 'reference'), chunk_size=4,
+                                               encoding=encoding, **RUN)
+    prefix = str(tmp_path / 'data')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            generate_and_save_data(1, output_prefix=prefix, chunk_size=4, encoding=encoding, **RUN)
+    with open(f"{prefix}_run_degree_1.json") as f:
+        assert len(json.load(f)['completed']) == 2
+    resumed_coeffs, resumed = generate_and_save_data(1, output_prefix=prefix, chunk_size=4, encoding=encoding,
+                                                     resume=True, **RUN)
+    assert np.array_equal(resumed_coeffs, coeffs)
+    if encoding != 'compact':
+        resumed, reference = (resumed,), (reference,)
+    for part, expected in zip(resumed, reference):
+        assert np.array_equal(part, expected)
+
+
+def test_resume_with_other_parameters_fails(tmp_path, monkeypatch):
+    prefix = str(tmp_path / 'data')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 1)
+        with pytest.raises(KeyboardInterrupt):
+            generate_and_save_data(1, output_prefix=prefix, chunk_size=4, **RUN)
+    with pytest.raises(ValueError, match='Cannot resume'):
+        generate_and_save_data(1, output_prefix=prefix, chunk_size=8, resume=True, **RUN)
+
+
+def test_loader_follows_the_latest_run(tmp_path):
+    prefix = str(tmp_path / 'data')
+    generate_and_save_data(1, output_prefix=prefix, encoding='full', **RUN)
+    assert find_convergence_data(prefix, 1)[0] == 'full'
+    # The full tensor of the older run is still on disk
+    _, summary = generate_and_save_data(1, output_prefix=prefix, encoding='aggregate', **RUN)
+    encoding, arrays = find_convergence_data(prefix, 1)
+    assert encoding == 'aggregate'
+    assert np.array_equal(arrays['summary'], summary)
+
+
+@pytest.mark.parametrize('encoding', ['full', 'compact', 'aggregate'])
+def test_recorded_costs_order_the_next_run(tmp_path, monkeypatch, encoding):
+    prefix = str(tmp_path / 'data')
+    assert recorded_row_costs(prefix, 1, RUN['num_points']) is None
+    coeffs, first_run = generate_and_save_data(1, output_prefix=prefix, chunk_size=4, encoding=encoding, **RUN)
+    costs = recorded_row_costs(prefix, 1, RUN['num_points'])
+    assert costs.shape == (len(coeffs),) and np.isfinite(costs).all()
+    assert recorded_row_costs(prefix, 1, RUN['num_points'] + 1) is None
+    if encoding != 'compact':
+        first_run = (first_run,)
+    first_run = [np.array(part) for part in first_run]
+
+    # Every chunk of the next run is ordered by the recorded costs instead of a pilot
+    passed = []
+    original = data_generation_grid.run_scheduled
+
+    def recording(kernel, num_items, *args, thread_work=None):
+        passed.append(args[-1])
+        return original(kernel, num_items, *args, thread_work=thread_work)
+    monkeypatch.setattr(data_generation_grid, 'run_scheduled', recording)
+    _, second_run = generate_and_save_data(1, output_prefix=prefix, chunk_size=4, encoding=encoding, **RUN)
+    assert len(passed) == 4
+    assert np.array_equal(np.concatenate(passed), costs)
+    if encoding != 'compact':
+        second_run = (second_run,)
+    for part, expected in zip(second_run, first_run):
+        assert np.array_equal(part, expected)
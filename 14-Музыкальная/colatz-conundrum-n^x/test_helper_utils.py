@@ -0,0 +1,111 @@
+"""
+Exactness of the integer step engine beyond int64: the 128-bit tier and the
+big-int fallback for unresolved steps, against plain Python integers.
+"""
+
+import numpy as np
+from helper_utils import (INT64_MAX, STEP_ESCAPED, STEP_EXACT, STEP_UNRESOLVED, batch_simulate_lockstep,
+                          batch_simulate_trajectories, batch_trajectory_stats, collatz_polynomial_step,
+                          simulate_trajectory)
+
+N40 = 2**40 + 1
+# Horner cancels the leading terms, so the float bound of the partial results stays
+# about 2 * N40**2 times above their values; the last one (N40**4) overflows 128 bits
+# and the bound is too loose to certify the escape: the step is unresolved.
+UNRESOLVED_COEFFS = [1, -(N40 - 1), -(N40 - 1), 0, 0, 0, 0]
+
+
+def python_step(n, coeffs):
+    if n % 2 == 0:
+        return n // 2
+    result = 0
+    for k in coeffs:
+        result = result * n + k
+    return result
+
+
+def python_trajectory(n, coeffs, max_steps, max_value):
+    """(length, converged) by the definition, without cycle detection."""
+    for step in range(max_steps):
+        n = python_step(n, coeffs)
+        if n == 1:
+            return step + 2, 1
+        if abs(n) > max_value:
+            return step + 2, 0
+    return max_steps + 1, 0
+
+
+def check_step(n, coeffs):
+    value, status = collatz_polynomial_step(np.int64(n), np.array(coeffs, dtype=np.int64))
+    exact = python_step(n, coeffs)
+    if abs(exact) <= INT64_MAX:
+        assert status == STEP_EXACT
+        assert value == exact
+    else:
+        assert status in (STEP_ESCAPED, STEP_UNRESOLVED)
+        if status == STEP_ESCAPED:
+            assert value == (INT64_MAX if exact > 0 else -INT64_MAX)
+    return status
+
+
+def test_128_bit_tier_near_2_63():
+    # Float bounds above FAST_LIMIT, so these take the 128-bit tier
+    cases = [
+        (3 * 10**18 + 1, [3, 1]),             # 9e18 + 4, just inside int64
+        (3074457345618258603, [3, 1]),        # 2**63 + 2, just outside
+        (2**62 + 1, [1, -(2**62)]),           # cancels to 1
+        (-(2**62 + 1), [1, 2**62 + 1]),       # cancels to 0
+        (-(2**62 + 1), [2, 2**62]),           # -(2**62 + 2)
+        (2**61 + 1, [4, -(2**62)]),           # 2**62 + 4
+        (2**61 + 1, [-4, 2**62 - 1]),         # -(2**62 + 5)
+        (INT64_MAX, [1, -(INT64_MAX - 1)]),   # cancels to 1
+    ]
+    for n, coeffs in cases:
+        assert check_step(n, coeffs) != STEP_UNRESOLVED
+
+
+def test_128_bit_tier_near_2_127():
+    cases = [
+        (INT64_MAX, [1, 0, 1]),            # about 2**126
+        (INT64_MAX, [2, 0, 1]),            # about 2**127, still inside 128 bits
+        (INT64_MAX, [2, 0, -(2**62)]),
+        (-INT64_MAX, [-2, 5, 3]),
+        (INT64_MAX, [4, 0, 1]),            # about 2**128: certified escape
+        (INT64_MAX, [-4, 0, 1]),
+        (2**43 + 1, [1, 0, 0, 1]),         # 2**129 + ...
+    ]
+    for n, coeffs in cases:
+        assert check_step(n, coeffs) == STEP_ESCAPED
+
+
+def test_unresolved_step():
+    assert check_step(N40, UNRESOLVED_COEFFS) == STEP_UNRESOLVED
+    trajectory, converged = simulate_trajectory(N40, np.array(UNRESOLVED_COEFFS, dtype=np.int64))
+    assert trajectory.dtype == object
+    assert trajectory[-1] == python_step(N40, UNRESOLVED_COEFFS)
+    assert not converged
+
+
+def test_batch_matches_python_integers():
+    max_steps = 200
+    max_value = 10**18
+    for coeffs in ([3, 1], [1, -(2**62)], [2, 0, 1], [1, 0, -(2**62) + 3], UNRESOLVED_COEFFS):
+        starts = np.array([N40, 2**62 + 1, 2**62 + 3, 3 * 10**18 + 1, INT64_MAX, -INT64_MAX,
+                           -(2**62 + 1), 1, 7, 27], dtype=np.int64)
+        coeffs = np.array(coeffs, dtype=np.int64)
+        expected = np.array([python_trajectory(int(n), coeffs.tolist(), max_steps, max_value) for n in starts])
+        # The starts themselves may exceed max_value; the kernels take the first step regardless
+        assert np.array_equal(batch_simulate_trajectories(starts, coeffs, max_steps, max_value), expected)
+        assert np.array_equal(batch_trajectory_stats(starts, coeffs, max_steps, max_value)[:, :2], expected)
+        unresolved = batch_simulate_lockstep(starts, coeffs, max_steps, max_value, 4)
+        resolved = unresolved[:, 0] != 0
+        assert np.array_equal(unresolved[resolved], expected[resolved])
+
+
+def test_unresolved_trajectories_are_resolved():
+    coeffs = np.array(UNRESOLVED_COEFFS, dtype=np.int64)
+    starts = np.array([N40, N40 + 2, 3], dtype=np.int64)
+    results = batch_simulate_trajectories(starts, coeffs, 100, 10**18)
+    assert np.all(results[:, 0] > 0)
+    expected = [python_trajectory(int(n), UNRESOLVED_COEFFS, 100, 10**18) for n in starts]
+    assert results.tolist() == [list(e) for e in expected]
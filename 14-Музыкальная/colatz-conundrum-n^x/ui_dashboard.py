@@ -6,7 +6,7 @@ Provides a simple CLI dashboard for running analyses and generating reports.
 
 import argparse
 import sys
-from helper_utils import log_message
+from helper_utils import log_message, CONVERGENCE_ENCODINGS
 from data_generation_grid import generate_and_save_data
 from analysis_dynamics import analyze_degree
 from control_checks import run_all_checks
@@ -22,7 +22,9 @@ def run_data_generation(args):
         start_range=(args.start_min, args.start_max, args.num_starts),
         max_steps=args.max_steps,
         max_value=10**args.max_value_exp,
-        output_prefix=args.output_prefix
+        output_prefix=args.output_prefix,
+        encoding=args.encoding,
+        resume=args.resume
     )
     log_message("Data generation complete")
 
@@ -99,6 +101,10 @@ def create_parser():
                            help='Maximum steps per trajectory (default: 1000)')
     gen_parser.add_argument('--max-value-exp', type=int, default=18,
                            help='Maximum value exponent (10^exp) (default: 18)')
+    gen_parser.add_argument('--encoding', choices=CONVERGENCE_ENCODINGS, default='full',
+                           help='Storage of the results: full tensor, compact, or aggregated per coefficient set (default: full)')
+    gen_parser.add_argument('--resume', action='store_true',
+                           help='Continue an interrupted run, skipping the chunks already saved')
 
     # Analysis
     subparsers.add_parser('analyze', help='Run analysis')
@@ -118,6 +124,8 @@ def create_parser():
     pipeline_parser.add_argument('--num-starts', type=int, default=50)
     pipeline_parser.add_argument('--max-steps', type=int, default=1000)
     pipeline_parser.add_argument('--max-value-exp', type=int, default=18)
+    pipeline_parser.add_argument('--encoding', choices=CONVERGENCE_ENCODINGS, default='full')
+    pipeline_parser.add_argument('--resume', action='store_true')
 
     return parser
 
@@ -1,24 +1,366 @@
+import json
+import os
 import numpy as np
-from data_generation import classify_ab
+import numba
+import queue
+import time
+from dataclasses import dataclass, field
+from data_generation import mean_log_steps_cells, refine_exact, PRECISIONS, PRECISION_FLOAT64
 from multiprocessing import Pool
+from tile_queue import TileCoordinator
 import tqdm
 
-def generate_phase_data(a_range, b_range, n_starts, max_steps=1000, max_value=1e6, num_processes=8):
+@dataclass
+class PhaseGrid:
+    """
+    Dense phase map result.
+    data[i, j] is the average log(steps + 1) at (a_vals[i], b_vals[j]),
+    lost[i, j] the fraction of its orbits that lost precision (see data_generation.PRECISIONS),
+    cost[i, j] the measured seconds of work per cell (NaN where it was not computed in this run).
+    """
+    data: np.ndarray
+    a_vals: np.ndarray
+    b_vals: np.ndarray
+    meta: dict = field(default_factory=dict)
+    lost: np.ndarray = None
+    cost: np.ndarray = None
+
+# Cells near the light zone cost 100-1000x more than those in the death zone, and they
+# cluster. Cells are therefore dispatched longest-predicted-first (LPT), by blocks of
+# COST_BLOCK x COST_BLOCK cells whose cost is the mean measured cost of the block's cells:
+# recorded by earlier runs (checkpoint, cell cache) or measured by a pilot pass that
+# computes one cell of every block without a recorded cost first.
+COST_BLOCK = 8
+
+# Progressive runs compute a strided subsample first: every 8th cell along a and b, then
+# every 4th, and so on, each level adding only the cells no coarser level had. Within a
+# level cells are still dispatched longest-predicted-first; the coarsest level doubles as
+# the pilot.
+PROGRESSIVE_STRIDES = (8, 4, 2, 1)
+
+def generate_phase_data(a_range, b_range, n_starts, max_steps=1000, max_value=1e6, num_processes=8,
+                        target_tile_seconds=0.5, checkpoint_dir=None, resume=False, checkpoint_seconds=30.0,
+                        cache=None, precision='float64', serve=None, progressive=False, preview=None,
+                        preview_seconds=30.0, authkey=None):
     """
     Generate phase data for grid of a, b.
-    Returns: dict with (a,b) -> average steps
+    Cells are dispatched most expensive first (see COST_BLOCK) in tiles sized by their
+    predicted cost, aiming at target_tile_seconds of work per task.
+    With checkpoint_dir the grid lives in a memory-mapped file there, and a manifest
+    records the run parameters and finished tiles at most every checkpoint_seconds;
+    resume=True picks up such a run and only computes the cells still missing.
+    With a CellCache, cells cached under the same settings are taken from it and
+    the newly computed ones are added to it, with their cost.
+    precision: 'float32' for quick previews, 'float64', or 'exact' to redo in integer
+    arithmetic the orbits of integral cells that outgrew float64
+    serve: (host, port) to serve the tiles on to workers on other machines (see tile_queue)
+    instead of computing them in a local Pool; num_processes is then the total number of
+    worker processes
+    authkey: shared secret of the served workers (see TileCoordinator)
+    progressive: compute the cells coarse to fine (see PROGRESSIVE_STRIDES); Ctrl-C then
+    stops the run early and returns the preview instead of raising
+    preview: callable taking a PhaseGrid preview (see preview_grid), called after every
+    level and at most every preview_seconds in between
+    Returns: PhaseGrid with float32 (len(a_range), len(b_range)) data, lost and cost grids;
+    the preview_grid of the cells done for an interrupted progressive run
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    a_vals = np.asarray(a_range, dtype=np.float64)
+    b_vals = np.asarray(b_range, dtype=np.float64)
+    starts = np.asarray(n_starts, dtype=np.float64)
+    meta = {'n_starts': len(starts), 'max_steps': max_steps, 'max_value': max_value, 'precision': precision}
+    shape = (len(a_vals), len(b_vals))
+
+    if checkpoint_dir is None:
+        layers = np.empty((3,) + shape, dtype=np.float32)
+        manifest = None
+    else:
+        params = dict(meta, a_vals=a_vals.tolist(), b_vals=b_vals.tolist())
+        layers, manifest = open_checkpoint(checkpoint_dir, params, (3,) + shape, resume)
+    data, lost, cost = layers
+    completed = np.zeros(shape, dtype=bool)
+    for i0, i1, j0, j1 in (manifest['completed'] if manifest else []):
+        completed[i0:i1, j0:j1] = True
+    cost[~completed] = np.nan
+    # Costs known before this run: checkpointed cells, then any cached cell in the grid's area
+    known_cost = cost.astype(np.float64)
+    if cache is not None:
+        settings = cache.settings_id(starts, max_steps, max_value, precision)
+        cached, cached_lost = cache.lookup(settings, a_vals, b_vals)
+        hits = ~completed & ~np.isnan(cached)
+        data[hits] = cached[hits]
+        lost[hits] = cached_lost[hits]
+        completed |= hits
+        print(f"Cell cache: {int(hits.sum())}/{data.size} cells reused")
+        recorded = cache.costs(settings, a_vals, b_vals)
+        known_cost = np.where(np.isnan(known_cost), recorded, known_cost)
+
+    missing = np.flatnonzero(~completed)
+    pilot = pilot_cells(known_cost, missing)
+
+    # Grid axes and n_starts are shipped once per worker, not once per task
+    initargs = (a_vals, b_vals, starts, int(max_steps), float(max_value), precision)
+    flat_data = data.reshape(-1)
+    flat_lost = lost.reshape(-1)
+    flat_cost = cost.reshape(-1)
+    flat_completed = completed.reshape(-1)
+    last_save = last_preview = time.monotonic()
+
+    def run_pass(cells, predicted=None):
+        nonlocal last_save, last_preview
+        tiles = iter_adaptive_tiles(pool, cells, num_processes, target_tile_seconds, progress, predicted)
+        for flat, block, seconds in tiles:
+            flat_data[flat] = block[0]
+            flat_lost[flat] = block[1]
+            flat_cost[flat] = seconds / len(flat)
+            flat_completed[flat] = True
+            if cache is not None:
+                cache.store(settings, a_vals[flat // shape[1]], b_vals[flat % shape[1]], block[0], block[1],
+                            flat_cost[flat])
+            if manifest is not None:
+                manifest['completed'].extend(cell_runs(flat, shape[1]))
+            if time.monotonic() - last_save > checkpoint_seconds:
+                save_progress(checkpoint_dir, layers, manifest, cache)
+                last_save = time.monotonic()
+            if preview is not None and time.monotonic() - last_preview > preview_seconds:
+                preview(preview_grid(data, lost, cost, completed, a_vals, b_vals, meta))
+                last_preview = time.monotonic()
+
+    try:
+        if missing.size and not progressive:
+            with worker_pool(num_processes, initargs, serve, authkey) as pool, \
+                    tqdm.tqdm(total=missing.size) as progress:
+                run_pass(pilot)
+                known_cost.reshape(-1)[pilot] = flat_cost[pilot]
+                rest = np.setdiff1d(missing, pilot)
+                predicted = predict_costs(known_cost).reshape(-1)
+                rest = dispatch_order(rest, predicted, shape)
+                run_pass(rest, predicted[rest])
+        elif missing.size:
+            with worker_pool(num_processes, initargs, serve, authkey) as pool, \
+                    tqdm.tqdm(total=missing.size) as progress:
+                for cells in progressive_levels(missing, shape):
+                    if np.isnan(known_cost).all():
+                        run_pass(cells)
+                    else:
+                        predicted = predict_costs(known_cost).reshape(-1)
+                        cells = dispatch_order(cells, predicted, shape)
+                        run_pass(cells, predicted[cells])
+                    known_cost.reshape(-1)[cells] = flat_cost[cells]
+                    if preview is not None:
+                        preview(preview_grid(data, lost, cost, completed, a_vals, b_vals, meta))
+                        last_preview = time.monotonic()
+    except KeyboardInterrupt:
+        if not progressive:
+            raise
+        print(f"Interrupted with {completed.mean():.0%} of the cells done")
+    finally:
+        # Also on errors and Ctrl-C: every tile listed so far is already in data
+        save_progress(checkpoint_dir, layers, manifest, cache)
+
+    if not completed.all():
+        return preview_grid(data, lost, cost, completed, a_vals, b_vals, meta)
+    if manifest is not None:
+        data, lost, cost = np.array(layers)
+    return PhaseGrid(data, a_vals, b_vals, meta, lost, cost)
+
+def worker_pool(num_processes, initargs, serve=None, authkey=None):
+    """Local Pool, or a TileCoordinator serving the tasks on address serve."""
+    if serve is None:
+        return Pool(num_processes, initializer=init_worker, initargs=initargs)
+    return TileCoordinator(serve, init_worker, initargs, authkey)
+
+def cell_blocks(flat, shape, block=COST_BLOCK):
+    """Index of the COST_BLOCK x COST_BLOCK block of each flat (raster) cell index."""
+    num_b = shape[1]
+    blocks_per_row = -(-num_b // block)
+    return (flat // num_b // block) * blocks_per_row + (flat % num_b) // block
+
+def pilot_cells(known_cost, missing, block=COST_BLOCK):
+    """One missing cell (the first in raster order) of every block that has no known cost."""
+    known_blocks = np.unique(cell_blocks(np.flatnonzero(~np.isnan(known_cost)), known_cost.shape, block))
+    candidates = missing[~np.isin(cell_blocks(missing, known_cost.shape, block), known_blocks)]
+    _, first = np.unique(cell_blocks(candidates, known_cost.shape, block), return_index=True)
+    return candidates[first]
+
+def predict_costs(known_cost, block=COST_BLOCK):
+    """
+    Predicted seconds per cell: the mean known cost of the cell's block, or the mean of
+    all known costs for blocks without any.
     """
-    data = {}
-    tasks = [(a, b, n_starts, max_steps, max_value) for a in a_range for b in b_range]
+    num_a, num_b = known_cost.shape
+    padded = np.pad(known_cost, ((0, -num_a % block), (0, -num_b % block)), constant_values=np.nan)
+    blocks = padded.reshape(padded.shape[0] // block, block, padded.shape[1] // block, block)
+    known = ~np.isnan(blocks)
+    counts = known.sum(axis=(1, 3))
+    sums = np.where(known, blocks, 0.0).sum(axis=(1, 3))
+    fallback = np.nanmean(known_cost) if known.any() else 1.0
+    block_cost = np.where(counts > 0, sums / np.maximum(counts, 1), fallback)
+    return np.repeat(np.repeat(block_cost, block, axis=0), block, axis=1)[:num_a, :num_b]
 
-    with Pool(num_processes) as pool:
-        results = list(tqdm.tqdm(pool.imap(process_task, tasks), total=len(tasks)))
+def dispatch_order(cells, predicted, shape):
+    """
+    Cells sorted block by block, most expensive predicted block first (LPT); cells of a
+    block stay together in raster order, so finished tiles form few manifest runs.
+    """
+    return cells[np.lexsort((cells, cell_blocks(cells, shape), -predicted[cells]))]
+
+def progressive_levels(cells, shape, strides=PROGRESSIVE_STRIDES):
+    """Flat cell indices split by refinement level: the coarsest stride dividing both indices."""
+    i, j = np.divmod(cells, shape[1])
+    level = np.zeros(len(cells), dtype=np.int64)
+    for stride in sorted(strides, reverse=True):
+        level[(level == 0) & (i % stride == 0) & (j % stride == 0)] = stride
+    return [cells[level == stride] for stride in sorted(strides, reverse=True) if np.any(level == stride)]
 
-    for (a, b), avg_steps in results:
-        data[(a, b)] = avg_steps
-    return data
+def preview_fill(values, done, strides=PROGRESSIVE_STRIDES):
+    """
+    values with every cell not done taken from the nearest done cell at or below its
+    indices on the lattice of the finest stride that has one, NaN where no stride does.
+    """
+    out = np.where(done, values, np.nan)
+    filled = done.copy()
+    i, j = np.indices(values.shape)
+    for stride in sorted(strides)[1:]:
+        source = (i // stride * stride, j // stride * stride)
+        take = ~filled & done[source]
+        out[take] = values[source[0][take], source[1][take]]
+        filled |= take
+    return out
 
-def process_task(args):
-    a, b, n_starts, max_steps, max_value = args
-    avg_steps = classify_ab(a, b, n_starts, max_steps, max_value)
-    return (a, b), avg_steps
\ No newline at end of file
+def preview_grid(data, lost, cost, done, a_vals, b_vals, meta, strides=PROGRESSIVE_STRIDES):
+    """
+    PhaseGrid of a run in progress: data filled in by preview_fill, lost and cost NaN where
+    not computed yet, and meta['preview_stride'] the finest stride whose lattice is complete
+    (None if not even the coarsest is).
+    """
+    stride = next((s for s in sorted(strides) if done[::s, ::s].all()), None)
+    return PhaseGrid(preview_fill(data, done, strides), a_vals, b_vals, dict(meta, preview_stride=stride),
+                     np.where(done, lost, np.nan), np.where(done, cost, np.nan))
+
+def cell_runs(flat, num_b):
+    """Split flat cell indices into tiles (i, i + 1, j0, j1) of consecutive adjacent cells in a row."""
+    breaks = np.flatnonzero((np.diff(flat) != 1) | (np.diff(flat // num_b) != 0)) + 1
+    return [[int(run[0] // num_b), int(run[0] // num_b) + 1, int(run[0] % num_b), int(run[-1] % num_b) + 1]
+            for run in np.split(flat, breaks)]
+
+def save_progress(checkpoint_dir, layers, manifest, cache):
+    if cache is not None:
+        cache.flush()
+    if manifest is not None:
+        save_checkpoint(checkpoint_dir, layers, manifest)
+
+def open_checkpoint(path, params, shape, resume=False):
+    """
+    Open the checkpoint in directory path: grid.npy holds the (partial) float32 layers of
+    the given shape (data, lost and cost grids) and manifest.json the run parameters and
+    the completed (i0, i1, j0, j1) tiles.
+    An existing checkpoint is reused only with resume=True and matching parameters.
+    Returns: (grid memory map, manifest dict)
+    """
+    params = json.loads(json.dumps(params))
+    grid_file = os.path.join(path, 'grid.npy')
+    manifest_file = os.path.join(path, 'manifest.json')
+    if resume and os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest['params'] != params:
+            raise ValueError(f"Cannot resume {path}: it was started with different parameters")
+        print(f"Resuming {path}: {len(manifest['completed'])} tiles already done")
+        return np.load(grid_file, mmap_mode='r+'), manifest
+    os.makedirs(path, exist_ok=True)
+    manifest = {'params': params, 'completed': []}
+    data = np.lib.format.open_memmap(grid_file, mode='w+', dtype=np.float32, shape=shape)
+    save_checkpoint(path, data, manifest)
+    return data, manifest
+
+def save_checkpoint(path, data, manifest):
+    # Grid first, so the manifest never lists a tile that is not on disk
+    data.flush()
+    tmp = os.path.join(path, 'manifest.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(path, 'manifest.json'))
+
+def iter_adaptive_tiles(pool, cells, num_processes, target_tile_seconds, progress, predicted=None):
+    """
+    Submit the flat cell indices in the given order to the pool, a tile of consecutive
+    cells per task, and yield (tile cells, block, seconds) as tiles complete.
+    With predicted per-cell costs a tile takes the next cells up to target_tile_seconds
+    of predicted work, the prediction being rescaled by the measured/predicted ratio of
+    the finished tiles; otherwise the tile size follows the running per-cell cost,
+    starting at one cell.
+    """
+    total = len(cells)
+    if predicted is not None:
+        cumulative = np.cumsum(predicted)
+    done = queue.Queue()
+    cursor = 0
+    cells_per_tile = 1
+    seconds_per_cell = None
+    scale = 1.0
+    in_flight = 0
+
+    while cursor < total or in_flight:
+        while cursor < total and in_flight < 2 * num_processes:
+            # Keep tiles small enough that the tail still spreads over all workers
+            balance_cap = max(1, (total - cursor) // (2 * num_processes))
+            if predicted is not None:
+                base = cumulative[cursor - 1] if cursor else 0.0
+                end = np.searchsorted(cumulative, base + target_tile_seconds / scale, side='right')
+                cells_per_tile = max(1, end - cursor)
+            size = min(cells_per_tile, balance_cap)
+            tile = cells[cursor:cursor + size]
+            start = cursor
+            cursor += len(tile)
+            pool.apply_async(compute_tile, (tile,), callback=lambda r, start=start: done.put((start, r)),
+                             error_callback=lambda e: done.put((None, e)))
+            in_flight += 1
+
+        start, result = done.get()
+        if isinstance(result, BaseException):
+            raise result
+        tile, block, seconds = result
+        in_flight -= 1
+
+        if predicted is not None:
+            expected = predicted[start:start + len(tile)].sum()
+            if expected > 0 and seconds > 0:
+                scale = 0.7 * scale + 0.3 * seconds / expected
+        else:
+            cost = seconds / len(tile)
+            seconds_per_cell = cost if seconds_per_cell is None else 0.7 * seconds_per_cell + 0.3 * cost
+            cells_per_tile = int(max(1, target_tile_seconds / max(seconds_per_cell, 1e-9)))
+
+        progress.update(len(tile))
+        yield tile, block, seconds
+
+_worker_args = None
+
+def init_worker(a_vals, b_vals, n_starts, max_steps, max_value, precision='float64'):
+    global _worker_args
+    _worker_args = (a_vals, b_vals, n_starts, max_steps, max_value, precision)
+    # Parallelism comes from the Pool; keep the kernel single-threaded per process
+    numba.set_num_threads(1)
+    # Compile up front so JIT time does not pollute the first tile cost
+    mean_log_steps_cells(a_vals[:1], b_vals[:1], n_starts[:1], 1, max_value, kernel_precision_code(precision))
+
+def kernel_precision_code(precision):
+    """Kernel-side precision code; 'exact' runs in float64 and is refined afterwards."""
+    return PRECISION_FLOAT64 if precision == 'exact' else PRECISIONS.index(precision)
+
+def compute_tile(cells):
+    """
+    Compute the given flat (raster) cell indices.
+    Returns: (cells, block, seconds); block stacks the values and lost fractions of the cells
+    """
+    a_vals, b_vals, n_starts, max_steps, max_value, precision = _worker_args
+    t0 = time.perf_counter()
+    num_b = b_vals.shape[0]
+    a_cells, b_cells = a_vals[cells // num_b], b_vals[cells % num_b]
+    values, lost = mean_log_steps_cells(a_cells, b_cells, n_starts, max_steps, max_value,
+                                        kernel_precision_code(precision))
+    if precision == 'exact':
+        refine_exact(values, lost, a_cells, b_cells, n_starts, max_steps, max_value)
+    return cells, np.stack([values, lost]), time.perf_counter() - t0
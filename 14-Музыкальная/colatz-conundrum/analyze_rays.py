@@ -1,8 +1,13 @@
 import numpy as np
 from numba import jit
 import matplotlib.pyplot as plt
+from data_generation import (orbit_outcome, OUTCOME_ESCAPED, OUTCOME_VANISHED, OUTCOME_CYCLED,
+                             OUTCOME_MAX_STEPS)
 
-@jit(nopython=True)
+OUTCOME_NAMES = {OUTCOME_ESCAPED: 'escaped', OUTCOME_VANISHED: 'vanished',
+                 OUTCOME_CYCLED: 'cycled', OUTCOME_MAX_STEPS: 'max_steps'}
+
+@jit(nopython=True, cache=True)
 def simulate_orbit_with_values(n_start, a, b, max_steps=1000, max_value=1e6):
     """
     Simulate the orbit and collect all values.
@@ -26,49 +31,21 @@ def simulate_orbit_with_values(n_start, a, b, max_steps=1000, max_value=1e6):
 def analyze_ray_trajectory(a, b, n_start=1, max_steps=1000, max_value=1e7):
     """Analyze trajectory for specific a,b parameters"""
     steps, values = simulate_orbit_with_values(n_start, a, b, max_steps, max_value)
-
-    # Check for cycles or patterns
-    cycle_detected = False
-    cycle_length = 0
-    if len(values) > 10:
-        # Simple cycle detection - check if last few values repeat
-        last_10 = values[-10:]
-        for i in range(1, len(last_10)//2 + 1):
-            if np.allclose(last_10[-i:], last_10[-2*i:-i], rtol=1e-10):
-                cycle_detected = True
-                cycle_length = i
-                break
+    outcome, _, cycle_entry, cycle_length = orbit_outcome(float(n_start), float(a), float(b), max_steps, float(max_value))
+    cycle_detected = outcome == OUTCOME_CYCLED
 
     return {
         'steps': steps,
         'values': values,
         'diverged': steps >= max_steps,
+        'outcome': OUTCOME_NAMES[outcome],
         'cycle_detected': cycle_detected,
+        'cycle_entry': cycle_entry,
         'cycle_length': cycle_length,
+        'cycle_values': values[cycle_entry:cycle_entry + cycle_length] if cycle_detected else values[:0],
         'final_value': values[-1] if len(values) > 0 else None
     }
 
-    # Check for cycles or patterns
-    cycle_detected = False
-    cycle_length = 0
-    if len(values) > 10:
-        # Simple cycle detection - check if last few values repeat
-        last_10 = values[-10:]
-        for i in range(1, len(last_10)//2 + 1):
-            if last_10[-i:] == last_10[-2*i:-i]:
-                cycle_detected = True
-                cycle_length = i
-                break
-
-    return {
-        'steps': steps,
-        'values': values,
-        'diverged': steps >= max_steps,
-        'cycle_detected': cycle_detected,
-        'cycle_length': cycle_length,
-        'final_value': values[-1] if values else None
-    }
-
 def plot_trajectory_analysis(a, b, trajectory_data):
     """Plot trajectory analysis"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
@@ -112,9 +89,12 @@ if __name__ == '__main__':
 
         print(f"  Steps: {trajectory['steps']}")
         print(f"  Diverged: {trajectory['diverged']}")
+        print(f"  Outcome: {trajectory['outcome']}")
         print(f"  Cycle detected: {trajectory['cycle_detected']}")
         if trajectory['cycle_detected']:
+            print(f"  Cycle entry: step {trajectory['cycle_entry']}")
             print(f"  Cycle length: {trajectory['cycle_length']}")
+            print(f"  Cycle values: {trajectory['cycle_values']}")
         print(f"  Final value: {trajectory['final_value']}")
         print()
 
@@ -6,15 +6,8 @@ from scipy import ndimage
 def generate_extended_phase_data(a_range, b_range, n_starts, max_steps=5000, max_value=1e9, num_processes=32):
     """Generate phase data for extended ranges"""
     print("Generating extended phase data for ray analysis...")
-    data_dict = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
-
-    # Convert dict to 2D array
-    data = np.zeros((len(a_range), len(b_range)))
-    for i, a in enumerate(a_range):
-        for j, b in enumerate(b_range):
-            data[i, j] = data_dict.get((a, b), 0)
-
-    return data
+    phase = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
+    return phase.data
 
 def find_rays_by_gradient(data, a_range, b_range, threshold_percentile=95):
     """Find rays by analyzing gradients in the phase data"""
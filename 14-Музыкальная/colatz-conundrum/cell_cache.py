@@ -0,0 +1,132 @@
+import hashlib
+import sqlite3
+import numpy as np
+
+# Bumped whenever the orbit kernels change what a cell evaluates to
+KERNEL_VERSION = 2
+
+class CellCache:
+    """
+    Persistent cache of phase map cells in an SQLite file.
+    A cell is addressed by its content: the digest of the simulation settings
+    (n_starts, max_steps, max_value, precision, kernel version) and the (a, b) point, rounded
+    to key_decimals so that grids built with different linspace bounds share cells.
+    Holds at most max_cells cells; the least recently used ones are evicted first.
+    Cells also keep the seconds of work they took, from which costs() predicts the cost
+    of nearby cells for later runs.
+    """
+    def __init__(self, path='cell_cache.sqlite', max_cells=2_000_000, key_decimals=12):
+        self.path = path
+        self.max_cells = max_cells
+        self.key_decimals = key_decimals
+        self.db = sqlite3.connect(path)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(cells)")]
+        if columns and not {'lost', 'cost'} <= set(columns):
+            # Written by an older version of this module; its cells are rebuilt on demand
+            self.db.execute("DROP TABLE cells")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS settings (id INTEGER PRIMARY KEY, digest TEXT UNIQUE);
+            CREATE TABLE IF NOT EXISTS cells (
+                settings INTEGER, a REAL, b REAL, value REAL, lost REAL, cost REAL, used INTEGER,
+                PRIMARY KEY (settings, a, b)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS cells_used ON cells (used);
+        """)
+        self.clock = self.db.execute("SELECT COALESCE(MAX(used), 0) FROM cells").fetchone()[0]
+        self.pending = []
+
+    def settings_id(self, n_starts, max_steps, max_value, precision='float64'):
+        """Row id of the settings digest, created on first use."""
+        digest = hashlib.sha1(np.asarray(n_starts, dtype=np.float64).tobytes())
+        digest.update(repr((int(max_steps), float(max_value), precision, KERNEL_VERSION)).encode())
+        digest = digest.hexdigest()
+        self.db.execute("INSERT OR IGNORE INTO settings (digest) VALUES (?)", (digest,))
+        return self.db.execute("SELECT id FROM settings WHERE digest = ?", (digest,)).fetchone()[0]
+
+    def keys(self, values):
+        return np.round(np.asarray(values, dtype=np.float64), self.key_decimals)
+
+    def lookup(self, settings, a_vals, b_vals):
+        """
+        Cached values over the a_vals x b_vals grid; hits are marked as recently used.
+        Returns: (values, lost) - float64 (len(a_vals), len(b_vals)) arrays, NaN where the cell is not cached
+        """
+        a_keys = self.keys(a_vals)
+        b_keys = self.keys(b_vals)
+        a_index = {a: i for i, a in enumerate(a_keys.tolist())}
+        b_index = {b: j for j, b in enumerate(b_keys.tolist())}
+        grid = np.full((len(a_keys), len(b_keys)), np.nan)
+        lost = np.full_like(grid, np.nan)
+        rows = self.db.execute(
+            "SELECT a, b, value, lost FROM cells WHERE settings = ? AND a BETWEEN ? AND ? AND b BETWEEN ? AND ?",
+            (settings, a_keys.min(), a_keys.max(), b_keys.min(), b_keys.max()))
+        hits = []
+        for a, b, value, lost_fraction in rows:
+            if a in a_index and b in b_index:
+                grid[a_index[a], b_index[b]] = value
+                lost[a_index[a], b_index[b]] = lost_fraction
+                hits.append((a, b))
+        if hits:
+            self.clock += 1
+            self.db.executemany("UPDATE cells SET used = ? WHERE settings = ? AND a = ? AND b = ?",
+                                [(self.clock, settings, a, b) for a, b in hits])
+            self.db.commit()
+        return grid, lost
+
+    def costs(self, settings, a_vals, b_vals):
+        """
+        Recorded seconds per cell over the a_vals x b_vals grid: every cached cell inside
+        the grid's bounds is binned to its nearest grid point, and the bins are averaged.
+        Returns: float64 (len(a_vals), len(b_vals)) array, NaN where no cost was recorded
+        """
+        a_keys = self.keys(a_vals)
+        b_keys = self.keys(b_vals)
+        rows = np.array(self.db.execute(
+            "SELECT a, b, cost FROM cells WHERE settings = ? AND cost IS NOT NULL "
+            "AND a BETWEEN ? AND ? AND b BETWEEN ? AND ?",
+            (settings, a_keys.min(), a_keys.max(), b_keys.min(), b_keys.max())).fetchall(), dtype=np.float64)
+        sums = np.zeros((len(a_keys), len(b_keys)))
+        counts = np.zeros_like(sums)
+        if len(rows):
+            i = nearest_index(a_keys, rows[:, 0])
+            j = nearest_index(b_keys, rows[:, 1])
+            np.add.at(sums, (i, j), rows[:, 2])
+            np.add.at(counts, (i, j), 1)
+        with np.errstate(invalid='ignore'):
+            return sums / np.where(counts > 0, counts, np.nan)
+
+    def store(self, settings, a_cells, b_cells, values, lost, costs=None):
+        """
+        Queue computed cells, their lost fractions and optionally the seconds each took;
+        they are written on the next flush.
+        """
+        costs = [None] * len(values) if costs is None else np.asarray(costs, dtype=np.float64).tolist()
+        self.pending.extend(zip([settings] * len(values), self.keys(a_cells).tolist(), self.keys(b_cells).tolist(),
+                                np.asarray(values, dtype=np.float64).tolist(),
+                                np.asarray(lost, dtype=np.float64).tolist(), costs))
+
+    def flush(self):
+        """Write queued cells, then evict least recently used cells beyond max_cells."""
+        if self.pending:
+            self.clock += 1
+            self.db.executemany("INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [cell + (self.clock,) for cell in self.pending])
+            self.pending = []
+        excess = self.db.execute("SELECT COUNT(*) FROM cells").fetchone()[0] - self.max_cells
+        if excess > 0:
+            self.db.execute("DELETE FROM cells WHERE (settings, a, b) IN "
+                            "(SELECT settings, a, b FROM cells ORDER BY used LIMIT ?)", (excess,))
+        self.db.commit()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+def nearest_index(axis, values):
+    """Index of the nearest point of a grid axis for each value."""
+    if len(axis) == 1:
+        return np.zeros(len(values), dtype=np.intp)
+    order = np.argsort(axis)
+    sorted_axis = axis[order]
+    k = np.clip(np.searchsorted(sorted_axis, values), 1, len(axis) - 1)
+    k -= values - sorted_axis[k - 1] < sorted_axis[k] - values
+    return order[k]
@@ -1,33 +1,444 @@
 import numpy as np
-from numba import jit
+from numba import jit, prange
 
-@jit(nopython=True)
+# Orbit outcomes reported by orbit_outcome
+OUTCOME_ESCAPED = 0    # exceeded max_value
+OUTCOME_VANISHED = 1   # reached |n| < 1e-10
+OUTCOME_CYCLED = 2     # entered a cycle; it can neither escape nor vanish afterwards
+OUTCOME_MAX_STEPS = 3  # none of the above within max_steps
+
+# Precision policies. Beyond the limit of a float type, neighbouring representable
+# values are more than 1 apart, so the parity test says nothing about the true orbit;
+# orbits that step from such a value are counted as lost. 'exact' runs float64 and
+# redoes the lost orbits of integral cells with Python integers (exact_mean_log_steps).
+PRECISIONS = ('float32', 'float64', 'exact')
+PRECISION_FLOAT32 = 0
+PRECISION_FLOAT64 = 1
+FLOAT32_LIMIT = 2.0 ** 24
+FLOAT64_LIMIT = 2.0 ** 53
+
+@jit(nopython=True, cache=True)
+def orbit_step(n, a, b):
+    if abs(n % 2) < 1e-10:  # even
+        return n / 2
+    return a * n + b
+
+@jit(nopython=True, cache=True)
+def detect_cycle(n_start, a, b, max_steps=1000, max_value=1e6):
+    """
+    Iterate the orbit with Brent's cycle detection: the saved value is moved to the
+    current one whenever the distance since the last move reaches a power of two, so a
+    cycle of length L entered after mu steps is found within about 2 * max(mu, L) steps.
+    Returns: (outcome, steps, cycle_length); cycle_length is 0 unless the orbit cycled
+    """
+    n = float(n_start)
+    saved = n
+    power = 1
+    distance = 0
+    for step in range(max_steps):
+        if n > max_value:
+            return OUTCOME_ESCAPED, step, 0
+        if abs(n) < 1e-10:  # avoid division by zero or very small
+            return OUTCOME_VANISHED, step, 0
+        n = orbit_step(n, a, b)
+        distance += 1
+        if n == saved:
+            return OUTCOME_CYCLED, step + 1, distance
+        if distance == power:
+            saved = n
+            power *= 2
+            distance = 0
+    return OUTCOME_MAX_STEPS, max_steps, 0
+
+@jit(nopython=True, cache=True)
+def orbit_outcome(n_start, a, b, max_steps=1000, max_value=1e6):
+    """
+    Classify the orbit of n_start.
+    Returns: (outcome, steps, cycle_entry, cycle_length); for a cycled orbit cycle_entry is
+    the number of steps before the first value on the cycle, otherwise both are 0
+    """
+    outcome, steps, cycle_length = detect_cycle(n_start, a, b, max_steps, max_value)
+    if outcome != OUTCOME_CYCLED:
+        return outcome, steps, 0, 0
+    # Walk two pointers cycle_length apart until they meet at the cycle entry
+    lead = float(n_start)
+    for _ in range(cycle_length):
+        lead = orbit_step(lead, a, b)
+    trail = float(n_start)
+    entry = 0
+    while trail != lead:
+        trail = orbit_step(trail, a, b)
+        lead = orbit_step(lead, a, b)
+        entry += 1
+    return outcome, steps, entry, cycle_length
+
+@jit(nopython=True, cache=True)
 def simulate_orbit(n_start, a, b, max_steps=1000, max_value=1e6):
     """
     Simulate the orbit for given n_start, a, b.
+    A cycled orbit would run to max_steps, so it stops as soon as the cycle is detected.
     Returns: number of steps until divergence or max_steps
     """
+    outcome, steps, cycle_length = detect_cycle(n_start, a, b, max_steps, max_value)
+    return max_steps if outcome == OUTCOME_CYCLED else steps
+
+# Per-cell memo of steps-to-outcome for small positive integer iterates.
+# The table covers 1 <= n < MEMO_SPAN * max(n_starts); entries hold the remaining steps
+# until the orbit escapes or vanishes, MEMO_NEVER for values on or leading into a cycle.
+MEMO_SPAN = 16
+MEMO_UNKNOWN = -1
+MEMO_NEVER = np.iinfo(np.int64).max
+
+@jit(nopython=True, cache=True)
+def memo_slot(n, memo_size):
+    """Index of n in the memo table, or -1 when n is not an integer in [1, memo_size)."""
+    if 1.0 <= n < memo_size and n == np.floor(n):
+        return int(n)
+    return -1
+
+@jit(nopython=True, cache=True)
+def memo_fill(memo, memo_lost, path_slots, path_steps, count, end_step, remaining, last_lost, tail_lost):
+    """
+    Record the remaining steps for the memo slots visited on the path up to end_step.
+    A slot's continuation lost precision if the path did at or after its step
+    (last_lost is the last such step) or the continuation past end_step did (tail_lost).
+    """
+    for k in range(count):
+        if remaining == MEMO_NEVER:
+            memo[path_slots[k]] = MEMO_NEVER
+        else:
+            memo[path_slots[k]] = remaining + end_step - path_steps[k]
+        memo_lost[path_slots[k]] = tail_lost or last_lost >= path_steps[k]
+
+@jit(nopython=True, cache=True)
+def simulate_orbit_memo(n_start, a, b, max_steps, max_value, memo, memo_lost, path_slots, path_steps):
+    """
+    simulate_orbit sharing the memo table of its cell: the orbit stops at the first
+    iterate whose remaining steps are known, and records the ones it visited.
+    Only orbits that escape, vanish or cycle are recorded, since a run cut off at
+    max_steps says nothing exact about its iterates.
+    path_slots, path_steps: scratch buffers of at least max_steps entries
+    Returns: (steps, lost) - steps as simulate_orbit, lost when the orbit stepped from a
+    value beyond FLOAT64_LIMIT
+    """
     n = float(n_start)
+    saved = n
+    power = 1
+    distance = 0
+    count = 0
+    last_lost = -1
     for step in range(max_steps):
-        if n > max_value:
-            return step
-        if abs(n) < 1e-10:  # avoid division by zero or very small
-            return step
-        if abs(n % 2) < 1e-10:  # even
-            n = n / 2
+        slot = memo_slot(n, memo.shape[0])
+        if slot >= 0:
+            known = memo[slot]
+            if known != MEMO_UNKNOWN:
+                tail_lost = memo_lost[slot]
+                memo_fill(memo, memo_lost, path_slots, path_steps, count, step, known, last_lost, tail_lost)
+                lost = tail_lost or last_lost >= 0
+                if known == MEMO_NEVER or step + known >= max_steps:
+                    return max_steps, lost
+                return step + known, lost
+            path_slots[count] = slot
+            path_steps[count] = step
+            count += 1
+        if n > max_value or abs(n) < 1e-10:
+            memo_fill(memo, memo_lost, path_slots, path_steps, count, step, 0, last_lost, False)
+            return step, last_lost >= 0
+        if abs(n) >= FLOAT64_LIMIT:
+            last_lost = step
+        n = orbit_step(n, a, b)
+        distance += 1
+        if n == saved:
+            # The last distance steps went once around the cycle, which every slot's continuation repeats
+            cycle_lost = last_lost > step - distance
+            memo_fill(memo, memo_lost, path_slots, path_steps, count, step, MEMO_NEVER, last_lost, cycle_lost)
+            return max_steps, last_lost >= 0
+        if distance == power:
+            saved = n
+            power *= 2
+            distance = 0
+    return max_steps, last_lost >= 0
+
+@jit(nopython=True, cache=True)
+def orbit_steps_checked(n_start, a, b, two, max_steps, max_value, limit):
+    """
+    simulate_orbit in the float type of its arguments: n_start, a, b and two (the
+    number 2) all share that type, so float32 arguments keep every operation in float32.
+    Returns: (steps, lost) - lost when the orbit stepped from a value beyond limit
+    """
+    n = n_start
+    saved = n
+    power = 1
+    distance = 0
+    lost = False
+    for step in range(max_steps):
+        if n > max_value or abs(n) < 1e-10:
+            return step, lost
+        if abs(n) >= limit:
+            lost = True
+        if abs(n % two) < 1e-10:
+            n = n / two
         else:
             n = a * n + b
+        distance += 1
+        if n == saved:
+            return max_steps, lost
+        if distance == power:
+            saved = n
+            power *= 2
+            distance = 0
+    return max_steps, lost
+
+@jit(nopython=True, cache=True)
+def cell_stats(a, b, n_starts, max_steps=1000, max_value=1e6, precision=PRECISION_FLOAT64):
+    """
+    Average log(steps + 1) over all n_starts for a single (a, b) cell, and the fraction
+    of its orbits that lost precision (see PRECISIONS).
+    In float64 the starts share a memo table, so an orbit ends as soon as it reaches a
+    small integer whose fate an earlier start already established.
+    Returns: (mean, lost_fraction)
+    """
+    total = 0.0
+    lost = 0
+    if precision == PRECISION_FLOAT32:
+        a32 = np.float32(a)
+        b32 = np.float32(b)
+        two = np.float32(2.0)
+        for k in range(n_starts.shape[0]):
+            steps, crossed = orbit_steps_checked(np.float32(n_starts[k]), a32, b32, two, max_steps, max_value,
+                                                 FLOAT32_LIMIT)
+            total += np.log(steps + 1)
+            lost += crossed
+    else:
+        memo = np.full(MEMO_SPAN * (int(n_starts.max()) + 1), MEMO_UNKNOWN, dtype=np.int64)
+        memo_lost = np.zeros(memo.shape[0], dtype=np.bool_)
+        path_slots = np.empty(max_steps, dtype=np.int64)
+        path_steps = np.empty(max_steps, dtype=np.int64)
+        for k in range(n_starts.shape[0]):
+            steps, crossed = simulate_orbit_memo(n_starts[k], a, b, max_steps, max_value, memo, memo_lost,
+                                                 path_slots, path_steps)
+            total += np.log(steps + 1)
+            lost += crossed
+    return total / n_starts.shape[0], lost / n_starts.shape[0]
+
+@jit(nopython=True, cache=True)
+def mean_log_steps(a, b, n_starts, max_steps=1000, max_value=1e6):
+    """
+    Average log(steps + 1) over all n_starts for a single (a, b) cell, in float64.
+    """
+    return cell_stats(a, b, n_starts, max_steps, max_value, PRECISION_FLOAT64)[0]
+
+def simulate_orbit_exact(n_start, a, b, max_steps=1000, max_value=1e6):
+    """
+    simulate_orbit for integral n_start, a, b in Python integers, so parity stays exact
+    at any magnitude. Returns: number of steps until divergence or max_steps
+    """
+    n = int(n_start)
+    a = int(a)
+    b = int(b)
+    saved = n
+    power = 1
+    distance = 0
+    for step in range(max_steps):
+        if n > max_value or n == 0:
+            return step
+        n = n // 2 if n % 2 == 0 else a * n + b
+        distance += 1
+        if n == saved:
+            return max_steps
+        if distance == power:
+            saved = n
+            power *= 2
+            distance = 0
     return max_steps
 
+def is_integral(*values):
+    return all(float(v).is_integer() for v in np.ravel(values))
+
+def exact_mean_log_steps(a, b, n_starts, max_steps=1000, max_value=1e6):
+    """
+    mean_log_steps of a cell with integral a, b and n_starts under the 'exact' policy:
+    float64 is exact for orbits that stay below FLOAT64_LIMIT, the lost ones are rerun
+    with Python integers.
+    """
+    total = 0.0
+    for n in np.asarray(n_starts, dtype=np.float64):
+        steps, lost = orbit_steps_checked(n, float(a), float(b), 2.0, max_steps, float(max_value), FLOAT64_LIMIT)
+        if lost:
+            steps = simulate_orbit_exact(n, a, b, max_steps, max_value)
+        total += np.log(steps + 1)
+    return total / len(n_starts)
+
+# Orbits advanced together by the lockstep kernels
+LOCKSTEP_LANES = 64
+
+@jit(nopython=True, cache=True)
+def orbit_steps_lockstep(a, b, n_starts, max_steps=1000, max_value=1e6, lanes=LOCKSTEP_LANES):
+    """
+    Step counts of all n_starts of one (a, b) cell, equal to simulate_orbit, computed in
+    lockstep: each of up to `lanes` lanes holds one orbit, and every sweep advances all
+    live lanes by one step with a branch-free parity select over contiguous arrays,
+    which the compiler can vectorize. Lanes whose orbit ended (escaped, vanished, cycled
+    or out of steps) are retired and refilled with the next start.
+    Returns: (steps, lost) - int64 and bool arrays, one entry per start; lost as in
+    simulate_orbit_memo, for orbits that stepped from a value beyond FLOAT64_LIMIT
+    """
+    num = n_starts.shape[0]
+    width = min(lanes, num)
+    out = np.empty(num, dtype=np.int64)
+    lost = np.empty(num, dtype=np.bool_)
+    crossed = np.zeros(width, dtype=np.bool_)
+    x = np.empty(width)
+    saved = np.empty(width)
+    steps = np.zeros(width, dtype=np.int64)
+    power = np.ones(width, dtype=np.int64)
+    distance = np.zeros(width, dtype=np.int64)
+    owner = np.arange(width)
+    for l in range(width):
+        x[l] = n_starts[l]
+        saved[l] = n_starts[l]
+    next_start = width
+    active = width
+
+    while active > 0:
+        # Retire lanes whose orbit ends at the current value; refill or compact
+        l = 0
+        while l < active:
+            v = x[l]
+            if steps[l] == max_steps or v > max_value or abs(v) < 1e-10:
+                out[owner[l]] = steps[l]
+                lost[owner[l]] = crossed[l]
+                if next_start < num:
+                    owner[l] = next_start
+                    x[l] = n_starts[next_start]
+                    saved[l] = x[l]
+                    steps[l] = 0
+                    crossed[l] = False
+                    power[l] = 1
+                    distance[l] = 0
+                    next_start += 1
+                else:
+                    active -= 1
+                    owner[l] = owner[active]
+                    x[l] = x[active]
+                    saved[l] = saved[active]
+                    steps[l] = steps[active]
+                    power[l] = power[active]
+                    distance[l] = distance[active]
+                    crossed[l] = crossed[active]
+                continue
+            l += 1
+
+        # One step of every live lane
+        for l in range(active):
+            v = x[l]
+            half = v / 2
+            odd = a * v + b
+            crossed[l] |= abs(v) >= FLOAT64_LIMIT
+            x[l] = half if abs(v % 2) < 1e-10 else odd
+
+        # Brent cycle check per lane; a cycled orbit would run to max_steps
+        for l in range(active):
+            steps[l] += 1
+            distance[l] += 1
+            if x[l] == saved[l]:
+                steps[l] = max_steps
+            elif distance[l] == power[l]:
+                saved[l] = x[l]
+                power[l] *= 2
+                distance[l] = 0
+    return out, lost
+
+@jit(nopython=True, parallel=True, cache=True)
+def mean_log_steps_grid_lockstep(a_vals, b_vals, n_starts, max_steps=1000, max_value=1e6):
+    """
+    mean_log_steps_grid in float64 with the starts of each cell advanced by orbit_steps_lockstep.
+    Returns: (grid, lost) - as mean_log_steps_grid
+    """
+    num_a = a_vals.shape[0]
+    num_b = b_vals.shape[0]
+    grid = np.empty((num_a, num_b))
+    lost = np.empty((num_a, num_b))
+    for cell in prange(num_a * num_b):
+        i = cell // num_b
+        j = cell % num_b
+        steps, crossed = orbit_steps_lockstep(a_vals[i], b_vals[j], n_starts, max_steps, max_value)
+        total = 0.0
+        for k in range(steps.shape[0]):
+            total += np.log(steps[k] + 1)
+        grid[i, j] = total / steps.shape[0]
+        lost[i, j] = crossed.sum() / steps.shape[0]
+    return grid, lost
+
+@jit(nopython=True, parallel=True, cache=True)
+def mean_log_steps_grid(a_vals, b_vals, n_starts, max_steps=1000, max_value=1e6, precision=PRECISION_FLOAT64):
+    """
+    Batch kernel over the whole a_vals x b_vals x n_starts tensor.
+    Cells are flattened and distributed over threads with prange.
+    Returns: (grid, lost) - 2D arrays (len(a_vals), len(b_vals)) of average log(steps + 1)
+    and of the fraction of orbits that lost precision
+    """
+    num_a = a_vals.shape[0]
+    num_b = b_vals.shape[0]
+    grid = np.empty((num_a, num_b))
+    lost = np.empty((num_a, num_b))
+    for cell in prange(num_a * num_b):
+        i = cell // num_b
+        j = cell % num_b
+        grid[i, j], lost[i, j] = cell_stats(a_vals[i], b_vals[j], n_starts, max_steps, max_value, precision)
+    return grid, lost
+
+@jit(nopython=True, parallel=True, cache=True)
+def mean_log_steps_cells(a_cells, b_cells, n_starts, max_steps=1000, max_value=1e6, precision=PRECISION_FLOAT64):
+    """
+    Batch kernel over an explicit list of (a_cells[k], b_cells[k]) cells, e.g. the
+    cells of a grid that are not cached yet.
+    Returns: (values, lost) - 1D arrays of average log(steps + 1) and lost fractions, one per cell
+    """
+    out = np.empty(a_cells.shape[0])
+    lost = np.empty(a_cells.shape[0])
+    for k in prange(a_cells.shape[0]):
+        out[k], lost[k] = cell_stats(a_cells[k], b_cells[k], n_starts, max_steps, max_value, precision)
+    return out, lost
+
+def refine_exact(values, lost, a_cells, b_cells, n_starts, max_steps=1000, max_value=1e6):
+    """
+    Apply the 'exact' policy in place to float64 results of the given cells: every cell
+    with integral a, b and n_starts that lost precision is recomputed exactly.
+    """
+    if not is_integral(n_starts):
+        return
+    for k in np.flatnonzero(lost > 0):
+        if is_integral(a_cells[k], b_cells[k]):
+            values[k] = exact_mean_log_steps(a_cells[k], b_cells[k], n_starts, max_steps, max_value)
+            lost[k] = 0.0
+
 def classify_ab(a, b, n_starts, max_steps=1000, max_value=1e6):
     """
     Classify behavior for given a, b by testing multiple n_starts.
     Returns: average log(steps + 1) for finer scale in divergence regions
     """
-    steps = []
-    for n in n_starts:
-        step = simulate_orbit(n, a, b, max_steps, max_value)
-        steps.append(step)
     # Use log scale for finer granularity in fast divergence regions
-    log_steps = [np.log(s + 1) for s in steps]
-    return np.mean(log_steps)
\ No newline at end of file
+    return mean_log_steps(float(a), float(b), np.asarray(n_starts, dtype=np.float64), max_steps, float(max_value))
+
+# Explicit signatures of the kernels as called by the scripts; compiled ahead of time
+# into the on-disk cache by colatz-bench/jit_warmup.py
+KERNEL_SIGNATURES = {
+    'orbit_step': ['float64(float64, float64, float64)'],
+    'detect_cycle': ['(float64, float64, float64, int64, float64)'],
+    'orbit_outcome': ['(float64, float64, float64, int64, float64)'],
+    'simulate_orbit': ['int64(float64, float64, float64, int64, float64)'],
+    'memo_slot': ['int64(float64, int64)'],
+    'memo_fill': ['void(int64[::1], bool[::1], int64[::1], int64[::1], int64, int64, int64, int64, bool)'],
+    'simulate_orbit_memo': ['(float64, float64, float64, int64, float64, int64[::1], bool[::1], int64[::1], int64[::1])'],
+    'orbit_steps_checked': [
+        '(float64, float64, float64, float64, int64, float64, float64)',
+        '(float32, float32, float32, float32, int64, float64, float64)',
+    ],
+    'cell_stats': ['(float64, float64, float64[::1], int64, float64, int64)'],
+    'mean_log_steps': ['float64(float64, float64, float64[::1], int64, float64)'],
+    'mean_log_steps_grid': ['(float64[::1], float64[::1], float64[::1], int64, float64, int64)'],
+    'orbit_steps_lockstep': ['(float64, float64, float64[::1], int64, float64, int64)'],
+    'mean_log_steps_grid_lockstep': ['(float64[::1], float64[::1], float64[::1], int64, float64)'],
+    'mean_log_steps_cells': ['(float64[::1], float64[::1], float64[::1], int64, float64, int64)'],
+}
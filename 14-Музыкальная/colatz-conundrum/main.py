@@ -1,5 +1,9 @@
 from analysis_classification import generate_phase_data
+from cell_cache import CellCache
+from data_generation import PRECISIONS
+from tile_queue import parse_address
 from visualization_phase_map import plot_phase_map
+import argparse
 import numpy as np
 
 # Parameters for deeper analysis
@@ -9,10 +13,39 @@ n_starts = list(range(1, 1001))  # adjusted to 1-1000 for reasonable speed
 max_steps = 5000  # increased steps
 max_value = 1e9  # increased max_value by 2 orders
 num_processes = 32  # for Ryzen 9950X with hyperthreading
+checkpoint_dir = 'phase_map.partial'  # tiles are checkpointed here while the run is in progress
+cache_file = 'cell_cache.sqlite'  # cells shared between runs with the same settings
+preview_file = 'phase_map_preview.npy'  # refreshed during --progressive runs, as is 1graph_phase_map_preview.png
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate and plot the linear phase map')
+    parser.add_argument('--resume', action='store_true', help=f'Continue an interrupted run from {checkpoint_dir}')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help='Orbit arithmetic: float32 previews, float64, or exact for integral cells (default: float64)')
+    parser.add_argument('--progressive', action='store_true',
+                        help='Compute coarse to fine, refreshing a preview image; Ctrl-C keeps the preview')
+    parser.add_argument('--serve', metavar='HOST:PORT',
+                        help='Serve the tiles to tile_queue.py workers on other machines instead of a local pool')
+    parser.add_argument('--authkey',
+                        help='Shared secret of the --serve workers (default: COLLATZ_AUTHKEY, else a random key)')
+    args = parser.parse_args()
+
+    def save_preview(grid):
+        np.save(preview_file, grid.data)
+        plot_phase_map(grid, a_range, b_range, '1graph_phase_map_preview.png')
+
     print("Generating phase data...")
-    data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
+    cache = CellCache(cache_file)
+    data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes,
+                               checkpoint_dir=checkpoint_dir, resume=args.resume, cache=cache,
+                               precision=args.precision, serve=args.serve and parse_address(args.serve),
+                               progressive=args.progressive, preview=save_preview if args.progressive else None,
+                               authkey=args.authkey)
+    cache.close()
+    if 'preview_stride' in data.meta:
+        print(f"Stopped early: the map is a preview, complete at stride {data.meta['preview_stride']}; "
+              f"continue with --resume")
+    print(f"Orbits that lost precision: {np.nanmean(data.lost):.2%} (worst cell {np.nanmax(data.lost):.2%})")
     print("Plotting phase map...")
     plot_phase_map(data, a_range, b_range, '1graph_phase_map.png')
-    print("Done. Check 1graph_phase_map.png")
\ No newline at end of file
+    print("Done. Check 1graph_phase_map.png")
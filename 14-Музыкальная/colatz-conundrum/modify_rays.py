@@ -19,13 +19,7 @@ def generate_noisy_phase_data(a_range, b_range, n_starts, noise_level=0.01,
     print(f"Generating phase data with noise level {noise_level}...")
 
     # Generate base data
-    data_dict = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
-
-    # Convert to array
-    data = np.zeros((len(a_range), len(b_range)))
-    for i, a in enumerate(a_range):
-        for j, b in enumerate(b_range):
-            data[i, j] = data_dict.get((a, b), 0)
+    data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes).data
 
     # Add noise to parameters and regenerate for some points
     a_noisy, b_noisy = add_noise_to_parameters(a_range, b_range, noise_level)
@@ -56,24 +50,11 @@ def modify_collatz_rule(a_range, b_range, n_starts, modification_type='add_const
 
     # We'll need to modify the data_generation logic
     # For now, let's add a constant offset to the odd step
-    data_dict = {}
-
-    # This is a simplified version - in practice you'd modify the JIT function
-    for a in a_range:
-        for b in b_range:
-            # Simulate with modified rule: T(n) = n/2 if even, a*n + b + mod_param if odd
-            modified_b = b + mod_param if modification_type == 'add_constant' else b
-            from data_generation import classify_ab
-            avg_steps = classify_ab(a, modified_b, n_starts, max_steps, max_value)
-            data_dict[(a, b)] = avg_steps
-
-    # Convert to array
-    data = np.zeros((len(a_range), len(b_range)))
-    for i, a in enumerate(a_range):
-        for j, b in enumerate(b_range):
-            data[i, j] = data_dict[(a, b)]
+    # Simulate with modified rule: T(n) = n/2 if even, a*n + b + mod_param if odd
+    modified_b_range = b_range + mod_param if modification_type == 'add_constant' else b_range
+    phase = generate_phase_data(a_range, modified_b_range, n_starts, max_steps, max_value, num_processes)
 
-    return data
+    return phase.data
 
 def create_modified_ray_map():
     """Create phase maps with modified rays"""
@@ -0,0 +1,58 @@
+"""
+Checkpointed phase map runs: a run stopped after a few tiles and resumed gives the
+same map as an uninterrupted one.
+"""
+
+import json
+import os
+import numpy as np
+import pytest
+import analysis_classification
+from analysis_classification import generate_phase_data
+
+A_VALS = np.linspace(-5, 5, 12)
+B_VALS = np.linspace(-20, 10, 10)
+N_STARTS = np.arange(1, 41)
+
+
+def phase_map(**kwargs):
+    return generate_phase_data(A_VALS, B_VALS, N_STARTS, 500, 1e6, num_processes=1, target_tile_seconds=1e-4,
+                               **kwargs)
+
+
+def stop_after(monkeypatch, tiles):
+    """Make the run raise KeyboardInterrupt once the given number of tiles came back."""
+    original = analysis_classification.iter_adaptive_tiles
+
+    def interrupted(*args, **kwargs):
+        for count, tile in enumerate(original(*args, **kwargs)):
+            if count == tiles:
+                raise KeyboardInterrupt
+            yield tile
+    monkeypatch.setattr(analysis_classification, 'iter_adaptive_tiles', interrupted)
+
+
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch):
+    reference = phase_map()
+    checkpoint = str(tmp_path / 'phase_map.partial')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 5)
+        with pytest.raises(KeyboardInterrupt):
+            phase_map(checkpoint_dir=checkpoint, checkpoint_seconds=0.0)
+    with open(os.path.join(checkpoint, 'manifest.json')) as f:
+        tiles = json.load(f)['completed']
+    assert 0 < sum((i1 - i0) * (j1 - j0) for i0, i1, j0, j1 in tiles) < reference.data.size
+    resumed = phase_map(checkpoint_dir=checkpoint, resume=True)
+    assert np.array_equal(resumed.data, reference.data)
+    assert np.array_equal(resumed.lost, reference.lost)
+
+
+def test_resume_with_other_parameters_fails(tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / 'phase_map.partial')
+    with monkeypatch.context() as patch:
+        stop_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            phase_map(checkpoint_dir=checkpoint)
+    with pytest.raises(ValueError, match='Cannot resume'):
+        generate_phase_data(A_VALS, B_VALS, N_STARTS, 600, 1e6, num_processes=1, checkpoint_dir=checkpoint,
+                            resume=True)
@@ -0,0 +1,19 @@
+"""
+Lockstep and scalar phase map kernels agree on values and lost fractions.
+"""
+
+import numpy as np
+import pytest
+from data_generation import mean_log_steps_grid, mean_log_steps_grid_lockstep
+
+
+@pytest.mark.parametrize('max_value', [1e6, 1e18])
+def test_lockstep_grid_matches_scalar_grid(max_value):
+    a_vals = np.linspace(-5, 5, 21)
+    b_vals = np.linspace(-20, 10, 13)
+    starts = np.arange(1.0, 61.0)
+    grid, lost = mean_log_steps_grid(a_vals, b_vals, starts, 3000, max_value)
+    lockstep_grid, lockstep_lost = mean_log_steps_grid_lockstep(a_vals, b_vals, starts, 3000, max_value)
+    assert lost.max() > 0
+    assert np.array_equal(lockstep_grid, grid)
+    assert np.array_equal(lockstep_lost, lost)
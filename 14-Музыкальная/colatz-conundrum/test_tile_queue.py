@@ -0,0 +1,96 @@
+"""
+Tile distribution over TCP, with worker processes on this host standing in for other
+machines: served runs match local ones, and the tile of a killed worker is handed out again.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import numba
+import numpy as np
+from analysis_classification import generate_phase_data
+from tile_queue import TileCoordinator, run_worker
+
+# The tests fork coordinators and workers, after other test modules may have run parallel
+# kernels: with numba's TBB pool up, a forking process hangs at exit. Modules are all
+# collected before any test runs, so this picks the layer before its threads start.
+numba.config.THREADING_LAYER = 'workqueue'
+
+AUTHKEY = 'test-tiles'
+A_VALS = np.linspace(-5, 5, 12)
+B_VALS = np.linspace(-20, 10, 10)
+N_STARTS = np.arange(1, 41)
+
+
+def free_address():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()
+
+
+@contextlib.contextmanager
+def workers(address, count):
+    """count tile_queue worker processes for the coordinator at address, killed on exit."""
+    processes = [multiprocessing.Process(target=run_worker, args=(address, AUTHKEY, 30.0)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    try:
+        yield processes
+    finally:
+        for process in processes:
+            process.kill()
+            process.join()
+
+
+def square(x):
+    return x * x
+
+
+def hold_first(marker):
+    """The first worker to get this task blocks on it; the next one returns (its pid, the first one's)."""
+    try:
+        with open(marker, 'x') as f:
+            f.write(str(os.getpid()))
+    except FileExistsError:
+        with open(marker) as f:
+            return os.getpid(), int(f.read())
+    time.sleep(600)
+
+
+def test_served_map_matches_local_pool():
+    kwargs = dict(num_processes=3, target_tile_seconds=1e-3)
+    reference = generate_phase_data(A_VALS, B_VALS, N_STARTS, 500, 1e6, **kwargs)
+    address = free_address()
+    with workers(address, 3):
+        served = generate_phase_data(A_VALS, B_VALS, N_STARTS, 500, 1e6, serve=address, authkey=AUTHKEY, **kwargs)
+    assert np.array_equal(served.data, reference.data)
+    assert np.array_equal(served.lost, reference.lost)
+
+
+def test_workers_carry_on_to_the_next_run():
+    address = free_address()
+    with workers(address, 2):
+        for _ in range(2):
+            with TileCoordinator(address, authkey=AUTHKEY) as coordinator:
+                futures = [coordinator.submit(square, x) for x in range(6)]
+                assert [future.result(timeout=60) for future in futures] == [x * x for x in range(6)]
+
+
+def test_killed_worker_tile_is_handed_out_again(tmp_path):
+    address = free_address()
+    marker = tmp_path / 'first_worker'
+    with workers(address, 2) as processes, \
+            TileCoordinator(address, authkey=AUTHKEY, lease_seconds=1.0) as coordinator:
+        future = coordinator.submit(hold_first, str(marker))
+        deadline = time.monotonic() + 60
+        while not (marker.exists() and marker.read_text()):
+            assert time.monotonic() < deadline, 'No worker took the task'
+            time.sleep(0.1)
+        first = int(marker.read_text())
+        os.kill(first, signal.SIGKILL)
+        second, held = future.result(timeout=60)
+    assert held == first
+    assert second != first and second in {process.pid for process in processes}
@@ -0,0 +1,20 @@
+"""
+Quadtree sampling of zoom_fractal on lattices that do and do not tile.
+"""
+
+import numpy as np
+import pytest
+from zoom_fractal import adaptive_phase_data
+
+N_STARTS = range(1, 21)
+
+
+def test_tiled_lattice_is_filled():
+    grid = adaptive_phase_data(np.linspace(1, 4, 17), np.linspace(-5, 5, 33), N_STARTS, 200, 1e6)
+    assert not np.isnan(grid.data).any()
+
+
+@pytest.mark.parametrize('num_a, num_b', [(20, 17), (17, 18), (6, 6)])
+def test_untiled_lattice_is_rejected(num_a, num_b):
+    with pytest.raises(ValueError, match='does not split into tiles'):
+        adaptive_phase_data(np.linspace(1, 4, num_a), np.linspace(-5, 5, num_b), N_STARTS, 200, 1e6)
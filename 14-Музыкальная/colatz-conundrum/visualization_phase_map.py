@@ -4,19 +4,14 @@ import numpy as np
 def plot_phase_map(data, a_range, b_range, save_path='1graph_phase_map.png'):
     """
     Plot the phase map with continuous colormap based on average steps.
+    data: PhaseGrid from generate_phase_data (a along x, b along y)
     """
-    a_vals = sorted(set(a for a, b in data.keys()))
-    b_vals = sorted(set(b for a, b in data.keys()))
-
-    grid = np.zeros((len(b_vals), len(a_vals)))
-
-    for (a, b), val in data.items():
-        i = a_vals.index(a)
-        j = b_vals.index(b)
-        grid[j, i] = val
+    a_vals = data.a_vals
+    b_vals = data.b_vals
+    grid = data.data.T
 
     plt.figure(figsize=(12, 10), dpi=300)  # high resolution
-    plt.imshow(grid, origin='lower', extent=[min(a_vals), max(a_vals), min(b_vals), max(b_vals)], cmap='plasma', aspect='auto')
+    plt.imshow(grid, origin='lower', extent=[a_vals.min(), a_vals.max(), b_vals.min(), b_vals.max()], cmap='plasma', aspect='auto')
     plt.colorbar(label='Average Steps to Divergence')
     plt.xlabel('a')
     plt.ylabel('b')
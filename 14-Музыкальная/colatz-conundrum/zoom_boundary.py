@@ -1,4 +1,5 @@
 from analysis_classification import generate_phase_data
+from cell_cache import CellCache
 from visualization_phase_map import plot_phase_map
 import numpy as np
 
@@ -9,10 +10,13 @@ n_starts = list(range(1, 201))
 max_steps = 2000
 max_value = 1e7
 num_processes = 32
+cache_file = 'cell_cache.sqlite'  # cells shared between runs with the same settings
 
 if __name__ == '__main__':
     print("Generating zoomed phase data for b < 0 rays analysis...")
-    data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
+    cache = CellCache(cache_file)
+    data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes, cache=cache)
+    cache.close()
     print("Plotting zoomed phase map for b < 0...")
     plot_phase_map(data, a_range, b_range, '1graph_rays_b_negative.png')
     print("Done. Check 1graph_rays_b_negative.png")
\ No newline at end of file
@@ -1,6 +1,9 @@
 import numpy as np
-from analysis_classification import generate_phase_data
+import numba
+from analysis_classification import generate_phase_data, kernel_precision_code, PhaseGrid
+from data_generation import mean_log_steps_cells, refine_exact, PRECISIONS
 from visualization_phase_map import plot_phase_map
+from cell_cache import CellCache
 import argparse
 
 def generate_zoom_levels(center_a, center_b, width, height, resolution, num_levels=3, zoom_factor=0.5):
@@ -22,22 +25,116 @@ def generate_zoom_levels(center_a, center_b, width, height, resolution, num_leve
         current_height *= zoom_factor
     return levels
 
-def main(center_a, center_b, width, height, resolution, num_levels=3, zoom_factor=0.5, n_starts=None, max_steps=1000, max_value=1e6, num_processes=16):
+def adaptive_phase_data(a_vals, b_vals, n_starts, max_steps=1000, max_value=1e6, tolerance=0.1, coarse_step=8,
+                        cache=None, precision='float64'):
+    """
+    Quadtree sampling of the phase map on the a_vals x b_vals lattice. The coarse lattice
+    must tile each axis exactly: len - 1 a multiple of its spacing (e.g. 2^m + 1 points).
+    Starting from a lattice with spacing coarse_step, a tile is split into four only while
+    its corner values differ by more than tolerance; tiles that stay flat are filled by
+    bilinear interpolation of their corners. Corners are shared with the parent tiles, so
+    every sample is computed once, and cells already in the cache are not computed at all.
+    The cost follows the length of the boundaries rather than the area of the map.
+    An interpolated cell is marked with the largest lost fraction of its tile corners.
+    Returns: PhaseGrid; meta['computed'] is the number of simulated cells
+    """
+    num_a, num_b = len(a_vals), len(b_vals)
+    step = 2 ** int(np.log2(min(coarse_step, num_a - 1, num_b - 1)))
+    if (num_a - 1) % step or (num_b - 1) % step:
+        raise ValueError(f"A {num_a} x {num_b} lattice does not split into tiles of {step} cells; "
+                         f"use len - 1 points per axis divisible by {step}, e.g. 2^m + 1")
+    starts = np.asarray(n_starts, dtype=np.float64)
+    grid = np.full((num_a, num_b), np.nan)
+    lost = np.full((num_a, num_b), np.nan)
+    if cache is not None:
+        settings = cache.settings_id(starts, max_steps, max_value, precision)
+        grid, lost = cache.lookup(settings, a_vals, b_vals)
+    computed = 0
+
+    def sample(i, j):
+        nonlocal computed
+        i, j = np.unique(np.stack([i, j]), axis=1)
+        missing = np.isnan(grid[i, j])
+        i, j = i[missing], j[missing]
+        if len(i):
+            values, lost_fractions = mean_log_steps_cells(a_vals[i], b_vals[j], starts, max_steps, max_value,
+                                                          kernel_precision_code(precision))
+            if precision == 'exact':
+                refine_exact(values, lost_fractions, a_vals[i], b_vals[j], starts, max_steps, max_value)
+            grid[i, j] = values
+            lost[i, j] = lost_fractions
+            computed += len(i)
+            if cache is not None:
+                cache.store(settings, a_vals[i], b_vals[j], values, lost_fractions)
+
+    ti, tj = np.meshgrid(np.arange(0, num_a - 1, step), np.arange(0, num_b - 1, step), indexing='ij')
+    ti, tj = ti.ravel(), tj.ravel()
+    lattice_i, lattice_j = np.meshgrid(np.arange(0, num_a, step), np.arange(0, num_b, step), indexing='ij')
+    sample(lattice_i.ravel(), lattice_j.ravel())
+
+    flat = []
+    while step > 1:
+        corners = np.stack([grid[ti, tj], grid[ti + step, tj], grid[ti, tj + step], grid[ti + step, tj + step]])
+        split = corners.max(axis=0) - corners.min(axis=0) > tolerance
+        flat.append((ti[~split], tj[~split], step))
+        ti, tj = ti[split], tj[split]
+        step //= 2
+        # Edge midpoints and centres of the split tiles; their corners are known already
+        sample(np.concatenate([ti + step, ti, ti + step, ti + 2 * step, ti + step]),
+               np.concatenate([tj, tj + step, tj + step, tj + step, tj + 2 * step]))
+        ti = np.concatenate([ti, ti + step, ti, ti + step])
+        tj = np.concatenate([tj, tj, tj + step, tj + step])
+
+    # Interpolate flat tiles last, so cells sampled by a finer neighbour are kept
+    for flat_i, flat_j, size in flat:
+        u = np.linspace(0.0, 1.0, size + 1)
+        for i, j in zip(flat_i, flat_j):
+            block = grid[i:i + size + 1, j:j + size + 1]
+            v00, v10, v01, v11 = block[0, 0], block[-1, 0], block[0, -1], block[-1, -1]
+            fill = ((1 - u)[:, None] * ((1 - u) * v00 + u * v01)
+                    + u[:, None] * ((1 - u) * v10 + u * v11))
+            np.copyto(block, fill, where=np.isnan(block))
+            lost_block = lost[i:i + size + 1, j:j + size + 1]
+            corner_lost = max(lost_block[0, 0], lost_block[-1, 0], lost_block[0, -1], lost_block[-1, -1])
+            lost_block[np.isnan(lost_block)] = corner_lost
+
+    if cache is not None:
+        cache.flush()
+    meta = {'n_starts': len(starts), 'max_steps': max_steps, 'max_value': max_value,
+            'precision': precision, 'tolerance': tolerance, 'computed': computed}
+    return PhaseGrid(grid.astype(np.float32), np.asarray(a_vals), np.asarray(b_vals), meta, lost.astype(np.float32))
+
+def main(center_a, center_b, width, height, resolution, num_levels=3, zoom_factor=0.5, n_starts=None, max_steps=1000, max_value=1e6, num_processes=16,
+         adaptive=False, tolerance=0.1, coarse_step=8, cache_file='cell_cache.sqlite', precision='float64'):
     if n_starts is None:
         n_starts = list(range(1, 101))
+    if adaptive:
+        # The quadtree needs 2^m + 1 points per axis; with zoom_factor 0.5 the points of each
+        # level then include every other point of the next one, which the cache hands back
+        resolution = 2 ** int(np.ceil(np.log2(resolution - 1))) + 1
+        numba.set_num_threads(min(num_processes, numba.config.NUMBA_NUM_THREADS))
 
     levels = generate_zoom_levels(center_a, center_b, width, height, resolution, num_levels, zoom_factor)
+    cache = CellCache(cache_file)
 
     for a_min, a_max, b_min, b_max, level in levels:
         print(f"Generating zoom level {level}: a [{a_min:.3f}, {a_max:.3f}], b [{b_min:.3f}, {b_max:.3f}]")
         a_range = np.linspace(a_min, a_max, resolution)
         b_range = np.linspace(b_min, b_max, resolution)
 
-        data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes)
+        if adaptive:
+            data = adaptive_phase_data(a_range, b_range, n_starts, max_steps, max_value, tolerance, coarse_step, cache,
+                                       precision)
+            print(f"Simulated {data.meta['computed']} of {resolution * resolution} cells")
+        else:
+            data = generate_phase_data(a_range, b_range, n_starts, max_steps, max_value, num_processes, cache=cache,
+                                       precision=precision)
+        print(f"Orbits that lost precision: {np.mean(data.lost):.2%}")
 
         filename = f"1graph_zoom{level+1}_a{round(center_a)}_b{round(center_b)}.png"
         plot_phase_map(data, a_range, b_range, filename)
         print(f"Saved {filename}")
+    cache.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Generate zoomed Collatz fractal images.')
@@ -51,8 +148,14 @@ if __name__ == '__main__':
     parser.add_argument('--max_steps', type=int, default=1000, help='Max steps per orbit')
     parser.add_argument('--max_value', type=float, default=1e6, help='Max value before divergence')
     parser.add_argument('--num_processes', type=int, default=16, help='Number of processes')
+    parser.add_argument('--adaptive', action='store_true', help='Refine only tiles that vary more than --tolerance')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Largest corner spread of a tile left unrefined')
+    parser.add_argument('--coarse_step', type=int, default=8, help='Lattice spacing (in cells) of the initial adaptive sampling')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help='Orbit arithmetic: float32 previews, float64, or exact for integral cells (default: float64)')
 
     args = parser.parse_args()
     main(args.center_a, args.center_b, args.width, args.height, args.resolution,
          args.num_levels, args.zoom_factor, max_steps=args.max_steps,
-         max_value=args.max_value, num_processes=args.num_processes)
\ No newline at end of file
+         max_value=args.max_value, num_processes=args.num_processes,
+         adaptive=args.adaptive, tolerance=args.tolerance, coarse_step=args.coarse_step, precision=args.precision)
\ No newline at end of file